@@ -3,10 +3,12 @@
 from dataclasses import dataclass
 from pathlib import Path
 
-import math
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from sample_loader import load_sample_dir
+from stats_engine import group_stats
+
 
 @dataclass(frozen=True)
 class Paths:
@@ -32,76 +34,21 @@ def build_paths() -> Paths:
     )
 
 
-def load_single_csv(path: Path, run_id: str) -> pd.DataFrame:
-    rows: list[dict[str, object]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line or line == "done":
-                continue
-            cols = line.split(",")
-            first = cols[0].lstrip("\ufeff")
-            if first == "op":
-                continue
-            if len(cols) != 11:
-                continue
-            rows.append(
-                {
-                    "run_id": run_id,
-                    "op": first,
-                    "n": int(cols[1]),
-                    "repeat": int(cols[2]),
-                    "warmup": int(cols[3]),
-                    "eigen_avg_cycles": float(cols[4]),
-                    "cmsis_avg_cycles": float(cols[5]),
-                    "cmsis_over_eigen": float(cols[6]),
-                    "error_l2": float(cols[7]),
-                    "valid": int(cols[8]),
-                    "invalid": int(cols[9]),
-                    "build_mode": cols[10],
-                }
-            )
-    df = pd.DataFrame(rows)
-    if df.empty:
-        raise RuntimeError(f"Empty benchmark data: {path}")
-    return df
-
-
 def load_all_samples(samples_dir: Path) -> pd.DataFrame:
-    files = sorted(samples_dir.glob("run_*.csv"))
-    if not files:
-        raise RuntimeError(f"No sample csv files found in {samples_dir}")
-    frames = []
-    for f in files:
-        run_id = f.stem
-        frames.append(load_single_csv(f, run_id))
-    df = pd.concat(frames, ignore_index=True)
-    return df
+    return load_sample_dir(samples_dir)
 
 
 def compute_stats(df: pd.DataFrame) -> pd.DataFrame:
-    group = df.groupby(["op", "n"], as_index=False)
-    stats = group.agg(
-        runs=("run_id", "nunique"),
-        eigen_mean=("eigen_avg_cycles", "mean"),
-        eigen_var=("eigen_avg_cycles", "var"),
-        eigen_std=("eigen_avg_cycles", "std"),
-        cmsis_mean=("cmsis_avg_cycles", "mean"),
-        cmsis_var=("cmsis_avg_cycles", "var"),
-        cmsis_std=("cmsis_avg_cycles", "std"),
-        ratio_mean=("cmsis_over_eigen", "mean"),
-        ratio_var=("cmsis_over_eigen", "var"),
-        ratio_std=("cmsis_over_eigen", "std"),
-        error_mean=("error_l2", "mean"),
-        error_var=("error_l2", "var"),
-        error_std=("error_l2", "std"),
+    return group_stats(
+        df,
+        ["op", "n"],
+        {
+            "eigen": "eigen_avg_cycles",
+            "cmsis": "cmsis_avg_cycles",
+            "ratio": "cmsis_over_eigen",
+            "error": "error_l2",
+        },
     )
-    stats["ci_mult"] = stats["runs"].apply(lambda n: 1.96 / math.sqrt(n))
-    stats["eigen_ci"] = stats["eigen_std"] * stats["ci_mult"]
-    stats["cmsis_ci"] = stats["cmsis_std"] * stats["ci_mult"]
-    stats["ratio_ci"] = stats["ratio_std"] * stats["ci_mult"]
-    stats["error_ci"] = stats["error_std"] * stats["ci_mult"]
-    return stats
 
 
 def plot_cycles(stats: pd.DataFrame, op: str, out_path: Path) -> None:
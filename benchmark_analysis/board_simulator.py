@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import select
+import tempfile
+import threading
+import time
+import tty
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from point_timing import TIMESTAMP_SIDECAR_NAME
+
+
+CSV_HEADER = (
+    "op,n,repeat,warmup,eigen_avg_cycles,cmsis_avg_cycles,cmsis_over_eigen,error_l2,"
+    "valid,invalid,build_mode"
+)
+GARBAGE_LINE = "\x00\xff\x7f~garbage~\x1b[0m"
+
+
+def synthesize_runs(
+    runs: int,
+    build_mode: str = "Release",
+    repeat: int = 100,
+    warmup: int = 1,
+    seed: int = 0,
+) -> list[str]:
+    """Synthesizes autorun output in the firmware's `PrintAggregateLine` format.
+
+    Args:
+        runs: Number of benchmark runs (`BENCHMARK_AUTORUN_COUNT`).
+        build_mode: Value of the `build_mode` column.
+        repeat: Value of the `repeat` column (all rounds valid).
+        warmup: Value of the `warmup` column.
+        seed: Seed for the cycle-count jitter.
+
+    Returns:
+        Lines without line endings: `autorun-start`, then per run the CSV header,
+        one record per `EXPECTED_RECORD_ORDER` point and `done`.
+    """
+
+    rng = random.Random(seed)
+    lines = ["autorun-start"]
+    for _ in range(runs):
+        lines.append(CSV_HEADER)
+        for op, n in EXPECTED_RECORD_ORDER:
+            work = float(n**3) * (1.0 if op == "mul" else 3.0)
+            eigen = work * 6.0 * rng.uniform(0.98, 1.02) + 40.0
+            cmsis = work * 4.0 * rng.uniform(0.98, 1.02) + 120.0
+            error = 1e-7 * n * rng.uniform(0.5, 1.5)
+            lines.append(
+                f"{op},{n},{repeat},{warmup},{eigen:.2f},{cmsis:.2f},{cmsis / eigen:.6f},"
+                f"{error:.8f},{repeat},0,{build_mode}"
+            )
+        lines.append("done")
+    return lines
+
+
+def replay_serial_log(log_path: Path) -> list[str]:
+    """Returns the board output recorded in a `serial_capture.log`.
+
+    Host annotations (`# serial ...` lines) are dropped.
+    """
+
+    lines: list[str] = []
+    for line in log_path.read_text(encoding="utf-8", errors="replace").splitlines():
+        if line.startswith("# "):
+            continue
+        lines.append(line)
+    return lines
+
+
+@dataclass(frozen=True)
+class FaultPlan:
+    """Faults injected by `SimulatedBoard`.
+
+    Args:
+        garbage_every: Insert a garbage line after every N output lines (0 = never).
+        stall_at_line: Line index before which output pauses once.
+        stall_sec: Pause length for `stall_at_line`.
+        disconnect_at_line: Line index at which the device disappears (the host
+            read fails with an I/O error).
+        reenumerate_as: Port name the device comes back under after the
+            disconnect; `None` keeps it gone.
+        reenumerate_delay_sec: Time the device stays absent.
+    """
+
+    garbage_every: int = 0
+    stall_at_line: int | None = None
+    stall_sec: float = 0.0
+    disconnect_at_line: int | None = None
+    reenumerate_as: Path | None = None
+    reenumerate_delay_sec: float = 0.5
+
+
+class SimulatedBoard:
+    """A fake benchmark board behind a pseudo-terminal.
+
+    The PTY slave is exposed through a symlink (for example `<tmp>/ttyACM0`), so
+    `capture_serial_runs` opens it like a CDC device. Output starts once the
+    host opens the port (the firmware waits for DTR the same way) and stops
+    when the host closes it. After a re-enumeration the board restarts its
+    output from the first line, as it does after a reflash/reset.
+
+    Args:
+        link_path: Symlink created for the PTY slave.
+        lines: Board output lines (see `synthesize_runs`/`replay_serial_log`).
+        line_rate: Lines per second; `None` writes as fast as the host reads.
+        faults: Faults to inject.
+        open_timeout_sec: How long to wait for the host to open the port.
+        settle_sec: Delay between the host opening the port and the first line;
+            stands in for the firmware waiting for DTR, which the host asserts
+            only after flushing its input buffer.
+    """
+
+    def __init__(
+        self,
+        link_path: Path,
+        lines: Sequence[str],
+        line_rate: float | None = None,
+        faults: FaultPlan = FaultPlan(),
+        open_timeout_sec: float = 10.0,
+        settle_sec: float = 0.1,
+    ) -> None:
+        self.port = link_path
+        self._lines = list(lines)
+        self._interval = 1.0 / line_rate if line_rate else 0.0
+        self._faults = faults
+        self._open_timeout_sec = open_timeout_sec
+        self._settle_sec = settle_sec
+        self._stop = threading.Event()
+        self._master: int | None = None
+        self._thread = threading.Thread(target=self._serve, name="simulated-board", daemon=True)
+        self.sent_at: list[tuple[float, str]] = []
+        self.error: BaseException | None = None
+
+    def __enter__(self) -> SimulatedBoard:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Creates the port and starts serving in a background thread."""
+
+        self._attach(self.port)
+        self._thread.start()
+
+    def is_running(self) -> bool:
+        """Returns whether the board is still serving output."""
+
+        return self._thread.is_alive()
+
+    def stop(self) -> None:
+        """Stops serving and removes the port."""
+
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._detach()
+
+    def _attach(self, link_path: Path) -> None:
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        slave_name = os.ttyname(slave)
+        # Only the host may hold the slave open: the master then reports
+        # POLLHUP exactly while the host has the port closed.
+        os.close(slave)
+        link_path.parent.mkdir(parents=True, exist_ok=True)
+        if link_path.is_symlink() or link_path.exists():
+            link_path.unlink()
+        os.symlink(slave_name, link_path)
+        self._master = master
+        self.port = link_path
+
+    def _detach(self) -> None:
+        if self._master is not None:
+            os.close(self._master)
+            self._master = None
+        if self.port.is_symlink():
+            self.port.unlink()
+
+    def _host_open(self) -> bool:
+        assert self._master is not None
+        poller = select.poll()
+        poller.register(self._master, select.POLLHUP)
+        return not any(event & select.POLLHUP for _, event in poller.poll(0))
+
+    def _wait_for_host(self) -> bool:
+        deadline = time.monotonic() + self._open_timeout_sec
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            if self._host_open():
+                self._stop.wait(self._settle_sec)
+                return True
+            time.sleep(0.01)
+        return False
+
+    def _serve(self) -> None:
+        try:
+            self._serve_lines()
+        except BaseException as exc:  # pragma: no cover - surfaced via `error`
+            self.error = exc
+
+    def _serve_lines(self) -> None:
+        faults = self._faults
+        disconnected = False
+        index = 0
+        emitted = 0
+        if not self._wait_for_host():
+            return
+        while index < len(self._lines) and not self._stop.is_set():
+            if not disconnected and index == faults.disconnect_at_line:
+                disconnected = True
+                self._detach()
+                if faults.reenumerate_as is None:
+                    return
+                time.sleep(faults.reenumerate_delay_sec)
+                self._attach(faults.reenumerate_as)
+                if not self._wait_for_host():
+                    return
+                index = 0
+                continue
+            if index == faults.stall_at_line:
+                self._stop.wait(faults.stall_sec)
+            if not self._host_open():
+                return
+            payload = self._lines[index] + "\r\n"
+            emitted += 1
+            if faults.garbage_every and emitted % faults.garbage_every == 0:
+                payload = GARBAGE_LINE + "\r\n" + payload
+            assert self._master is not None
+            os.write(self._master, payload.encode("utf-8", errors="replace"))
+            self.sent_at.append((time.monotonic(), self._lines[index]))
+            index += 1
+            if self._interval:
+                self._stop.wait(self._interval)
+        # Keep the port up until the host has drained it and closed it.
+        while not self._stop.is_set() and self._host_open():
+            time.sleep(0.05)
+
+
+def _percentile(values: Sequence[float], quantile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def run_capture_benchmark(runs: int, line_rate: float | None, timeout_sec: int) -> dict[str, float]:
+    """Captures `runs` synthesized runs through a simulated board.
+
+    Returns:
+        Throughput and host receive latency (send -> timestamp sidecar) figures.
+    """
+
+    from run_full_matrix import capture_serial_runs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        log_path = tmp_dir / "logs" / "serial_capture.log"
+        # Start after the host's post-open settle sleep so latency excludes that backlog.
+        board = SimulatedBoard(
+            tmp_dir / "ttyACM0", synthesize_runs(runs), line_rate, settle_sec=0.3
+        )
+        with board:
+            started = time.monotonic()
+            capture_serial_runs(
+                port=str(board.port),
+                baudrate=115200,
+                expected_runs=runs,
+                timeout_sec=timeout_sec,
+                samples_dir=tmp_dir / "samples_release",
+                log_path=log_path,
+                scan_fallback=False,
+            )
+            elapsed = time.monotonic() - started
+            sent = list(board.sent_at)
+
+        received: list[float] = []
+        sidecar = log_path.with_name(TIMESTAMP_SIDECAR_NAME)
+        for raw in sidecar.read_text(encoding="utf-8").splitlines():
+            stamp, sep, line = raw.partition("\t")
+            if sep and not line.startswith("# "):
+                received.append(float(stamp))
+
+    latencies = [rx - tx for (tx, _), rx in zip(sent, received)]
+    return {
+        "runs": float(runs),
+        "lines": float(len(received)),
+        "elapsed_sec": elapsed,
+        "lines_per_sec": len(received) / elapsed if elapsed > 0 else float("nan"),
+        "latency_p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "latency_p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "latency_max_ms": max(latencies) * 1e3,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses CLI arguments."""
+
+    parser = argparse.ArgumentParser(
+        description="Simulated benchmark board on a pseudo-terminal (no hardware needed)."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Expose a simulated board until interrupted.")
+    serve.add_argument("--link", required=True, help="Symlink to create for the PTY slave.")
+    serve.add_argument("--runs", type=int, default=3)
+    serve.add_argument("--replay", default="", help="serial_capture.log to replay instead of synthesizing.")
+    serve.add_argument("--line-rate", type=float, default=0.0, help="Lines per second (0 = unthrottled).")
+    serve.add_argument("--garbage-every", type=int, default=0)
+    serve.add_argument("--stall-at-line", type=int, default=None)
+    serve.add_argument("--stall-sec", type=float, default=0.0)
+    serve.add_argument("--disconnect-at-line", type=int, default=None)
+    serve.add_argument("--reenumerate-as", default="")
+    serve.add_argument("--open-timeout-sec", type=float, default=3600.0)
+
+    bench = sub.add_parser("bench", help="Measure capture throughput and latency.")
+    bench.add_argument("--runs", type=int, default=20)
+    bench.add_argument("--line-rate", type=float, default=0.0)
+    bench.add_argument("--timeout-sec", type=int, default=60)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Entry point for the board simulator."""
+
+    args = parse_args()
+    if args.command == "bench":
+        result = run_capture_benchmark(args.runs, args.line_rate or None, args.timeout_sec)
+        for key, value in result.items():
+            print(f"{key}: {value:.3f}")
+        return
+
+    lines = replay_serial_log(Path(args.replay)) if args.replay else synthesize_runs(args.runs)
+    faults = FaultPlan(
+        garbage_every=args.garbage_every,
+        stall_at_line=args.stall_at_line,
+        stall_sec=args.stall_sec,
+        disconnect_at_line=args.disconnect_at_line,
+        reenumerate_as=Path(args.reenumerate_as) if args.reenumerate_as else None,
+    )
+    board = SimulatedBoard(
+        Path(args.link),
+        lines,
+        line_rate=args.line_rate or None,
+        faults=faults,
+        open_timeout_sec=args.open_timeout_sec,
+    )
+    board.start()
+    print(f"Simulated board on {board.port} ({len(lines)} lines).")
+    try:
+        while board.is_running():
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        board.stop()
+
+
+if __name__ == "__main__":
+    main()
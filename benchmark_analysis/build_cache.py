@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+from full_matrix_common import BuildProfile
+
+
+CACHE_SCHEMA_VERSION = 1
+ELF_NAME = "cmsis-dsp-vs-eigen.elf"
+
+# Firmware inputs that can change the produced ELF. `benchmark_analysis/` is
+# deliberately excluded so analysis-only edits keep every cache entry valid.
+SOURCE_DIRS: tuple[str, ...] = ("User", "Core", "Drivers", "Middlewares", "cmake")
+SOURCE_FILES: tuple[str, ...] = (
+    "CMakeLists.txt",
+    "CMakePresets.json",
+    "STM32F407XX_FLASH.ld",
+    "startup_stm32f407xx.s",
+)
+SOURCE_SUFFIXES: frozenset[str] = frozenset(
+    {".c", ".cc", ".cpp", ".cxx", ".h", ".hh", ".hpp", ".inc", ".s", ".ld", ".cmake", ".txt", ".yaml"}
+)
+
+
+@dataclass(frozen=True)
+class CachedBuild:
+    """One cache hit.
+
+    Args:
+        key: Cache key of the entry.
+        elf_path: Cached ELF path inside the cache directory.
+        memory: Section sizes recorded when the entry was stored.
+    """
+
+    key: str
+    elf_path: Path
+    memory: dict[str, int]
+
+
+def _hash_file(digest: hashlib._Hash, path: Path) -> None:
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+
+
+def hash_source_tree(repo_dir: Path) -> str:
+    """Hashes the firmware sources that feed `configure_and_build`.
+
+    Args:
+        repo_dir: Repository root directory.
+
+    Returns:
+        Hex SHA-256 over relative paths and contents, in sorted path order.
+    """
+
+    files: list[Path] = []
+    for name in SOURCE_FILES:
+        path = repo_dir / name
+        if path.is_file():
+            files.append(path)
+    for name in SOURCE_DIRS:
+        root = repo_dir / name
+        if not root.is_dir():
+            continue
+        for path in root.rglob("*"):
+            if path.suffix.lower() in SOURCE_SUFFIXES and path.is_file():
+                files.append(path)
+
+    digest = hashlib.sha256()
+    for path in sorted(files, key=lambda p: p.relative_to(repo_dir).as_posix()):
+        digest.update(path.relative_to(repo_dir).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        _hash_file(digest, path)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def toolchain_identity(tools: Sequence[Path]) -> str:
+    """Fingerprints toolchain binaries by resolved path, size and mtime.
+
+    Args:
+        tools: Executables whose identity should invalidate the cache.
+
+    Returns:
+        Hex SHA-256 of the identity tuples.
+    """
+
+    entries: list[list[object]] = []
+    for tool in tools:
+        resolved = tool.resolve()
+        if resolved.is_file():
+            st = resolved.stat()
+            entries.append([str(resolved), st.st_size, st.st_mtime_ns])
+        else:
+            entries.append([str(resolved), None, None])
+    payload = json.dumps(entries, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+@dataclass(frozen=True)
+class BuildCache:
+    """Content-addressed ELF cache shared by all profiles of a campaign.
+
+    Args:
+        cache_dir: Directory holding one sub-directory per cache key.
+        source_digest: Output of `hash_source_tree`.
+        toolchain_digest: Output of `toolchain_identity`.
+    """
+
+    cache_dir: Path
+    source_digest: str
+    toolchain_digest: str
+
+    def key_for(self, profile: BuildProfile, autorun_count: int) -> str:
+        """Returns the cache key for one profile build."""
+
+        fields = asdict(profile)
+        # The profile name only labels the build; identical flags share an entry.
+        fields.pop("name", None)
+        payload = {
+            "schema": CACHE_SCHEMA_VERSION,
+            "profile": fields,
+            "autorun_count": autorun_count,
+            "sources": self.source_digest,
+            "toolchain": self.toolchain_digest,
+        }
+        return hashlib.sha256(
+            json.dumps(payload, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def lookup(self, key: str) -> CachedBuild | None:
+        """Returns the cached build for `key`, or `None` on a miss."""
+
+        entry = self.cache_dir / key
+        elf_path = entry / ELF_NAME
+        meta_path = entry / "memory.json"
+        if not elf_path.is_file() or not meta_path.is_file():
+            return None
+        try:
+            memory = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return CachedBuild(
+            key=key,
+            elf_path=elf_path,
+            memory={str(k): int(v) for k, v in memory.items()},
+        )
+
+    def store(self, key: str, elf_path: Path, memory: dict[str, int]) -> None:
+        """Stores one build; concurrent writers of the same key are harmless."""
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self.cache_dir / key
+        if entry.is_dir():
+            return
+        staging = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.cache_dir))
+        try:
+            shutil.copy2(elf_path, staging / ELF_NAME)
+            (staging / "memory.json").write_text(
+                json.dumps(memory, indent=2, sort_keys=True), encoding="utf-8"
+            )
+            os.replace(staging, entry)
+        except OSError:
+            if entry.is_dir():
+                return
+            raise
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+from typing import Sequence
+
+try:
+    import pandas as pd
+    _IMPORT_ERROR: Exception | None = None
+except ImportError as exc:  # pragma: no cover - runtime dependency
+    pd = None  # type: ignore[assignment]
+    _IMPORT_ERROR = exc
+
+from campaign_store import STORE_DIR_NAME
+from campaign_store import Columns
+from campaign_store import load_store
+from campaign_store import profile_rows
+from full_matrix_common import RECORD_FIELDS
+from full_matrix_common import BuildProfile
+from full_matrix_common import RecordBatch
+from full_matrix_common import SampleRecord
+from full_matrix_common import default_profiles
+from full_matrix_common import load_sample_manifest
+from full_matrix_common import manifest_entry_matches
+from full_matrix_common import parse_profile_names
+from full_matrix_common import resolve_samples_dir
+from full_matrix_common import validate_records
+from parse_cache import load_cached_frame
+from parse_cache import parse_cache_key
+from parse_cache import save_cached_frame
+from point_timing import DEFAULT_CLOCK_TOLERANCE
+from point_timing import profile_clock_rows
+from profile_space import planned_profiles
+from sample_loader import parse_sample_bytes
+from stats_engine import group_stats
+
+
+@dataclass(frozen=True)
+class CampaignData:
+    """Campaign samples loaded and validated once, shared by every report.
+
+    Args:
+        input_root: Matrix input root.
+        profiles: Selected profiles in report order.
+        profile_meta: `profile_meta.json` content by profile name.
+        df: One row per sample record (see `records_to_dicts`).
+        stats: Per profile/op/n statistics from `compute_stats`.
+        clock_rows: Per-run clock check rows (`CLOCK_CHECK_COLUMNS`).
+        clock_tolerance: Tolerance the clock rows were flagged with.
+    """
+
+    input_root: Path
+    profiles: tuple[BuildProfile, ...]
+    profile_meta: dict[str, dict[str, object]]
+    df: pd.DataFrame
+    stats: pd.DataFrame
+    clock_rows: list[dict[str, object]]
+    clock_tolerance: float
+
+    def data_profile_names(self) -> list[str]:
+        """Returns the selected profiles that have samples, in report order."""
+
+        present = set(self.stats["profile"])
+        return [profile.name for profile in self.profiles if profile.name in present]
+
+
+def select_profiles(input_root: Path, names: str) -> list[BuildProfile]:
+    """Resolves a comma-separated profile list, including planned profiles.
+
+    Raises:
+        ValueError: A name is neither a default nor a planned profile.
+    """
+
+    all_profiles = {**default_profiles(), **planned_profiles(input_root)}
+    selected: list[BuildProfile] = []
+    for name in parse_profile_names(names):
+        if name not in all_profiles:
+            raise ValueError(f"Unknown profile: {name}")
+        selected.append(all_profiles[name])
+    return selected
+
+
+def load_profile_meta(profile_dir: Path) -> dict[str, object]:
+    """Loads profile metadata generated by run_full_matrix."""
+
+    meta_file = profile_dir / "profile_meta.json"
+    if not meta_file.is_file():
+        return {}
+    return json.loads(meta_file.read_text(encoding="utf-8"))
+
+
+def records_to_dicts(
+    profile: str,
+    run_id: str,
+    records: Iterable[SampleRecord],
+) -> list[dict[str, object]]:
+    """Converts SampleRecord list into DataFrame-ready dict list."""
+
+    rows: list[dict[str, object]] = []
+    for rec in records:
+        rows.append(
+            {
+                "profile": profile,
+                "run_id": run_id,
+                "op": rec.op,
+                "n": rec.n,
+                "repeat": rec.repeat,
+                "warmup": rec.warmup,
+                "eigen_avg_cycles": rec.eigen_avg_cycles,
+                "cmsis_avg_cycles": rec.cmsis_avg_cycles,
+                "cmsis_over_eigen": rec.cmsis_over_eigen,
+                "eigen_over_cmsis": (1.0 / rec.cmsis_over_eigen) if rec.cmsis_over_eigen > 0 else float("inf"),
+                "error_l2": rec.error_l2,
+                "valid": rec.valid,
+                "invalid": rec.invalid,
+                "build_mode": rec.build_mode,
+            }
+        )
+    return rows
+
+
+def load_profile_runs(
+    profile: str,
+    profile_dir: Path,
+    strict: bool,
+    revalidate: bool = False,
+) -> pd.DataFrame:
+    """Loads all run CSV files for one profile.
+
+    The validated frame is cached in the samples directory (`parse_cache`),
+    keyed on the run files' names, sizes and mtimes; regenerating reports
+    from unchanged samples skips parsing and validation.
+
+    Args:
+        profile: Profile name (for example `C1`).
+        profile_dir: Directory containing `samples_release/`.
+        strict: Whether missing/incomplete data should fail fast.
+        revalidate: Whether to validate files the sample manifest already vouches
+            for; also bypasses (and refreshes) the parse cache.
+
+    Returns:
+        DataFrame with parsed benchmark rows.
+    """
+
+    samples_dir = resolve_samples_dir(profile_dir)
+    if not samples_dir.is_dir():
+        if strict:
+            raise FileNotFoundError(f"samples_release missing for {profile}: {samples_dir}")
+        return pd.DataFrame()
+
+    run_files = sorted(samples_dir.glob("run_*.csv"))
+    if not run_files:
+        if strict:
+            raise RuntimeError(f"No run_*.csv found for {profile} in {samples_dir}")
+        return pd.DataFrame()
+    # Stat before reading: a file rewritten meanwhile misses the cache next time.
+    cache_key = parse_cache_key(run_files)
+    if not revalidate:
+        cached = load_cached_frame(samples_dir, cache_key)
+        if cached is not None:
+            return with_derived_columns(cached, profile)
+    manifest = {} if revalidate else load_sample_manifest(samples_dir)
+    contents = [run_file.read_bytes() for run_file in run_files]
+    frame = parse_sample_bytes(contents, [f.stem for f in run_files], sources=run_files)
+    rows_by_run = frame.groupby("run_id", sort=False).indices
+    # Files whose bytes match the manifest were validated when committed.
+    for run_file, raw in zip(run_files, contents):
+        if not manifest_entry_matches(manifest.get(run_file.name), run_file, raw):
+            batch = frame_batch(frame.iloc[rows_by_run[run_file.stem]])
+            validate_records(batch, expected_repeat=batch.column("repeat")[0])
+    save_cached_frame(samples_dir, cache_key, frame)
+    return with_derived_columns(frame, profile)
+
+
+def frame_batch(frame: pd.DataFrame) -> RecordBatch:
+    """Returns the sample rows of a frame as a `RecordBatch`, column by column."""
+
+    return RecordBatch.from_columns({name: frame[name].to_numpy() for name in RECORD_FIELDS})
+
+
+def with_derived_columns(frame: pd.DataFrame, profile: str) -> pd.DataFrame:
+    """Adds the `profile` and `eigen_over_cmsis` columns to loaded samples.
+
+    The column order matches `records_to_dicts`.
+    """
+
+    frame.insert(0, "profile", profile)
+    ratio = frame["cmsis_over_eigen"]
+    frame.insert(
+        frame.columns.get_loc("error_l2"),
+        "eigen_over_cmsis",
+        (1.0 / ratio).where(ratio > 0, float("inf")),
+    )
+    return frame
+
+
+def store_profile_frame(
+    profile: str,
+    profile_dir: Path,
+    store: Columns,
+    revalidate: bool = False,
+) -> pd.DataFrame | None:
+    """Returns one profile's rows from the columnar campaign store.
+
+    Aliased profiles read the rows of the profile they alias. When raw run
+    files were exported, the store is only trusted while they name the same
+    runs and each still matches its sample manifest entry (size and mtime,
+    SHA-256 if the mtime moved); a file edited, replaced or added by hand
+    makes the caller fall back to parsing the files. Rows were validated when
+    captured; `revalidate` validates every run again.
+
+    Returns:
+        DataFrame shaped like `load_profile_runs`, or `None` when the store
+        does not cover the profile.
+    """
+
+    samples_dir = resolve_samples_dir(profile_dir)
+    rows = profile_rows(store, samples_dir.parent.name)
+    if not len(rows["run_id"]):
+        return None
+    run_files = sorted(samples_dir.glob("run_*.csv"))
+    if run_files:
+        if {run_file.stem for run_file in run_files} != set(rows["run_id"].tolist()):
+            return None
+        manifest = load_sample_manifest(samples_dir)
+        for run_file in run_files:
+            if not manifest_entry_matches(manifest.get(run_file.name), run_file):
+                return None
+    frame = pd.DataFrame(rows).drop(columns="profile")
+    if revalidate:
+        for indices in frame.groupby("run_id", sort=False).indices.values():
+            batch = frame_batch(frame.iloc[indices])
+            validate_records(batch, expected_repeat=batch.column("repeat")[0])
+    return with_derived_columns(frame, profile)
+
+
+def classify_leader(speedup: float, tolerance: float = 1e-6) -> str:
+    """Classifies winner by speedup (Eigen/CMSIS)."""
+
+    if abs(speedup - 1.0) <= tolerance:
+        return "Tie"
+    return "CMSIS" if speedup > 1.0 else "Eigen"
+
+
+def compute_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Computes mean/var/std/95%CI by profile/op/n.
+
+    This is the one stats frame of a campaign; every report reads its columns
+    from here instead of aggregating the samples again.
+    """
+
+    stats = group_stats(
+        df,
+        ["profile", "op", "n"],
+        {
+            "eigen": "eigen_avg_cycles",
+            "cmsis": "cmsis_avg_cycles",
+            "eigen_over_cmsis": "eigen_over_cmsis",
+            "cmsis_over_eigen": "cmsis_over_eigen",
+            "error": "error_l2",
+        },
+        maxima=("error",),
+    )
+    stats["leader"] = stats["eigen_over_cmsis_mean"].map(classify_leader)
+    return stats
+
+
+def load_campaign(
+    input_root: Path,
+    profiles: Sequence[BuildProfile],
+    strict: bool = False,
+    revalidate: bool = False,
+    clock_tolerance: float = DEFAULT_CLOCK_TOLERANCE,
+) -> CampaignData:
+    """Loads, validates and aggregates the selected profiles once.
+
+    Samples come from the columnar campaign store (`campaign_store`);
+    profiles it does not cover are parsed from their run files.
+
+    Args:
+        input_root: Root directory containing `<profile>/samples_release`.
+        profiles: Profiles to load, in report order.
+        strict: Fail on a profile without samples instead of skipping it.
+        revalidate: Validate every stored run, and every run file even when the
+            manifest vouches for it.
+        clock_tolerance: Relative HCLK deviation that flags a run.
+
+    Returns:
+        Samples, stats and clock checks shared by the report emitters.
+
+    Raises:
+        RuntimeError: pandas is missing, no profile has data, or a profile
+            has none under `strict`.
+    """
+
+    if pd is None:
+        raise RuntimeError(
+            "pandas is required. Install dependencies in benchmark_analysis first."
+        ) from _IMPORT_ERROR
+
+    frames: list[pd.DataFrame] = []
+    profile_meta: dict[str, dict[str, object]] = {}
+    clock_rows: list[dict[str, object]] = []
+    # Only the selected profiles and the profiles they alias are read.
+    store = load_store(
+        input_root / STORE_DIR_NAME,
+        {resolve_samples_dir(input_root / profile.name).parent.name for profile in profiles},
+    )
+    for profile in profiles:
+        profile_dir = input_root / profile.name
+        profile_meta[profile.name] = load_profile_meta(profile_dir)
+        frame = store_profile_frame(profile.name, profile_dir, store, revalidate=revalidate)
+        if frame is None:
+            frame = load_profile_runs(
+                profile.name, profile_dir, strict=strict, revalidate=revalidate
+            )
+        if not frame.empty:
+            frames.append(frame)
+            clock_rows.extend(
+                profile_clock_rows(
+                    profile.name,
+                    resolve_samples_dir(profile_dir),
+                    frame.to_dict("records"),
+                    tolerance=clock_tolerance,
+                )
+            )
+        elif strict:
+            raise RuntimeError(f"No data for profile {profile.name}")
+
+    if not frames:
+        raise RuntimeError("No benchmark data found.")
+    df = pd.concat(frames, ignore_index=True)
+    return CampaignData(
+        input_root=input_root,
+        profiles=tuple(profiles),
+        profile_meta=profile_meta,
+        df=df,
+        stats=compute_stats(df),
+        clock_rows=clock_rows,
+        clock_tolerance=clock_tolerance,
+    )
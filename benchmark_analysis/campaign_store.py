@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import argparse
+import io
+import shutil
+from pathlib import Path
+from typing import Collection
+from typing import Sequence
+
+try:
+    import numpy as np
+    _IMPORT_ERROR: Exception | None = None
+except ImportError as exc:  # pragma: no cover - runtime dependency
+    np = None  # type: ignore[assignment]
+    _IMPORT_ERROR = exc
+
+from full_matrix_common import RecordBatch
+from full_matrix_common import SampleRecord
+from full_matrix_common import atomic_write_bytes
+from full_matrix_common import commit_run_file
+from full_matrix_common import parse_profile_names
+from sample_loader import load_sample_files
+
+
+STORE_DIR_NAME = "campaign_store"
+STORE_SCHEMA_VERSION = 2
+# Runs of a profile merged by `compact_profile`; shards of the same run win over it.
+COMPACTED_NAME = "compacted.npz"
+# Typed columns of the store, in sample CSV order after the two keys.
+STORE_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("profile", "U"),
+    ("run_id", "U"),
+    ("op", "U"),
+    ("n", "i8"),
+    ("repeat", "i8"),
+    ("warmup", "i8"),
+    ("eigen_avg_cycles", "f8"),
+    ("cmsis_avg_cycles", "f8"),
+    ("cmsis_over_eigen", "f8"),
+    ("error_l2", "f8"),
+    ("valid", "i8"),
+    ("invalid", "i8"),
+    ("build_mode", "U"),
+)
+CSV_HEADER = (
+    "op,n,repeat,warmup,eigen_avg_cycles,cmsis_avg_cycles,cmsis_over_eigen,"
+    "error_l2,valid,invalid,build_mode"
+)
+
+Columns = dict[str, "np.ndarray"]
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError(
+            "numpy is required. Install dependencies in benchmark_analysis first."
+        ) from _IMPORT_ERROR
+
+
+def empty_columns() -> Columns:
+    """Returns a store with no rows."""
+
+    _require_numpy()
+    return {name: np.array([], dtype=dtype) for name, dtype in STORE_COLUMNS}
+
+
+def records_to_columns(profile: str, run_id: str, records: Sequence[SampleRecord]) -> Columns:
+    """Converts one run's records into typed store columns."""
+
+    _require_numpy()
+    if not isinstance(records, RecordBatch):
+        records = RecordBatch.from_records(records)
+    columns: Columns = {
+        "profile": np.array([profile] * len(records), dtype="U"),
+        "run_id": np.array([run_id] * len(records), dtype="U"),
+    }
+    for name, dtype in STORE_COLUMNS[2:]:
+        # Numeric batch columns are typed arrays, copied through the buffer protocol.
+        columns[name] = np.asarray(records.column(name), dtype=dtype)
+    return columns
+
+
+def _read_part(path: Path) -> Columns | None:
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["schema_version"]) != STORE_SCHEMA_VERSION:
+                return None
+            return {name: data[name] for name, _ in STORE_COLUMNS}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_part(path: Path, columns: Columns) -> None:
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        schema_version=np.array(STORE_SCHEMA_VERSION),
+        **{name: columns[name] for name, _ in STORE_COLUMNS},
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(path, buffer.getvalue())
+
+
+def _filter(columns: Columns, keep: "np.ndarray") -> Columns:
+    return {name: values[keep] for name, values in columns.items()}
+
+
+def _concat(parts: Sequence[Columns]) -> Columns:
+    if not parts:
+        return empty_columns()
+    return {name: np.concatenate([part[name] for part in parts]) for name, _ in STORE_COLUMNS}
+
+
+def _sorted_runs(columns: Columns) -> Columns:
+    # Keep runs grouped and ordered; lexsort is stable, so record order holds.
+    return _filter(columns, np.lexsort((columns["run_id"], columns["profile"])))
+
+
+def _shard_files(profile_dir: Path) -> list[Path]:
+    return sorted(profile_dir.glob("run_*.npz"))
+
+
+def load_profile(root: Path, profile: str) -> Columns:
+    """Loads the stored runs of one profile.
+
+    The compacted file and every per-run shard are concatenated; a shard
+    replaces the compacted rows of its run. Unreadable parts or parts of
+    another schema version are skipped, so their runs count as missing.
+
+    Returns:
+        Columns by name, grouped by run.
+    """
+
+    _require_numpy()
+    profile_dir = root / profile
+    shards = [part for part in map(_read_part, _shard_files(profile_dir)) if part is not None]
+    compacted = _read_part(profile_dir / COMPACTED_NAME)
+    if compacted is not None and shards:
+        replaced = np.concatenate([part["run_id"] for part in shards])
+        compacted = _filter(compacted, ~np.isin(compacted["run_id"], replaced))
+    parts = ([compacted] if compacted is not None else []) + shards
+    return _sorted_runs(_concat(parts))
+
+
+def load_store(root: Path, profiles: Collection[str] | None = None) -> Columns:
+    """Loads every column of a campaign store.
+
+    Args:
+        root: Store directory, `<build_root>/campaign_store`.
+        profiles: Profiles to load; default every stored profile.
+
+    Returns:
+        Columns by name; empty when nothing is stored (loaders then fall back
+        to the run files).
+    """
+
+    _require_numpy()
+    if not root.is_dir():
+        return empty_columns()
+    if profiles is None:
+        profiles = [path.name for path in root.iterdir() if path.is_dir()]
+    return _concat([load_profile(root, profile) for profile in sorted(profiles)])
+
+
+def append_run(root: Path, profile: str, run_id: str, records: Sequence[SampleRecord]) -> Path:
+    """Atomically adds (or replaces) one validated run as its own shard.
+
+    Only the run's shard `<root>/<profile>/<run_id>.npz` is written, so the
+    cost of a commit does not grow with the campaign and boards capturing
+    other profiles never touch the same file.
+
+    Returns:
+        The shard path.
+    """
+
+    _require_numpy()
+    shard = root / profile / f"{run_id}.npz"
+    _write_part(shard, records_to_columns(profile, run_id, records))
+    return shard
+
+
+def compact_profile(root: Path, profile: str) -> int:
+    """Merges a profile's shards into its compacted file and removes them.
+
+    A crash between the two steps leaves shards that repeat compacted runs,
+    which `load_profile` resolves in favour of the shards.
+
+    Returns:
+        Number of runs in the compacted file.
+    """
+
+    _require_numpy()
+    profile_dir = root / profile
+    shards = _shard_files(profile_dir)
+    if not shards:
+        columns = _read_part(profile_dir / COMPACTED_NAME)
+        return len(set(columns["run_id"].tolist())) if columns is not None else 0
+    columns = load_profile(root, profile)
+    _write_part(profile_dir / COMPACTED_NAME, columns)
+    for shard in shards:
+        shard.unlink(missing_ok=True)
+    return len(set(columns["run_id"].tolist()))
+
+
+def drop_profile(root: Path, profile: str) -> None:
+    """Removes every run of `profile` (its samples were discarded)."""
+
+    profile_dir = root / profile
+    if profile_dir.is_dir():
+        shutil.rmtree(profile_dir)
+
+
+def profile_rows(columns: Columns, profile: str) -> Columns:
+    """Returns the store rows of one profile."""
+
+    return _filter(columns, columns["profile"] == profile)
+
+
+def stored_runs(root: Path, profile: str) -> dict[str, RecordBatch]:
+    """Returns the stored runs of one profile as record batches, by run id."""
+
+    columns = load_profile(root, profile)
+    run_ids = columns["run_id"]
+    # Rows come grouped by run, so each run is one slice.
+    starts = np.flatnonzero(np.r_[True, run_ids[1:] != run_ids[:-1]]) if len(run_ids) else []
+    bounds = [*starts, len(run_ids)]
+    return {
+        str(run_ids[start]): RecordBatch.from_columns(
+            {name: columns[name][start:stop] for name, _ in STORE_COLUMNS[2:]}
+        )
+        for start, stop in zip(bounds, bounds[1:])
+    }
+
+
+def import_run_files(root: Path, input_root: Path, profiles: Sequence[str]) -> int:
+    """Rebuilds the stored runs of `profiles` from their run files.
+
+    For campaigns captured before the store existed, or with run files only.
+    Each profile is written as one compacted file. Aliased profiles have no
+    samples of their own and end up without rows.
+
+    Returns:
+        Number of runs imported.
+    """
+
+    _require_numpy()
+    imported = 0
+    for profile in profiles:
+        drop_profile(root, profile)
+        run_files = sorted((input_root / profile / "samples_release").glob("run_*.csv"))
+        if not run_files:
+            continue
+        frame = load_sample_files(run_files)
+        part: Columns = {"profile": np.full(len(frame), profile, dtype=f"U{len(profile)}")}
+        for name, dtype in STORE_COLUMNS[1:]:
+            part[name] = frame[name].to_numpy(dtype=dtype)
+        _write_part(root / profile / COMPACTED_NAME, _sorted_runs(part))
+        imported += len(run_files)
+    return imported
+
+
+def export_run_files(root: Path, output_root: Path, profiles: Sequence[str] | None = None) -> int:
+    """Writes the stored runs back out as raw `run_*.csv` text files.
+
+    The files are committed with manifest entries, like captured runs.
+
+    Returns:
+        Number of run files written.
+    """
+
+    columns = load_store(root, profiles)
+    written = 0
+    for profile in sorted(set(columns["profile"].tolist())):
+        rows = profile_rows(columns, profile)
+        samples_dir = output_root / profile / "samples_release"
+        for run_id in sorted(set(rows["run_id"].tolist())):
+            run = _filter(rows, rows["run_id"] == run_id)
+            lines = [CSV_HEADER]
+            for i in range(len(run["op"])):
+                # Shortest round-trip reprs: the export parses back to the same values.
+                lines.append(",".join(str(run[name][i].item()) for name, _ in STORE_COLUMNS[2:]))
+            lines.append("done")
+            content = ("\n".join(lines) + "\n").encode("utf-8")
+            commit_run_file(samples_dir, f"{run_id}.csv", content)
+            written += 1
+    return written
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses CLI args for store maintenance."""
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Import run files into, export them from, or compact the columnar campaign store."
+        )
+    )
+    parser.add_argument("--input-root", default="build/bench_matrix")
+    parser.add_argument("--profiles", default="C1,C2,C3,C4,C5,C6,C7,C8,C9,C10")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument(
+        "--import-runs", action="store_true", help="Rebuild the store from run_*.csv."
+    )
+    action.add_argument("--export", metavar="DIR", help="Write raw run_*.csv files under DIR.")
+    action.add_argument(
+        "--compact", action="store_true", help="Merge each profile's run shards into one file."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Entry point for store maintenance."""
+
+    args = parse_args()
+    repo_dir = Path(__file__).resolve().parents[1]
+    input_root = Path(args.input_root)
+    if not input_root.is_absolute():
+        input_root = repo_dir / input_root
+    store = input_root / STORE_DIR_NAME
+    profiles = parse_profile_names(args.profiles)
+    if args.import_runs:
+        count = import_run_files(store, input_root, profiles)
+        print(f"Imported {count} runs into {store}")
+    elif args.compact:
+        count = sum(compact_profile(store, profile) for profile in profiles)
+        print(f"Compacted {count} runs in {store}")
+    else:
+        count = export_run_files(store, Path(args.export), profiles)
+        print(f"Exported {count} run files to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
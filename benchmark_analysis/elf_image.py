@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+
+SHT_SYMTAB = 2
+SHT_NOBITS = 8
+SHF_ALLOC = 0x2
+PT_LOAD = 1
+FLASH_ERASED_BYTE = 0xFF
+
+
+@dataclass(frozen=True)
+class ElfSection:
+    """One ELF section header.
+
+    Args:
+        name: Section name (for example `.text`).
+        sh_type: Section type (`SHT_*`).
+        flags: Section flags (`SHF_*`).
+        addr: Load address.
+        offset: File offset of the section contents.
+        size: Section size in bytes.
+        link: Index of the associated section (string table of a symbol table).
+        entsize: Entry size for table sections, 0 if unspecified.
+    """
+
+    name: str
+    sh_type: int
+    flags: int
+    addr: int
+    offset: int
+    size: int
+    link: int = 0
+    entsize: int = 0
+
+
+def read_elf_sections(data: bytes) -> list[ElfSection]:
+    """Parses section headers from raw ELF bytes (ELF32/ELF64, either endianness)."""
+
+    if len(data) < 0x34 or data[:4] != b"\x7fELF":
+        raise ValueError("Not an ELF file.")
+    ei_class = data[4]
+    endian = "<" if data[5] == 1 else ">"
+    if ei_class == 1:
+        (e_shoff,) = struct.unpack_from(endian + "I", data, 0x20)
+        e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(endian + "HHH", data, 0x2E)
+        sh_fmt = endian + "IIIIIIIIII"
+    elif ei_class == 2:
+        (e_shoff,) = struct.unpack_from(endian + "Q", data, 0x28)
+        e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(endian + "HHH", data, 0x3A)
+        sh_fmt = endian + "IIQQQQIIQQ"
+    else:
+        raise ValueError(f"Unsupported ELF class: {ei_class}")
+
+    raw: list[tuple[int, ...]] = []
+    for index in range(e_shnum):
+        raw.append(struct.unpack_from(sh_fmt, data, e_shoff + index * e_shentsize))
+    if not raw:
+        return []
+
+    strtab_offset, strtab_size = raw[e_shstrndx][4], raw[e_shstrndx][5]
+    strtab = data[strtab_offset : strtab_offset + strtab_size]
+
+    sections: list[ElfSection] = []
+    for fields in raw:
+        name_end = strtab.find(b"\0", fields[0])
+        name = strtab[fields[0] : name_end if name_end >= 0 else None].decode("ascii", "replace")
+        sections.append(
+            ElfSection(
+                name=name,
+                sh_type=fields[1],
+                flags=fields[2],
+                addr=fields[3],
+                offset=fields[4],
+                size=fields[5],
+                link=fields[6],
+                entsize=fields[9],
+            )
+        )
+    return sections
+
+
+@dataclass(frozen=True)
+class ElfSegment:
+    """One ELF program header.
+
+    Args:
+        p_type: Segment type (`PT_*`).
+        offset: File offset of the segment contents.
+        vaddr: Run-time address.
+        paddr: Load address (where the bytes are programmed).
+        filesz: Bytes present in the file.
+        memsz: Bytes occupied in memory.
+    """
+
+    p_type: int
+    offset: int
+    vaddr: int
+    paddr: int
+    filesz: int
+    memsz: int
+
+
+def read_elf_segments(data: bytes) -> list[ElfSegment]:
+    """Parses program headers from raw ELF bytes (ELF32/ELF64, either endianness)."""
+
+    if len(data) < 0x34 or data[:4] != b"\x7fELF":
+        raise ValueError("Not an ELF file.")
+    ei_class = data[4]
+    endian = "<" if data[5] == 1 else ">"
+    if ei_class == 1:
+        (e_phoff,) = struct.unpack_from(endian + "I", data, 0x1C)
+        e_phentsize, e_phnum = struct.unpack_from(endian + "HH", data, 0x2A)
+        segments = []
+        for index in range(e_phnum):
+            p_type, offset, vaddr, paddr, filesz, memsz, _, _ = struct.unpack_from(
+                endian + "8I", data, e_phoff + index * e_phentsize
+            )
+            segments.append(ElfSegment(p_type, offset, vaddr, paddr, filesz, memsz))
+        return segments
+    if ei_class == 2:
+        (e_phoff,) = struct.unpack_from(endian + "Q", data, 0x20)
+        e_phentsize, e_phnum = struct.unpack_from(endian + "HH", data, 0x36)
+        segments = []
+        for index in range(e_phnum):
+            p_type, _, offset, vaddr, paddr, filesz, memsz, _ = struct.unpack_from(
+                endian + "IIQQQQQQ", data, e_phoff + index * e_phentsize
+            )
+            segments.append(ElfSegment(p_type, offset, vaddr, paddr, filesz, memsz))
+        return segments
+    raise ValueError(f"Unsupported ELF class: {ei_class}")
+
+
+def elf_load_image(data: bytes) -> tuple[int, bytes]:
+    """Returns the bytes a probe programs for this ELF, as one contiguous block.
+
+    Covers the file contents of every `PT_LOAD` segment at its load address
+    (so `.data` initializers appear at their flash location); gaps are filled
+    with the erased flash value.
+
+    Returns:
+        `(base_address, image)`.
+    """
+
+    loaded = [s for s in read_elf_segments(data) if s.p_type == PT_LOAD and s.filesz > 0]
+    if not loaded:
+        raise ValueError("ELF has no loadable contents.")
+    base = min(s.paddr for s in loaded)
+    end = max(s.paddr + s.filesz for s in loaded)
+    image = bytearray([FLASH_ERASED_BYTE]) * (end - base)
+    for segment in loaded:
+        start = segment.paddr - base
+        image[start : start + segment.filesz] = data[
+            segment.offset : segment.offset + segment.filesz
+        ]
+    return base, bytes(image)
+
+
+def read_elf_symbols(data: bytes) -> dict[str, int]:
+    """Returns `{name: value}` for the named symbols in the ELF's symbol tables.
+
+    C++ symbols are returned mangled; `extern "C"` objects keep their plain name.
+    """
+
+    if len(data) < 0x34 or data[:4] != b"\x7fELF":
+        raise ValueError("Not an ELF file.")
+    ei_class = data[4]
+    endian = "<" if data[5] == 1 else ">"
+    if ei_class == 1:
+        sym_fmt, default_entsize = endian + "IIIBBH", 16
+    elif ei_class == 2:
+        sym_fmt, default_entsize = endian + "IBBHQQ", 24
+    else:
+        raise ValueError(f"Unsupported ELF class: {ei_class}")
+
+    sections = read_elf_sections(data)
+    symbols: dict[str, int] = {}
+    for section in sections:
+        if section.sh_type != SHT_SYMTAB or section.link >= len(sections):
+            continue
+        names = sections[section.link]
+        strtab = data[names.offset : names.offset + names.size]
+        entsize = section.entsize or default_entsize
+        for offset in range(section.offset, section.offset + section.size, entsize):
+            fields = struct.unpack_from(sym_fmt, data, offset)
+            name_offset = fields[0]
+            value = fields[1] if ei_class == 1 else fields[4]
+            if name_offset == 0:
+                continue
+            name_end = strtab.find(b"\0", name_offset)
+            name = strtab[name_offset : name_end if name_end >= 0 else None]
+            symbols[name.decode("ascii", "replace")] = value
+    return symbols
+
+
+def elf_image_digest(elf_path: Path) -> str:
+    """Hashes the loadable image of an ELF.
+
+    Covers every `SHF_ALLOC` section (name, address, size and, unless it is
+    `NOBITS`, contents). Debug info, symbol tables and other non-loaded sections
+    are ignored, so two builds that only differ in `-g` level hash equal.
+
+    Returns:
+        Hex SHA-256 digest.
+    """
+
+    data = elf_path.read_bytes()
+    digest = hashlib.sha256()
+    loaded = [s for s in read_elf_sections(data) if s.flags & SHF_ALLOC]
+    for section in sorted(loaded, key=lambda s: (s.addr, s.name)):
+        digest.update(f"{section.name}:{section.addr:x}:{section.size:x}\n".encode("ascii"))
+        if section.sh_type != SHT_NOBITS:
+            digest.update(data[section.offset : section.offset + section.size])
+    return digest.hexdigest()
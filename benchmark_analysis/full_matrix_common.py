@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import asdict
 from dataclasses import dataclass
+from dataclasses import fields
+import hashlib
+from itertools import compress
+import json
 import math
+import os
 from pathlib import Path
 from typing import Iterable
 from typing import Mapping
@@ -11,6 +17,19 @@ from typing import Sequence
 
 EXPECTED_MUL_SIZES: tuple[int, ...] = (3, 4, 6, 8, 10, 16, 32, 64)
 EXPECTED_INV_SIZES: tuple[int, ...] = (3, 4, 6, 8, 10)
+# Firmware prints every mul size, then every inv size, in ascending order.
+EXPECTED_RECORD_ORDER: tuple[tuple[str, int], ...] = tuple(
+    [("mul", n) for n in EXPECTED_MUL_SIZES] + [("inv", n) for n in EXPECTED_INV_SIZES]
+)
+ERROR_L2_THRESHOLD = 1e-4
+# PLAN.md: HCLK locked at the STM32F407 maximum; DWT counts at this rate.
+NOMINAL_HCLK_HZ = 168_000_000
+SAMPLE_MANIFEST_NAME = "sample_manifest.json"
+SAMPLE_MANIFEST_VERSION = 1
+# Mean |eigen/cmsis| curve difference above which a profile counts as
+# distinctive, both for the profile scheduler and the report's retention
+# priority section.
+DISTINCT_CURVE_DIFF = 0.18
 
 
 @dataclass(frozen=True)
@@ -32,6 +51,19 @@ class BuildProfile:
     uses_lto: bool
 
 
+@dataclass(frozen=True)
+class BoardTarget:
+    """Identifies one benchmark board attached to the host.
+
+    Args:
+        port: Serial device path of the board CDC port (for example `/dev/ttyACM0`).
+        jlink_serial: J-Link probe serial number, `None` to let JLinkExe pick.
+    """
+
+    port: str
+    jlink_serial: str | None = None
+
+
 @dataclass(frozen=True)
 class RunConfig:
     """Runtime configuration for the full-matrix benchmark pipeline.
@@ -42,6 +74,7 @@ class RunConfig:
         serial_port: Serial device path (for example `/dev/ttyACM0`).
         runs: Number of outer runs to collect.
         timeout_sec: Capture timeout in seconds.
+        boards: Boards used for flashing/capture; one profile runs per board at a time.
     """
 
     repo_dir: Path
@@ -49,6 +82,7 @@ class RunConfig:
     serial_port: str
     runs: int
     timeout_sec: int
+    boards: tuple[BoardTarget, ...] = ()
 
 
 @dataclass(frozen=True)
@@ -68,6 +102,158 @@ class SampleRecord:
     build_mode: str
 
 
+RECORD_FIELDS: tuple[str, ...] = tuple(field.name for field in fields(SampleRecord))
+_INT_FIELDS = ("n", "repeat", "warmup", "valid", "invalid")
+_FLOAT_FIELDS = ("eigen_avg_cycles", "cmsis_avg_cycles", "cmsis_over_eigen", "error_l2")
+_STR_FIELDS = ("op", "build_mode")
+
+
+class RecordBatch(Sequence[SampleRecord]):
+    """Column-oriented benchmark records: one typed array per `SampleRecord` field.
+
+    Integer fields are `array('q')` and float fields `array('d')`; `op` and
+    `build_mode` are `array('B')` codes into per-batch tables of interned
+    strings. Indexing or iterating yields `SampleRecord` views built on
+    demand, so code written against record lists keeps working, while
+    validation and loaders work on whole columns.
+    """
+
+    def __init__(self) -> None:
+        self._numbers: dict[str, array] = {name: array("q") for name in _INT_FIELDS}
+        self._numbers.update({name: array("d") for name in _FLOAT_FIELDS})
+        self._codes: dict[str, array] = {name: array("B") for name in _STR_FIELDS}
+        self._tables: dict[str, list[str]] = {name: [] for name in _STR_FIELDS}
+        self._lookup: dict[str, dict[str, int]] = {name: {} for name in _STR_FIELDS}
+
+    @classmethod
+    def from_records(cls, records: Iterable[SampleRecord]) -> RecordBatch:
+        """Builds a batch from record objects."""
+
+        batch = cls()
+        for rec in records:
+            batch.append(rec)
+        return batch
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Iterable[object]]) -> RecordBatch:
+        """Builds a batch from one sequence per field.
+
+        Numeric columns that expose a buffer (`numpy` arrays) are copied as
+        raw bytes instead of item by item.
+        """
+
+        batch = cls()
+        for name, column in batch._numbers.items():
+            values = columns[name]
+            if hasattr(values, "astype") and hasattr(values, "tobytes"):
+                column.frombytes(values.astype(column.typecode).tobytes())
+            else:
+                column.extend(values)
+        for name in _STR_FIELDS:
+            values = columns[name]
+            codes = batch._codes[name]
+            for value in values.tolist() if hasattr(values, "tolist") else values:
+                codes.append(batch._intern(name, str(value)))
+        sizes = {len(column) for column in (*batch._numbers.values(), *batch._codes.values())}
+        if len(sizes) > 1:
+            raise ValueError(f"Columns differ in length: {sorted(sizes)}.")
+        return batch
+
+    def _intern(self, name: str, value: str) -> int:
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = len(self._tables[name])
+            if code > 255:
+                raise ValueError(f"Too many distinct {name} values in one batch.")
+            lookup[value] = code
+            self._tables[name].append(value)
+        return code
+
+    def append(self, rec: SampleRecord) -> None:
+        """Appends one record."""
+
+        for name, column in self._numbers.items():
+            column.append(getattr(rec, name))
+        for name in _STR_FIELDS:
+            self._codes[name].append(self._intern(name, getattr(rec, name)))
+
+    def append_fields(self, cols: Sequence[str]) -> None:
+        """Appends one record from its 11 CSV fields (BOM already stripped)."""
+
+        numbers = self._numbers
+        numbers["n"].append(int(cols[1]))
+        numbers["repeat"].append(int(cols[2]))
+        numbers["warmup"].append(int(cols[3]))
+        numbers["eigen_avg_cycles"].append(float(cols[4]))
+        numbers["cmsis_avg_cycles"].append(float(cols[5]))
+        numbers["cmsis_over_eigen"].append(float(cols[6]))
+        numbers["error_l2"].append(float(cols[7]))
+        numbers["valid"].append(int(cols[8]))
+        numbers["invalid"].append(int(cols[9]))
+        self._codes["op"].append(self._intern("op", cols[0]))
+        self._codes["build_mode"].append(self._intern("build_mode", cols[10]))
+
+    def column(self, name: str) -> array | list[str]:
+        """Returns one field: the typed array, or decoded strings for `op`/`build_mode`."""
+
+        if name in self._codes:
+            table = self._tables[name]
+            return [table[code] for code in self._codes[name]]
+        return self._numbers[name]
+
+    def where_op(self, name: str, op: str) -> list[object]:
+        """Returns the values of field `name` for the records of operation `op`."""
+
+        code = self._lookup["op"].get(op)
+        if code is None:
+            return []
+        return list(compress(self._numbers[name], map(code.__eq__, self._codes["op"])))
+
+    def first_invalid(self, expected_repeat: int) -> int | None:
+        """Returns the index of the first record failing `validate_record`, if any.
+
+        Applies the same three checks straight to the columns, without
+        building a `SampleRecord` per row.
+        """
+
+        columns = (
+            self._numbers["repeat"],
+            self._numbers["valid"],
+            self._numbers["invalid"],
+            self._numbers["error_l2"],
+        )
+        for i, (rep, ok, bad, err) in enumerate(zip(*columns)):
+            if rep != expected_repeat or ok + bad != rep or err > ERROR_L2_THRESHOLD:
+                return i
+        return None
+
+    def __len__(self) -> int:
+        return len(self._codes["op"])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RecordBatch.from_records(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RecordBatch index out of range")
+        values = {name: column[index] for name, column in self._numbers.items()}
+        for name in _STR_FIELDS:
+            values[name] = self._tables[name][self._codes[name][index]]
+        return SampleRecord(**values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"RecordBatch({len(self)} records)"
+
+
 def default_profiles() -> dict[str, BuildProfile]:
     """Returns the fixed C1~C10 profile matrix from PLAN.md."""
 
@@ -157,14 +343,161 @@ def parse_profile_names(text: str) -> list[str]:
     return [name.strip().upper() for name in text.split(",") if name.strip()]
 
 
-def parse_csv_record_line(line: str) -> SampleRecord | None:
-    """Parses a CSV benchmark line.
+def parse_board_targets(text: str) -> list[BoardTarget]:
+    """Parses a comma-separated `PORT[=JLINK_SERIAL]` board list.
+
+    Args:
+        text: Board list, for example `/dev/ttyACM0=000683000001,/dev/ttyACM1=000683000002`.
+
+    Returns:
+        Parsed boards in input order.
+    """
+
+    boards: list[BoardTarget] = []
+    seen_ports: set[str] = set()
+    seen_serials: set[str] = set()
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        port, sep, jlink_serial = item.partition("=")
+        port = port.strip()
+        jlink_serial = jlink_serial.strip()
+        if not port or (sep and not jlink_serial):
+            raise ValueError(f"Invalid board spec: {item!r}, expected PORT[=JLINK_SERIAL].")
+        if port in seen_ports:
+            raise ValueError(f"Duplicate board port: {port}")
+        if jlink_serial and jlink_serial in seen_serials:
+            raise ValueError(f"Duplicate J-Link serial: {jlink_serial}")
+        seen_ports.add(port)
+        if jlink_serial:
+            seen_serials.add(jlink_serial)
+        boards.append(BoardTarget(port=port, jlink_serial=jlink_serial or None))
+    return boards
+
+
+def resolve_samples_dir(profile_dir: Path) -> Path:
+    """Returns the `samples_release` directory holding a profile's runs.
+
+    Profiles recorded as aliases (`alias_of` in `profile_meta.json`, written when
+    their firmware image is identical to an earlier profile) reuse the samples
+    of the aliased profile.
+    """
+
+    marker = profile_dir / "profile_meta.json"
+    if marker.is_file():
+        try:
+            meta = json.loads(marker.read_text(encoding="utf-8"))
+        except ValueError:
+            meta = {}
+        alias_of = meta.get("alias_of") if isinstance(meta, dict) else None
+        if alias_of:
+            return profile_dir.parent / str(alias_of) / "samples_release"
+    return profile_dir / "samples_release"
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Writes a file via a temporary sibling and `os.replace`."""
+
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def load_sample_manifest(samples_dir: Path) -> dict[str, dict[str, object]]:
+    """Loads the per-profile sample manifest.
+
+    Returns:
+        Mapping from run file name to `{"size", "sha256"}`; empty when the
+        manifest is missing, corrupt or of another version.
+    """
+
+    path = samples_dir / SAMPLE_MANIFEST_NAME
+    if not path.is_file():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict) or data.get("version") != SAMPLE_MANIFEST_VERSION:
+        return {}
+    runs = data.get("runs")
+    return runs if isinstance(runs, dict) else {}
+
+
+def commit_run_file(samples_dir: Path, file_name: str, content: bytes) -> Path:
+    """Atomically writes one validated run file and records it in the manifest.
+
+    Only runs that passed `validate_records` should be committed: a manifest
+    entry vouches for the file so resume and report loaders can skip reparsing.
+    """
+
+    samples_dir.mkdir(parents=True, exist_ok=True)
+    file_path = samples_dir / file_name
+    atomic_write_bytes(file_path, content)
+
+    runs = load_sample_manifest(samples_dir)
+    runs[file_name] = {
+        "size": len(content),
+        "mtime_ns": file_path.stat().st_mtime_ns,
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+    manifest = {
+        "version": SAMPLE_MANIFEST_VERSION,
+        "runs": dict(sorted(runs.items())),
+    }
+    atomic_write_bytes(
+        samples_dir / SAMPLE_MANIFEST_NAME,
+        json.dumps(manifest, indent=2).encode("utf-8"),
+    )
+    return file_path
+
+
+def manifest_entry_matches(
+    entry: Mapping[str, object] | None,
+    run_file: Path,
+    content: bytes | None = None,
+) -> bool:
+    """Checks a run file against its manifest entry.
+
+    Args:
+        entry: Manifest entry for the file, or `None`.
+        run_file: Run file path.
+        content: File bytes if already read. Without them, a file whose size
+            and `mtime_ns` both match is accepted on one `stat`; otherwise
+            (an in-place rewrite, a copy, or an entry without `mtime_ns`)
+            the file is read and its SHA-256 compared.
+    """
+
+    if not entry:
+        return False
+    if content is None:
+        try:
+            stat = run_file.stat()
+        except OSError:
+            return False
+        if stat.st_size != entry.get("size"):
+            return False
+        if stat.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        try:
+            content = run_file.read_bytes()
+        except OSError:
+            return False
+    if len(content) != entry.get("size"):
+        return False
+    return hashlib.sha256(content).hexdigest() == entry.get("sha256")
+
+
+def split_record_line(line: str) -> list[str] | None:
+    """Splits a CSV benchmark line into its 11 fields.
 
     Args:
         line: Raw input line.
 
     Returns:
-        Parsed `SampleRecord` for valid data lines, otherwise `None`.
+        Fields with the BOM stripped from the first one for record lines;
+        `None` for blank lines, `done`, the header and lines of another width.
     """
 
     stripped = line.strip()
@@ -174,14 +507,30 @@ def parse_csv_record_line(line: str) -> SampleRecord | None:
         return None
 
     cols = stripped.split(",")
-    first = cols[0].lstrip("\ufeff")
-    if first == "op":
+    cols[0] = cols[0].lstrip("\ufeff")
+    if cols[0] == "op":
         return None
     if len(cols) != 11:
         return None
+    return cols
+
+
+def parse_csv_record_line(line: str) -> SampleRecord | None:
+    """Parses a CSV benchmark line.
+
+    Args:
+        line: Raw input line.
+
+    Returns:
+        Parsed `SampleRecord` for valid data lines, otherwise `None`.
+    """
+
+    cols = split_record_line(line)
+    if cols is None:
+        return None
 
     return SampleRecord(
-        op=first,
+        op=cols[0],
         n=int(cols[1]),
         repeat=int(cols[2]),
         warmup=int(cols[3]),
@@ -195,17 +544,21 @@ def parse_csv_record_line(line: str) -> SampleRecord | None:
     )
 
 
-def parse_run_lines(lines: Iterable[str]) -> list[SampleRecord]:
-    """Parses one benchmark run text block into records."""
+def parse_run_lines(lines: Iterable[str]) -> RecordBatch:
+    """Parses one benchmark run text block into a record batch.
 
-    records: list[SampleRecord] = []
+    Fields go straight into the batch columns; no per-line record object is
+    built.
+    """
+
+    batch = RecordBatch()
     for line in lines:
-        rec = parse_csv_record_line(line)
-        if rec is not None:
-            records.append(rec)
-    if not records:
+        cols = split_record_line(line)
+        if cols is not None:
+            batch.append_fields(cols)
+    if not batch:
         raise ValueError("No valid benchmark records found in run content.")
-    return records
+    return batch
 
 
 def split_serial_into_runs(lines: Sequence[str], expected_runs: int) -> list[list[str]]:
@@ -240,15 +593,19 @@ def validate_records(records: Sequence[SampleRecord], expected_repeat: int) -> N
     - `repeat` consistency.
     - `valid + invalid == repeat`.
     - `error_l2 <= 1e-4`.
+
+    The checks run over the columns of a `RecordBatch` (plain record lists
+    are converted); the first failing record is reported like `validate_record`.
     """
 
     if expected_repeat <= 0:
         raise ValueError("expected_repeat must be positive.")
     if not records:
         raise ValueError("No benchmark records to validate.")
+    batch = records if isinstance(records, RecordBatch) else RecordBatch.from_records(records)
 
-    mul_sizes = sorted([r.n for r in records if r.op == "mul"])
-    inv_sizes = sorted([r.n for r in records if r.op == "inv"])
+    mul_sizes = sorted(batch.where_op("n", "mul"))
+    inv_sizes = sorted(batch.where_op("n", "inv"))
     if tuple(mul_sizes) != EXPECTED_MUL_SIZES:
         raise ValueError(
             f"Unexpected mul sizes: {mul_sizes}, expected {list(EXPECTED_MUL_SIZES)}."
@@ -258,21 +615,101 @@ def validate_records(records: Sequence[SampleRecord], expected_repeat: int) -> N
             f"Unexpected inv sizes: {inv_sizes}, expected {list(EXPECTED_INV_SIZES)}."
         )
 
-    for rec in records:
-        if rec.repeat != expected_repeat:
+    index = batch.first_invalid(expected_repeat)
+    if index is not None:
+        validate_record(batch[index], expected_repeat)
+
+
+def validate_record(rec: SampleRecord, expected_repeat: int) -> None:
+    """Checks `repeat`, `valid + invalid == repeat` and `error_l2` for one record."""
+
+    if rec.repeat != expected_repeat:
+        raise ValueError(
+            f"Unexpected repeat value for {rec.op}-{rec.n}: {rec.repeat}, "
+            f"expected {expected_repeat}."
+        )
+    if rec.valid + rec.invalid != rec.repeat:
+        raise ValueError(
+            f"Invalid valid/invalid sum for {rec.op}-{rec.n}: "
+            f"{rec.valid}+{rec.invalid}!={rec.repeat}."
+        )
+    if rec.error_l2 > ERROR_L2_THRESHOLD:
+        raise ValueError(
+            f"error_l2 out of threshold for {rec.op}-{rec.n}: {rec.error_l2}."
+        )
+
+
+class StreamingRunValidator:
+    """Validates one run line by line while it is being captured.
+
+    Applies the `validate_records` rules as each record arrives, plus the
+    firmware print order (`EXPECTED_RECORD_ORDER`), so a bad run fails on its
+    first offending line instead of at `done`.
+
+    Args:
+        expected_repeat: Required `repeat`; `None` takes it from the first record.
+    """
+
+    def __init__(self, expected_repeat: int | None = None) -> None:
+        self._expected_repeat = expected_repeat
+        self.reset()
+
+    def reset(self) -> None:
+        """Starts a new run."""
+
+        self._repeat = self._expected_repeat
+        self.records = RecordBatch()
+
+    def feed(self, line: str) -> SampleRecord | None:
+        """Parses and checks one line.
+
+        Returns:
+            The parsed record, or `None` for non-record lines (header, `done`, noise).
+
+        Raises:
+            ValueError: The record is malformed, out of order or fails validation.
+        """
+
+        try:
+            rec = parse_csv_record_line(line)
+        except ValueError as exc:
+            raise ValueError(f"Malformed benchmark record {line.strip()!r}: {exc}") from exc
+        if rec is None:
+            return None
+
+        position = len(self.records)
+        if position >= len(EXPECTED_RECORD_ORDER):
             raise ValueError(
-                f"Unexpected repeat value for {rec.op}-{rec.n}: {rec.repeat}, "
-                f"expected {expected_repeat}."
+                f"Unexpected extra record {rec.op}-{rec.n} after "
+                f"{len(EXPECTED_RECORD_ORDER)} records."
             )
-        if rec.valid + rec.invalid != rec.repeat:
+        op, n = EXPECTED_RECORD_ORDER[position]
+        if (rec.op, rec.n) != (op, n):
             raise ValueError(
-                f"Invalid valid/invalid sum for {rec.op}-{rec.n}: "
-                f"{rec.valid}+{rec.invalid}!={rec.repeat}."
+                f"Out-of-order record {rec.op}-{rec.n} at position {position + 1}, "
+                f"expected {op}-{n}."
             )
-        if rec.error_l2 > 1e-4:
+        if self._repeat is None:
+            self._repeat = rec.repeat
+        validate_record(rec, self._repeat)
+        self.records.append(rec)
+        return rec
+
+    def finish(self) -> RecordBatch:
+        """Ends the run (at `done`) and returns its records.
+
+        Raises:
+            ValueError: Records are missing.
+        """
+
+        if len(self.records) != len(EXPECTED_RECORD_ORDER):
+            missing = [f"{op}-{n}" for op, n in EXPECTED_RECORD_ORDER[len(self.records) :]]
             raise ValueError(
-                f"error_l2 out of threshold for {rec.op}-{rec.n}: {rec.error_l2}."
+                f"Run ended after {len(self.records)} records, missing {', '.join(missing)}."
             )
+        records = self.records
+        self.reset()
+        return records
 
 
 def detect_crossover(pairs: Sequence[tuple[int, float]]) -> int | None:
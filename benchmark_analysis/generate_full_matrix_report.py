@@ -1,13 +1,11 @@
 from __future__ import annotations
 
 import argparse
-import json
 import math
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
-from typing import Iterable
 from typing import Sequence
 
 try:
@@ -19,15 +17,18 @@ except ImportError as exc:  # pragma: no cover - runtime dependency
     pd = None  # type: ignore[assignment]
     _IMPORT_ERROR = exc
 
+from campaign_data import CampaignData
+from campaign_data import load_campaign
+from campaign_data import select_profiles
 from full_matrix_common import BuildProfile
+from full_matrix_common import DISTINCT_CURVE_DIFF
 from full_matrix_common import EXPECTED_INV_SIZES
 from full_matrix_common import EXPECTED_MUL_SIZES
-from full_matrix_common import SampleRecord
-from full_matrix_common import default_profiles
+from full_matrix_common import NOMINAL_HCLK_HZ
 from full_matrix_common import detect_crossover
-from full_matrix_common import parse_profile_names
-from full_matrix_common import parse_run_lines
-from full_matrix_common import validate_records
+from point_timing import CLOCK_CHECK_COLUMNS
+from point_timing import DEFAULT_CLOCK_TOLERANCE
+from stats_engine import group_stats
 
 
 @dataclass(frozen=True)
@@ -61,6 +62,17 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--profiles", default="C1,C2,C3,C4,C5,C6,C7,C8,C9,C10")
     parser.add_argument("--strict", action="store_true")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Validate every run file even when the sample manifest vouches for it.",
+    )
+    parser.add_argument(
+        "--clock-tolerance",
+        type=float,
+        default=DEFAULT_CLOCK_TOLERANCE,
+        help="Flag runs whose implied core clock deviates from the nominal HCLK by more than this fraction.",
+    )
     return parser.parse_args()
 
 
@@ -82,110 +94,6 @@ def build_paths(args: argparse.Namespace) -> ReportPaths:
     )
 
 
-def load_profile_meta(profile_dir: Path) -> dict[str, object]:
-    """Loads profile metadata generated by run_full_matrix."""
-
-    meta_file = profile_dir / "profile_meta.json"
-    if not meta_file.is_file():
-        return {}
-    return json.loads(meta_file.read_text(encoding="utf-8"))
-
-
-def records_to_dicts(
-    profile: str,
-    run_id: str,
-    records: Iterable[SampleRecord],
-) -> list[dict[str, object]]:
-    """Converts SampleRecord list into DataFrame-ready dict list."""
-
-    rows: list[dict[str, object]] = []
-    for rec in records:
-        rows.append(
-            {
-                "profile": profile,
-                "run_id": run_id,
-                "op": rec.op,
-                "n": rec.n,
-                "repeat": rec.repeat,
-                "warmup": rec.warmup,
-                "eigen_avg_cycles": rec.eigen_avg_cycles,
-                "cmsis_avg_cycles": rec.cmsis_avg_cycles,
-                "cmsis_over_eigen": rec.cmsis_over_eigen,
-                "eigen_over_cmsis": (1.0 / rec.cmsis_over_eigen) if rec.cmsis_over_eigen > 0 else float("inf"),
-                "error_l2": rec.error_l2,
-                "valid": rec.valid,
-                "invalid": rec.invalid,
-                "build_mode": rec.build_mode,
-            }
-        )
-    return rows
-
-
-def load_profile_runs(profile: str, profile_dir: Path, strict: bool) -> pd.DataFrame:
-    """Loads all run_*.csv for one profile."""
-
-    samples_dir = profile_dir / "samples_release"
-    if not samples_dir.is_dir():
-        if strict:
-            raise FileNotFoundError(f"samples_release missing for {profile}: {samples_dir}")
-        return pd.DataFrame()
-
-    rows: list[dict[str, object]] = []
-    run_files = sorted(samples_dir.glob("run_*.csv"))
-    if not run_files and strict:
-        raise RuntimeError(f"No run_*.csv found for {profile} in {samples_dir}")
-
-    for run_file in run_files:
-        lines = run_file.read_text(encoding="utf-8", errors="ignore").splitlines()
-        records = parse_run_lines(lines)
-        validate_records(records, expected_repeat=records[0].repeat)
-        rows.extend(records_to_dicts(profile, run_file.stem, records))
-
-    if not rows:
-        return pd.DataFrame()
-    return pd.DataFrame(rows)
-
-
-def compute_stats(df: pd.DataFrame) -> pd.DataFrame:
-    """Computes mean/var/std/95%CI by profile/op/n."""
-
-    group = df.groupby(["profile", "op", "n"], as_index=False)
-    stats = group.agg(
-        runs=("run_id", "nunique"),
-        eigen_mean=("eigen_avg_cycles", "mean"),
-        eigen_var=("eigen_avg_cycles", "var"),
-        eigen_std=("eigen_avg_cycles", "std"),
-        cmsis_mean=("cmsis_avg_cycles", "mean"),
-        cmsis_var=("cmsis_avg_cycles", "var"),
-        cmsis_std=("cmsis_avg_cycles", "std"),
-        eigen_over_cmsis_mean=("eigen_over_cmsis", "mean"),
-        eigen_over_cmsis_var=("eigen_over_cmsis", "var"),
-        eigen_over_cmsis_std=("eigen_over_cmsis", "std"),
-        cmsis_over_eigen_mean=("cmsis_over_eigen", "mean"),
-        cmsis_over_eigen_var=("cmsis_over_eigen", "var"),
-        cmsis_over_eigen_std=("cmsis_over_eigen", "std"),
-        error_mean=("error_l2", "mean"),
-        error_var=("error_l2", "var"),
-        error_std=("error_l2", "std"),
-    )
-    stats["ci_mult"] = stats["runs"].apply(lambda n: 1.96 / math.sqrt(n))
-    stats["eigen_ci"] = stats["eigen_std"] * stats["ci_mult"]
-    stats["cmsis_ci"] = stats["cmsis_std"] * stats["ci_mult"]
-    stats["eigen_over_cmsis_ci"] = stats["eigen_over_cmsis_std"] * stats["ci_mult"]
-    stats["cmsis_over_eigen_ci"] = stats["cmsis_over_eigen_std"] * stats["ci_mult"]
-    stats["error_ci"] = stats["error_std"] * stats["ci_mult"]
-    stats["leader"] = stats["eigen_over_cmsis_mean"].apply(classify_leader)
-    return stats
-
-
-def classify_leader(speedup: float, tolerance: float = 1e-6) -> str:
-    """Classifies winner by speedup (Eigen/CMSIS)."""
-
-    if abs(speedup - 1.0) <= tolerance:
-        return "Tie"
-    return "CMSIS" if speedup > 1.0 else "Eigen"
-
-
 def to_cmsis_over_eigen(speedup: float) -> float:
     """Converts speedup (Eigen/CMSIS) to CMSIS/Eigen."""
 
@@ -548,7 +456,7 @@ def build_profile_priority_section(stats: pd.DataFrame, profiles: Sequence[str])
             if profile in keep:
                 continue
             diff = _mean_curve_diff(stats, profile, "C1")
-            if not math.isnan(diff) and diff >= 0.18:
+            if not math.isnan(diff) and diff >= DISTINCT_CURVE_DIFF:
                 keep.append(profile)
 
     # Deduplicate while preserving order.
@@ -647,12 +555,10 @@ def build_analysis_section(stats: pd.DataFrame, profiles: Sequence[str]) -> str:
     lines.append("")
 
     lines.append("### 5.4 编译条件敏感性（C1~C10）")
-    spread = (
-        stats.groupby(["op", "n"], as_index=False)["eigen_over_cmsis_mean"]
-        .agg(["mean", "std"])
-        .reset_index()
+    spread = group_stats(
+        stats, ["op", "n"], {"spread": "eigen_over_cmsis_mean"}, run_key="profile"
     )
-    avg_std = float(spread["std"].fillna(0.0).mean())
+    avg_std = float(spread["spread_std"].fillna(0.0).mean())
     lines.append(f"- 全点位 eigen/cmsis 标准差均值：`{avg_std:.4f}`（值越大表示对编译条件越敏感）")
     lines.append("")
 
@@ -692,12 +598,37 @@ def build_analysis_section(stats: pd.DataFrame, profiles: Sequence[str]) -> str:
     return "\n".join(lines)
 
 
+def build_clock_check_lines(
+    clock_checks: pd.DataFrame | None, tolerance: float
+) -> list[str]:
+    """Builds section-3 bullets for the implied-clock check."""
+
+    nominal_mhz = NOMINAL_HCLK_HZ / 1e6
+    if clock_checks is None or clock_checks.empty:
+        return ["- 主频校验：无串口时间戳（`logs/serial_capture.times.tsv`），未校验"]
+    lines = [
+        f"- 主频校验：按串口时间戳推算 {len(clock_checks)} 个 run 的主频"
+        f"（名义 {nominal_mhz:.0f} MHz，容差 ±{tolerance:.0%}，"
+        f"范围 {clock_checks['implied_clock_mhz'].min():.1f}~"
+        f"{clock_checks['implied_clock_mhz'].max():.1f} MHz）"
+    ]
+    flagged = clock_checks[clock_checks["clock_flagged"]]
+    for row in flagged.itertuples(index=False):
+        lines.append(
+            f"  - `{row.profile}` `{row.run_id}`: 推算主频 {row.implied_clock_mhz:.1f} MHz，"
+            f"偏离 {row.clock_deviation:+.1%}，请检查 HCLK/PLL 配置"
+        )
+    return lines
+
+
 def build_report_markdown(
     paths: ReportPaths,
     profiles: Sequence[BuildProfile],
     profile_meta: dict[str, dict[str, object]],
     df: pd.DataFrame,
     stats: pd.DataFrame,
+    clock_checks: pd.DataFrame | None = None,
+    clock_tolerance: float = DEFAULT_CLOCK_TOLERANCE,
 ) -> str:
     """Builds final report_full_matrix markdown."""
 
@@ -760,6 +691,11 @@ def build_report_markdown(
         )
     if missing_profile_names:
         lines.append(f"- 缺失样本（已跳过跨条件分析）：`{', '.join(missing_profile_names)}`")
+    for profile in profile_names:
+        alias_of = profile_meta.get(profile, {}).get("alias_of")
+        if alias_of:
+            lines.append(f"- `{profile}`: 固件镜像与 `{alias_of}` 完全一致，复用其样本（未单独采样）")
+    lines.extend(build_clock_check_lines(clock_checks, clock_tolerance))
     lines.append("")
 
     lines.append("## 4. 各编译条件结果（图表）")
@@ -843,46 +779,30 @@ def build_report_markdown(
     return "\n".join(lines).rstrip() + "\n"
 
 
-def main() -> None:
-    """Entry point for full matrix report generation."""
+def emit_full_matrix_report(data: CampaignData, paths: ReportPaths) -> Path:
+    """Writes the full-matrix report, its summary CSVs and plots.
 
-    args = parse_args()
-    if pd is None or plt is None:
+    Args:
+        data: Campaign loaded once by `load_campaign`.
+        paths: Output locations.
+
+    Returns:
+        Path of the written markdown report.
+    """
+
+    if plt is None:
         raise RuntimeError(
             "matplotlib and pandas are required. Install dependencies in benchmark_analysis first."
         ) from _IMPORT_ERROR
-    paths = build_paths(args)
     paths.output_dir.mkdir(parents=True, exist_ok=True)
-
-    all_profiles = default_profiles()
-    selected_names = parse_profile_names(args.profiles)
-    selected_profiles: list[BuildProfile] = []
-    for name in selected_names:
-        if name not in all_profiles:
-            raise ValueError(f"Unknown profile: {name}")
-        selected_profiles.append(all_profiles[name])
-
-    frames: list[pd.DataFrame] = []
-    profile_meta: dict[str, dict[str, object]] = {}
-    for profile in selected_profiles:
-        profile_dir = paths.input_root / profile.name
-        profile_meta[profile.name] = load_profile_meta(profile_dir)
-        frame = load_profile_runs(profile.name, profile_dir, strict=args.strict)
-        if not frame.empty:
-            frames.append(frame)
-        elif args.strict:
-            raise RuntimeError(f"No data for profile {profile.name}")
-
-    if not frames:
-        raise RuntimeError("No benchmark data found.")
-    df = pd.concat(frames, ignore_index=True)
-    stats = compute_stats(df)
-    data_profile_names = [
-        p.name for p in selected_profiles if not stats[stats["profile"] == p.name].empty
-    ]
+    stats = data.stats
+    data_profile_names = data.data_profile_names()
 
     stats_csv = paths.output_dir / "summary_full_matrix.csv"
     stats.to_csv(stats_csv, index=False, encoding="utf-8")
+    clock_checks = pd.DataFrame(data.clock_rows, columns=list(CLOCK_CHECK_COLUMNS))
+    clock_csv = paths.output_dir / "run_clock_check.csv"
+    clock_checks.to_csv(clock_csv, index=False, encoding="utf-8")
 
     for profile in data_profile_names:
         plot_profile_cycles(
@@ -925,15 +845,38 @@ def main() -> None:
 
     report_md = build_report_markdown(
         paths=paths,
-        profiles=selected_profiles,
-        profile_meta=profile_meta,
-        df=df,
+        profiles=data.profiles,
+        profile_meta=data.profile_meta,
+        df=data.df,
         stats=stats,
+        clock_checks=clock_checks,
+        clock_tolerance=data.clock_tolerance,
     )
     paths.output_md.write_text(report_md, encoding="utf-8")
     print(f"Generated report: {paths.output_md}")
     print(f"Generated summary CSV: {stats_csv}")
+    print(f"Generated clock check CSV: {clock_csv}")
     print(f"Generated plots: {paths.output_dir}")
+    return paths.output_md
+
+
+def main() -> None:
+    """Entry point for full matrix report generation."""
+
+    args = parse_args()
+    if pd is None or plt is None:
+        raise RuntimeError(
+            "matplotlib and pandas are required. Install dependencies in benchmark_analysis first."
+        ) from _IMPORT_ERROR
+    paths = build_paths(args)
+    data = load_campaign(
+        paths.input_root,
+        select_profiles(paths.input_root, args.profiles),
+        strict=args.strict,
+        revalidate=args.revalidate,
+        clock_tolerance=args.clock_tolerance,
+    )
+    emit_full_matrix_report(data, paths)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,11 @@
 from __future__ import annotations
 
 import argparse
-import json
 import math
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
-from typing import Iterable
 from typing import Sequence
 
 try:
@@ -25,16 +23,18 @@ except ImportError as exc:  # pragma: no cover - runtime dependency
     pd = None  # type: ignore[assignment]
     _IMPORT_ERROR = exc
 
+from campaign_data import CampaignData
+from campaign_data import load_campaign
+from campaign_data import select_profiles
 from full_matrix_common import BuildProfile
 from full_matrix_common import EXPECTED_INV_SIZES
 from full_matrix_common import EXPECTED_MUL_SIZES
-from full_matrix_common import SampleRecord
-from full_matrix_common import default_profiles
+from full_matrix_common import NOMINAL_HCLK_HZ
 from full_matrix_common import detect_crossover
 from full_matrix_common import group_profiles_by_phenomenon
-from full_matrix_common import parse_profile_names
-from full_matrix_common import parse_run_lines
-from full_matrix_common import validate_records
+from point_timing import DEFAULT_CLOCK_TOLERANCE
+from stats_engine import geometric_means
+from stats_engine import group_stats
 
 
 @dataclass(frozen=True)
@@ -65,6 +65,17 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--output-dir", default="benchmark_analysis/output/readable")
     parser.add_argument("--profiles", default="C1,C2,C3,C4,C5,C6,C7,C8,C9,C10")
     parser.add_argument("--strict", action="store_true")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Validate every run file even when the sample manifest vouches for it.",
+    )
+    parser.add_argument(
+        "--clock-tolerance",
+        type=float,
+        default=DEFAULT_CLOCK_TOLERANCE,
+        help="Flag runs whose implied core clock deviates from the nominal HCLK by more than this fraction.",
+    )
     parser.add_argument("--group-tolerance", type=float, default=0.02)
     return parser.parse_args()
 
@@ -90,144 +101,67 @@ def build_paths(args: argparse.Namespace) -> ReportPaths:
     )
 
 
-def load_profile_meta(profile_dir: Path) -> dict[str, object]:
-    """Loads one profile metadata JSON if present."""
-
-    meta_file = profile_dir / "profile_meta.json"
-    if not meta_file.is_file():
-        return {}
-    return json.loads(meta_file.read_text(encoding="utf-8"))
-
-
-def records_to_dicts(
-    profile: str,
-    run_id: str,
-    records: Iterable[SampleRecord],
-) -> list[dict[str, object]]:
-    """Converts SampleRecord sequence into DataFrame rows."""
-
-    rows: list[dict[str, object]] = []
-    for rec in records:
-        rows.append(
-            {
-                "profile": profile,
-                "run_id": run_id,
-                "op": rec.op,
-                "n": rec.n,
-                "repeat": rec.repeat,
-                "warmup": rec.warmup,
-                "eigen_avg_cycles": rec.eigen_avg_cycles,
-                "cmsis_avg_cycles": rec.cmsis_avg_cycles,
-                "cmsis_over_eigen": rec.cmsis_over_eigen,
-                "eigen_over_cmsis": (
-                    (1.0 / rec.cmsis_over_eigen)
-                    if rec.cmsis_over_eigen > 0
-                    else float("inf")
-                ),
-                "error_l2": rec.error_l2,
-                "valid": rec.valid,
-                "invalid": rec.invalid,
-                "build_mode": rec.build_mode,
-            }
-        )
-    return rows
-
-
-def load_profile_runs(profile: str, profile_dir: Path, strict: bool) -> pd.DataFrame:
-    """Loads all run CSV files for one profile.
+def readable_stats(stats: pd.DataFrame) -> pd.DataFrame:
+    """Selects the readable report columns from the shared campaign stats.
 
     Args:
-        profile: Profile name (for example `C1`).
-        profile_dir: Directory containing `samples_release/`.
-        strict: Whether missing/incomplete data should fail fast.
+        stats: Frame from `campaign_data.compute_stats`.
 
     Returns:
-        DataFrame with parsed benchmark rows.
+        Profile/op/n summary with a zero-filled `eigen_over_cmsis_ci95`.
     """
 
-    samples_dir = profile_dir / "samples_release"
-    if not samples_dir.is_dir():
-        if strict:
-            raise FileNotFoundError(f"samples_release missing for {profile}: {samples_dir}")
-        return pd.DataFrame()
-
-    rows: list[dict[str, object]] = []
-    run_files = sorted(samples_dir.glob("run_*.csv"))
-    if not run_files and strict:
-        raise RuntimeError(f"No run_*.csv found for {profile} in {samples_dir}")
-
-    for run_file in run_files:
-        lines = run_file.read_text(encoding="utf-8", errors="ignore").splitlines()
-        records = parse_run_lines(lines)
-        validate_records(records, expected_repeat=records[0].repeat)
-        rows.extend(records_to_dicts(profile, run_file.stem, records))
-
-    if not rows:
-        return pd.DataFrame()
-    return pd.DataFrame(rows)
-
-
-def safe_geometric_mean(values: Sequence[float]) -> float:
-    """Computes geometric mean while ignoring non-positive values."""
-
-    positive = [float(v) for v in values if v > 0]
-    if not positive:
-        return float("nan")
-    return math.exp(sum(math.log(v) for v in positive) / len(positive))
-
-
-def compute_stats(df: pd.DataFrame) -> pd.DataFrame:
-    """Computes profile/op/n summary stats."""
-
-    grouped = df.groupby(["profile", "op", "n"], as_index=False)
-    stats = grouped.agg(
-        runs=("run_id", "nunique"),
-        eigen_mean=("eigen_avg_cycles", "mean"),
-        cmsis_mean=("cmsis_avg_cycles", "mean"),
-        eigen_over_cmsis_mean=("eigen_over_cmsis", "mean"),
-        eigen_over_cmsis_std=("eigen_over_cmsis", "std"),
-        error_mean=("error_l2", "mean"),
-        error_max=("error_l2", "max"),
-    )
-    stats["ci_mult"] = stats["runs"].apply(lambda n: 1.96 / math.sqrt(n) if n > 0 else float("nan"))
-    stats["eigen_over_cmsis_ci95"] = stats["eigen_over_cmsis_std"].fillna(0.0) * stats["ci_mult"]
-    return stats
+    columns = [
+        "profile",
+        "op",
+        "n",
+        "runs",
+        "eigen_mean",
+        "cmsis_mean",
+        "eigen_over_cmsis_mean",
+        "eigen_over_cmsis_std",
+        "error_mean",
+        "error_max",
+        "ci_mult",
+    ]
+    out = stats[columns].copy()
+    # A single run has no spread; show a zero-width interval, not NaN.
+    out["eigen_over_cmsis_ci95"] = out["eigen_over_cmsis_std"].fillna(0.0) * out["ci_mult"]
+    return out
 
 
 def compute_run_level_summary(df: pd.DataFrame) -> pd.DataFrame:
     """Builds per-run readable summary rows."""
 
-    rows: list[dict[str, object]] = []
-    grouped = df.groupby(["profile", "run_id"], as_index=False)
-    for _, run in grouped:
-        profile = str(run.iloc[0]["profile"])
-        run_id = str(run.iloc[0]["run_id"])
-        mul = run[run["op"] == "mul"]
-        inv = run[run["op"] == "inv"]
-        rows.append(
-            {
-                "profile": profile,
-                "run_id": run_id,
-                "repeat": int(run["repeat"].iloc[0]),
-                "warmup": int(run["warmup"].iloc[0]),
-                "build_mode": str(run["build_mode"].iloc[0]),
-                "records": int(len(run)),
-                "mul_points": int(len(mul)),
-                "inv_points": int(len(inv)),
-                "mul_eigen_over_cmsis_mean": float(mul["eigen_over_cmsis"].mean()),
-                "inv_eigen_over_cmsis_mean": float(inv["eigen_over_cmsis"].mean()),
-                "overall_eigen_over_cmsis_gmean": safe_geometric_mean(
-                    run["eigen_over_cmsis"].tolist()
-                ),
-                "error_mean": float(run["error_l2"].mean()),
-                "error_max": float(run["error_l2"].max()),
-            }
-        )
-    return (
-        pd.DataFrame(rows)
-        .sort_values(["profile", "run_id"])
-        .reset_index(drop=True)
+    keys = ["profile", "run_id"]
+    ratio = df["eigen_over_cmsis"]
+    frame = df[keys].assign(
+        overall=ratio,
+        mul=ratio.where(df["op"] == "mul"),
+        inv=ratio.where(df["op"] == "inv"),
+        error=df["error_l2"],
+    )
+    # Per-op columns are NaN outside their op, so their counts are the op's points.
+    stats = group_stats(
+        frame,
+        keys,
+        {name: name for name in ("overall", "mul", "inv", "error")},
+        run_key=None,
+        counts=("mul", "inv"),
+        maxima=("error",),
+        geomeans=("overall",),
     )
+    firsts = df.groupby(keys, sort=True)[["repeat", "warmup", "build_mode"]].first()
+    summary = firsts.reset_index()
+    summary["records"] = stats["runs"].to_numpy()
+    summary["mul_points"] = stats["mul_count"].to_numpy()
+    summary["inv_points"] = stats["inv_count"].to_numpy()
+    summary["mul_eigen_over_cmsis_mean"] = stats["mul_mean"].to_numpy()
+    summary["inv_eigen_over_cmsis_mean"] = stats["inv_mean"].to_numpy()
+    summary["overall_eigen_over_cmsis_gmean"] = stats["overall_gmean"].to_numpy()
+    summary["error_mean"] = stats["error_mean"].to_numpy()
+    summary["error_max"] = stats["error_max"].to_numpy()
+    return summary
 
 
 def build_profile_points(stats: pd.DataFrame, profiles: Sequence[str]) -> dict[str, list[tuple[str, int, float]]]:
@@ -277,11 +211,7 @@ def build_group_summary(
     summaries: list[dict[str, object]] = []
     for idx, (signature, members) in enumerate(grouped, start=1):
         subset = stats[stats["profile"].isin(members)]
-        profile_gmeans = (
-            subset.groupby("profile")["eigen_over_cmsis_mean"]
-            .apply(lambda s: safe_geometric_mean(list(s)))
-            .to_dict()
-        )
+        profile_gmeans = geometric_means(subset, "profile", "eigen_over_cmsis_mean")
         gmean_values = [float(v) for v in profile_gmeans.values() if v > 0]
         gmean_min = min(gmean_values) if gmean_values else float("nan")
         gmean_max = max(gmean_values) if gmean_values else float("nan")
@@ -370,10 +300,8 @@ def plot_overview_one_figure(
     cbar.set_label("log2(Eigen/CMSIS)")
 
     ax_bar = fig.add_subplot(grid[1, 0])
-    profile_gmeans: list[float] = []
-    for profile in profiles:
-        sub = stats[stats["profile"] == profile]
-        profile_gmeans.append(safe_geometric_mean(sub["eigen_over_cmsis_mean"].tolist()))
+    gmean_by_profile = geometric_means(stats, "profile", "eigen_over_cmsis_mean")
+    profile_gmeans = [gmean_by_profile.get(profile, float("nan")) for profile in profiles]
 
     bar_colors = [group_color_map.get(profile, "#4c78a8") for profile in profiles]
     bars = ax_bar.bar(profiles, profile_gmeans, color=bar_colors)
@@ -440,6 +368,25 @@ def build_report_markdown(
     lines.append(f"- 覆盖 profile：`{', '.join(profile_names)}`")
     run_counts = run_summary.groupby("profile")["run_id"].nunique().to_dict()
     lines.append(f"- 采样轮次（按 profile）：`{sorted(run_counts.items())}`")
+    aliases = [
+        f"{profile}->{profile_meta[profile]['alias_of']}"
+        for profile in profile_names
+        if profile_meta.get(profile, {}).get("alias_of")
+    ]
+    if aliases:
+        lines.append(f"- 固件镜像一致、复用样本的 profile：`{', '.join(aliases)}`")
+    if "clock_flagged" in run_summary.columns:
+        flagged = run_summary[run_summary["clock_flagged"].fillna(False).astype(bool)]
+        if flagged.empty:
+            lines.append(
+                f"- 主频校验：推算主频均在名义 {NOMINAL_HCLK_HZ / 1e6:.0f} MHz 容差内"
+            )
+        else:
+            items = [
+                f"{row.profile}/{row.run_id}={row.implied_clock_mhz:.1f}MHz"
+                for row in flagged.itertuples(index=False)
+            ]
+            lines.append(f"- 主频偏离名义值的 run（请检查 HCLK/PLL）：`{', '.join(items)}`")
     lines.append(f"- 统计口径：`Eigen/CMSIS`（>1 表示 CMSIS 更快）")
     lines.append(f"- 生成时间：`{datetime.now(timezone.utc).isoformat()}`")
     lines.append("")
@@ -540,11 +487,12 @@ def build_report_markdown(
     lines.append("")
 
     lines.append("## 6. 关键结论")
+    gmean_by_profile = geometric_means(stats, "profile", "eigen_over_cmsis_mean")
     for profile in profile_names:
         sub = stats[(stats["profile"] == profile) & (stats["op"] == "mul")]
         pairs = list(sub[["n", "eigen_over_cmsis_mean"]].itertuples(index=False, name=None))
         cross = detect_crossover([(int(n), float(speedup)) for n, speedup in pairs])
-        gmean = safe_geometric_mean(stats[stats["profile"] == profile]["eigen_over_cmsis_mean"].tolist())
+        gmean = gmean_by_profile.get(profile, float("nan"))
         lines.append(
             f"- `{profile}`: 综合几何均值 `Eigen/CMSIS={gmean:.3f}`，mul 临界点 `{cross if cross is not None else 'none'}`"
         )
@@ -554,49 +502,40 @@ def build_report_markdown(
     return "\n".join(lines).rstrip() + "\n"
 
 
-def main() -> None:
-    """Entry point for readable report generation."""
+def emit_readable_report(
+    data: CampaignData,
+    paths: ReportPaths,
+    group_tolerance: float = 0.02,
+) -> Path:
+    """Writes the readable report, its one-figure overview and detail CSVs.
 
-    args = parse_args()
-    if pd is None or plt is None or np is None or mcolors is None:
+    Args:
+        data: Campaign loaded once by `load_campaign`.
+        paths: Output locations; `output_dir` must lie under `repo_dir`.
+        group_tolerance: Speedup tolerance for phenomenon grouping.
+
+    Returns:
+        Path of the written markdown report.
+    """
+
+    if plt is None or np is None or mcolors is None:
         raise RuntimeError(
             "matplotlib/pandas/numpy are required. Install benchmark_analysis dependencies first."
         ) from _IMPORT_ERROR
-
-    paths = build_paths(args)
     paths.output_dir.mkdir(parents=True, exist_ok=True)
 
-    all_profiles = default_profiles()
-    selected_names = parse_profile_names(args.profiles)
-    selected_profiles: list[BuildProfile] = []
-    for name in selected_names:
-        if name not in all_profiles:
-            raise ValueError(f"Unknown profile: {name}")
-        selected_profiles.append(all_profiles[name])
-
-    frames: list[pd.DataFrame] = []
-    profile_meta: dict[str, dict[str, object]] = {}
-    for profile in selected_profiles:
-        profile_dir = paths.input_root / profile.name
-        profile_meta[profile.name] = load_profile_meta(profile_dir)
-        frame = load_profile_runs(profile.name, profile_dir, strict=args.strict)
-        if not frame.empty:
-            frames.append(frame)
-        elif args.strict:
-            raise RuntimeError(f"No data for profile {profile.name}")
-
-    if not frames:
-        raise RuntimeError("No benchmark data found.")
-
-    df = pd.concat(frames, ignore_index=True)
-    stats = compute_stats(df)
-    run_summary = compute_run_level_summary(df)
-
-    selected_profile_names = [profile.name for profile in selected_profiles]
+    stats = readable_stats(data.stats)
+    run_summary = compute_run_level_summary(data.df)
+    if data.clock_rows:
+        run_summary = run_summary.merge(
+            pd.DataFrame(data.clock_rows), on=["profile", "run_id"], how="left"
+        )
+
+    selected_profile_names = [profile.name for profile in data.profiles]
     profile_points = build_profile_points(stats, selected_profile_names)
     grouped = group_profiles_by_phenomenon(
         profile_points=profile_points,
-        tolerance=float(args.group_tolerance),
+        tolerance=float(group_tolerance),
     )
     group_summary = build_group_summary(grouped, stats)
 
@@ -631,8 +570,8 @@ def main() -> None:
 
     report_text = build_report_markdown(
         paths=paths,
-        profiles=selected_profiles,
-        profile_meta=profile_meta,
+        profiles=data.profiles,
+        profile_meta=data.profile_meta,
         run_summary=run_summary,
         stats=stats,
         group_summary=group_summary,
@@ -646,6 +585,27 @@ def main() -> None:
     print(f"Generated one-figure summary: {figure_file}")
     print(f"Generated run details: {run_details_csv}")
     print(f"Generated phenomenon groups: {groups_csv}")
+    return paths.output_md
+
+
+def main() -> None:
+    """Entry point for readable report generation."""
+
+    args = parse_args()
+    if pd is None or plt is None or np is None or mcolors is None:
+        raise RuntimeError(
+            "matplotlib/pandas/numpy are required. Install benchmark_analysis dependencies first."
+        ) from _IMPORT_ERROR
+
+    paths = build_paths(args)
+    data = load_campaign(
+        paths.input_root,
+        select_profiles(paths.input_root, args.profiles),
+        strict=args.strict,
+        revalidate=args.revalidate,
+        clock_tolerance=args.clock_tolerance,
+    )
+    emit_readable_report(data, paths, group_tolerance=args.group_tolerance)
 
 
 if __name__ == "__main__":
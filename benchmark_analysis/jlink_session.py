@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Sequence
+from typing import TextIO
+
+from elf_image import elf_load_image
+
+
+JLINK_PROMPT = b"J-Link>"
+DEFAULT_CONNECT_TIMEOUT_SEC = 30.0
+DEFAULT_COMMAND_TIMEOUT_SEC = 120.0
+FLASH_FAILURE_MARKERS: tuple[str, ...] = (
+    "Cannot connect",
+    "Could not connect",
+    "Error while programming",
+    "Downloading file failed",
+    "Failed to execute script command",
+    "Could not read memory",
+)
+
+# Queue item marking that the commander printed its prompt (command finished).
+_PROMPT = object()
+
+
+class JLinkError(RuntimeError):
+    """Raised when the commander reports a failure or stops responding."""
+
+
+def jlink_command_line(
+    jlink: Path,
+    device: str,
+    swd_speed: str,
+    jlink_serial: str | None = None,
+) -> list[str]:
+    """Returns the JLinkExe invocation connecting to one board over SWD."""
+
+    cmd = [str(jlink)]
+    if jlink_serial:
+        cmd.extend(["-SelectEmuBySN", jlink_serial])
+    cmd.extend(["-device", device, "-if", "SWD", "-speed", swd_speed, "-autoconnect", "1"])
+    return cmd
+
+
+class JLinkSession:
+    """One long-lived JLinkExe process driven over stdin.
+
+    Connecting, identifying and halting the target is paid once per session
+    instead of once per flash. Output is read on a background thread and
+    split at the `J-Link>` prompt, so each command's result is checked from
+    the live stream.
+
+    Args:
+        cmd: Commander command line (see `jlink_command_line`).
+        cwd: Working directory of the process.
+        env: Process environment.
+        connect_timeout_sec: Time allowed for start-up and target connect.
+        command_timeout_sec: Time allowed for one command.
+    """
+
+    def __init__(
+        self,
+        cmd: Sequence[str],
+        cwd: Path,
+        env: dict[str, str] | None = None,
+        connect_timeout_sec: float = DEFAULT_CONNECT_TIMEOUT_SEC,
+        command_timeout_sec: float = DEFAULT_COMMAND_TIMEOUT_SEC,
+    ) -> None:
+        self._cmd = list(cmd)
+        self._cwd = cwd
+        self._env = env
+        self._connect_timeout_sec = connect_timeout_sec
+        self._command_timeout_sec = command_timeout_sec
+        self._process: subprocess.Popen[bytes] | None = None
+        self._output: queue.Queue[object] = queue.Queue()
+        self._reader: threading.Thread | None = None
+        # Serializes commands issued from the board worker and a progress monitor.
+        self._command_lock = threading.Lock()
+        self.startup_lines: list[str] = []
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the commander process is running."""
+
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, log_fp: TextIO | None = None) -> list[str]:
+        """Starts the commander and waits for the first prompt.
+
+        Returns:
+            Start-up output (connect and identify messages).
+
+        Raises:
+            JLinkError: The target could not be connected.
+        """
+
+        self._process = subprocess.Popen(
+            self._cmd,
+            cwd=str(self._cwd),
+            env=self._env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self._reader = threading.Thread(target=self._read_output, name="jlink-reader", daemon=True)
+        self._reader.start()
+        if log_fp is not None:
+            log_fp.write(f"$ {' '.join(self._cmd)}\n")
+        self.startup_lines = self._collect(self._connect_timeout_sec, log_fp)
+        self._check(self.startup_lines, "connect")
+        return self.startup_lines
+
+    def command(
+        self,
+        text: str,
+        log_fp: TextIO | None = None,
+        timeout_sec: float | None = None,
+        echo: bool = True,
+    ) -> list[str]:
+        """Sends one command and returns its output.
+
+        Output is also copied to stdout unless `echo` is false.
+
+        Raises:
+            JLinkError: The output contains a failure marker, the process
+                exited, or no prompt arrived within the timeout.
+        """
+
+        with self._command_lock:
+            if not self.is_alive:
+                raise JLinkError("JLink session is not running.")
+            assert self._process is not None and self._process.stdin is not None
+            if log_fp is not None:
+                log_fp.write(f"J-Link>{text}\n")
+            try:
+                self._process.stdin.write(text.encode("utf-8") + b"\n")
+                self._process.stdin.flush()
+            except OSError as exc:
+                raise JLinkError(f"JLink session closed while sending {text!r}.") from exc
+            lines = self._collect(timeout_sec or self._command_timeout_sec, log_fp, echo)
+            self._check(lines, text)
+            return lines
+
+    def read_words(self, addresses: Sequence[int]) -> dict[int, int]:
+        """Reads 32-bit words from target memory without halting the core.
+
+        Adjacent addresses are fetched with a single `mem32` command.
+
+        Returns:
+            `{address: value}` for every requested address.
+        """
+
+        values: dict[int, int] = {}
+        ordered = sorted(set(addresses))
+        index = 0
+        while index < len(ordered):
+            start = ordered[index]
+            count = 1
+            while index + count < len(ordered) and ordered[index + count] == start + 4 * count:
+                count += 1
+            lines = self.command(f"mem32 0x{start:08X}, {count}", echo=False)
+            words: list[int] = []
+            for line in lines:
+                head, sep, tail = line.partition("=")
+                if not sep:
+                    continue
+                try:
+                    int(head.strip(), 16)
+                    words.extend(int(word, 16) for word in tail.split())
+                except ValueError:
+                    continue
+            if len(words) < count:
+                raise JLinkError(f"mem32 at 0x{start:08X} returned {len(words)}/{count} words.")
+            for offset in range(count):
+                values[start + 4 * offset] = words[offset]
+            index += count
+        return values
+
+    def flash(self, elf_path: Path, log_fp: TextIO | None = None) -> bool:
+        """Programs `elf_path` unless the target flash already holds it, then runs it.
+
+        The flash range covered by the ELF is read back with `savebin` and its
+        CRC-32 compared with the ELF's load image; erase and programming are
+        skipped on a match. A failed readback counts as a mismatch.
+
+        Returns:
+            Whether the image was downloaded.
+        """
+
+        base, image = elf_load_image(elf_path.read_bytes())
+        self.command("r", log_fp)
+        self.command("h", log_fp)
+        matches = False
+        with tempfile.TemporaryDirectory(prefix="jlink_readback_") as tmp:
+            readback = Path(tmp) / "flash.bin"
+            try:
+                self.command(f"savebin {readback}, 0x{base:08X}, 0x{len(image):X}", log_fp)
+            except JLinkError:
+                # An unreadable flash (e.g. read-protected) just means the
+                # image has to be downloaded; a dead session fails `loadfile`.
+                pass
+            else:
+                if readback.is_file():
+                    matches = zlib.crc32(readback.read_bytes()) == zlib.crc32(image)
+        if matches:
+            if log_fp is not None:
+                log_fp.write(
+                    f"# flash CRC-32 0x{zlib.crc32(image):08X} matches {elf_path.name}, "
+                    "download skipped\n"
+                )
+        else:
+            self.command(f"loadfile {elf_path}", log_fp)
+        self.command("r", log_fp)
+        self.command("g", log_fp)
+        if log_fp is not None:
+            log_fp.flush()
+        return not matches
+
+    def close(self) -> None:
+        """Quits the commander, killing it if it does not exit promptly."""
+
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        try:
+            if process.poll() is None and process.stdin is not None:
+                process.stdin.write(b"q\n")
+                process.stdin.flush()
+                process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        if self._reader is not None:
+            self._reader.join(timeout=1)
+
+    def _read_output(self) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        fd = self._process.stdout.fileno()
+        buffer = bytearray()
+        while True:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            buffer += chunk
+            end = buffer.rfind(b"\n")
+            if end >= 0:
+                for raw in bytes(buffer[:end]).split(b"\n"):
+                    self._output.put(raw.rstrip(b"\r").decode("utf-8", errors="replace"))
+                del buffer[: end + 1]
+            # The prompt is printed without a newline once a command has finished.
+            if buffer.endswith(JLINK_PROMPT):
+                del buffer[:]
+                self._output.put(_PROMPT)
+        if buffer:
+            self._output.put(bytes(buffer).decode("utf-8", errors="replace"))
+        self._output.put(None)
+
+    def _collect(
+        self,
+        timeout_sec: float,
+        log_fp: TextIO | None,
+        echo: bool = True,
+    ) -> list[str]:
+        deadline = time.monotonic() + timeout_sec
+        lines: list[str] = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise JLinkError(f"JLink did not respond within {timeout_sec}s.")
+            try:
+                item = self._output.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if item is _PROMPT:
+                return lines
+            if item is None:
+                self._check(lines, "session")
+                raise JLinkError("JLink session exited unexpectedly.")
+            line = str(item)
+            lines.append(line)
+            if echo:
+                sys.stdout.write(line + "\n")
+            if log_fp is not None:
+                log_fp.write(line + "\n")
+
+    @staticmethod
+    def _check(lines: Sequence[str], what: str) -> None:
+        for line in lines:
+            for marker in FLASH_FAILURE_MARKERS:
+                if marker in line:
+                    raise JLinkError(f"JLink {what} failed ({marker}).")
+
+
+class JLinkSessionPool:
+    """Keeps one `JLinkSession` per probe serial number, opened on first use.
+
+    A session that failed is closed and replaced on the next flash, so a
+    transient probe error costs one reconnect rather than the whole run.
+
+    Args:
+        jlink: Path of JLinkExe.
+        device: Target device name.
+        swd_speed: SWD speed in kHz.
+        cwd: Working directory for the commander processes.
+        env: Process environment.
+    """
+
+    def __init__(
+        self,
+        jlink: Path,
+        device: str,
+        swd_speed: str,
+        cwd: Path,
+        env: dict[str, str] | None = None,
+    ) -> None:
+        self._jlink = jlink
+        self._device = device
+        self._swd_speed = swd_speed
+        self._cwd = cwd
+        self._env = env
+        self._lock = threading.Lock()
+        self._sessions: dict[str | None, JLinkSession] = {}
+
+    def flash(self, elf_path: Path, log_path: Path, jlink_serial: str | None = None) -> bool:
+        """Flashes through the probe's session, appending its output to `log_path`.
+
+        Callers must not flash the same probe from two threads at once (each
+        board is driven by one worker).
+
+        Returns:
+            Whether the image was downloaded (`False` when the CRC matched).
+        """
+
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_path.open("a", encoding="utf-8") as log_fp:
+            with self._lock:
+                session = self._sessions.get(jlink_serial)
+            try:
+                if session is None or not session.is_alive:
+                    session = JLinkSession(
+                        jlink_command_line(
+                            self._jlink, self._device, self._swd_speed, jlink_serial
+                        ),
+                        cwd=self._cwd,
+                        env=self._env,
+                    )
+                    with self._lock:
+                        self._sessions[jlink_serial] = session
+                    session.start(log_fp)
+                return session.flash(elf_path, log_fp)
+            except JLinkError as exc:
+                session.close()
+                with self._lock:
+                    self._sessions.pop(jlink_serial, None)
+                raise JLinkError(f"{exc} See {log_path}.") from exc
+
+    def session(self, jlink_serial: str | None = None) -> JLinkSession | None:
+        """Returns the probe's running session, if one was opened by `flash`."""
+
+        with self._lock:
+            session = self._sessions.get(jlink_serial)
+        return session if session is not None and session.is_alive else None
+
+    def close(self) -> None:
+        """Closes every open session."""
+
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
@@ -6,6 +6,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from sample_loader import load_sample_files
+
 
 @dataclass(frozen=True)
 class Paths:
@@ -33,37 +35,8 @@ def build_paths() -> Paths:
 
 
 def load_benchmark_csv(csv_path: Path) -> pd.DataFrame:
-    rows: list[dict[str, object]] = []
-    with csv_path.open("r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line or line == "done":
-                continue
-            cols = line.split(",")
-            first = cols[0].lstrip("\ufeff")
-            if first == "op":
-                continue
-            if len(cols) != 11:
-                continue
-            rows.append(
-                {
-                    "op": first,
-                    "n": int(cols[1]),
-                    "repeat": int(cols[2]),
-                    "warmup": int(cols[3]),
-                    "eigen_avg_cycles": float(cols[4]),
-                    "cmsis_avg_cycles": float(cols[5]),
-                    "cmsis_over_eigen": float(cols[6]),
-                    "error_l2": float(cols[7]),
-                    "valid": int(cols[8]),
-                    "invalid": int(cols[9]),
-                    "build_mode": cols[10],
-                }
-            )
-    df = pd.DataFrame(rows).sort_values(["op", "n"], ignore_index=True)
-    if df.empty:
-        raise RuntimeError(f"Empty benchmark data: {csv_path}")
-    return df
+    df = load_sample_files([csv_path]).drop(columns="run_id")
+    return df.sort_values(["op", "n"], ignore_index=True)
 
 
 def make_cycles_plot(df_off: pd.DataFrame, df_on: pd.DataFrame, op: str, out_path: Path) -> None:
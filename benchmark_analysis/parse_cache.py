@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+from typing import Sequence
+
+try:
+    import numpy as np
+    import pandas as pd
+    _IMPORT_ERROR: Exception | None = None
+except ImportError as exc:  # pragma: no cover - runtime dependency
+    np = None  # type: ignore[assignment]
+    pd = None  # type: ignore[assignment]
+    _IMPORT_ERROR = exc
+
+from full_matrix_common import ERROR_L2_THRESHOLD
+from full_matrix_common import EXPECTED_INV_SIZES
+from full_matrix_common import EXPECTED_MUL_SIZES
+from full_matrix_common import atomic_write_bytes
+from sample_loader import SAMPLE_COLUMNS
+
+
+PARSE_CACHE_NAME = "parse_cache.npz"
+# Bump when `sample_loader` parsing or the `validate_records` rules change.
+PARSE_CACHE_VERSION = 1
+
+
+def parse_cache_key(run_files: Sequence[Path]) -> str:
+    """Returns the cache key of a profile's run files.
+
+    The key names every file with its size and mtime, plus the parser version
+    and the validation limits, so editing, adding or removing a run file, or
+    changing the rules, misses the cache.
+    """
+
+    files = []
+    for run_file in run_files:
+        stat = run_file.stat()
+        files.append([run_file.name, stat.st_size, stat.st_mtime_ns])
+    return json.dumps(
+        {
+            "version": PARSE_CACHE_VERSION,
+            "error_l2_threshold": ERROR_L2_THRESHOLD,
+            "mul_sizes": list(EXPECTED_MUL_SIZES),
+            "inv_sizes": list(EXPECTED_INV_SIZES),
+            "files": files,
+        },
+        sort_keys=True,
+    )
+
+
+def load_cached_frame(samples_dir: Path, key: str) -> pd.DataFrame | None:
+    """Returns the parsed and validated samples cached for `key`.
+
+    Returns:
+        `run_id` plus the sample columns, or `None` when the cache is missing,
+        unreadable or was written for other run files.
+    """
+
+    if np is None or pd is None:
+        return None
+    path = samples_dir / PARSE_CACHE_NAME
+    if not path.is_file():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["key"]) != key:
+                return None
+            names = ["run_id", *(name for name, _ in SAMPLE_COLUMNS)]
+            return pd.DataFrame({name: data[name] for name in names})
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached_frame(samples_dir: Path, key: str, frame: pd.DataFrame) -> None:
+    """Caches a profile's parsed and validated samples under `key`.
+
+    Best effort: a samples directory that cannot be written only costs the
+    next run a reparse.
+    """
+
+    if np is None or pd is None:
+        raise RuntimeError(
+            "pandas/numpy are required. Install dependencies in benchmark_analysis first."
+        ) from _IMPORT_ERROR
+    columns = {"run_id": frame["run_id"].to_numpy(dtype="U")}
+    for name, dtype in SAMPLE_COLUMNS:
+        columns[name] = frame[name].to_numpy(dtype="U" if dtype == "str" else dtype)
+    buffer = io.BytesIO()
+    np.savez(buffer, key=np.array(key), **columns)
+    try:
+        atomic_write_bytes(samples_dir / PARSE_CACHE_NAME, buffer.getvalue())
+    except OSError:
+        pass
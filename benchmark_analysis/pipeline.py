@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Callable
+from typing import Collection
+from typing import Mapping
+from typing import Sequence
+
+from full_matrix_common import atomic_write_bytes
+
+
+STATE_FILE_NAME = "pipeline_state.json"
+SUMMARY_FILE_NAME = "pipeline_summary.json"
+STATE_SCHEMA_VERSION = 1
+
+StageResult = dict[str, object]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of a pipeline DAG.
+
+    Args:
+        name: Stage name, unique within the pipeline.
+        run: Called as `run(inputs)` with the results of the `inputs` stages by
+            name; returns a JSON-serializable result that is persisted.
+        inputs: Upstream stage names.
+        outputs: Result keys holding file paths; a persisted success is only
+            reused while all of them still exist.
+        reusable: Optional extra check on a persisted result before reuse.
+        retries: Extra attempts after a failure.
+        retry_on: Exception types that are retried; others fail at once.
+        retry_delay_sec: Pause before each retry.
+    """
+
+    name: str
+    run: Callable[[Mapping[str, StageResult]], StageResult]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    reusable: Callable[[StageResult], bool] | None = None
+    retries: int = 0
+    retry_on: tuple[type[BaseException], ...] = (Exception,)
+    retry_delay_sec: float = 0.0
+
+
+@dataclass
+class StageRecord:
+    """Persisted state of one stage for one pipeline key (profile).
+
+    Args:
+        status: `pending`, `running`, `succeeded` or `failed`.
+        result: Result of the last successful attempt.
+        attempts: Every attempt as `{started_at, duration_sec, outcome, error}`,
+            accumulated across invocations.
+    """
+
+    status: str = "pending"
+    result: StageResult = field(default_factory=dict)
+    attempts: list[dict[str, object]] = field(default_factory=list)
+
+    @property
+    def duration_sec(self) -> float:
+        """Total time spent in this stage over all attempts."""
+
+        return sum(float(a.get("duration_sec", 0.0)) for a in self.attempts)
+
+
+class StageError(RuntimeError):
+    """A stage failed after exhausting its retries.
+
+    Args:
+        key: Pipeline key (profile name).
+        stage: Failed stage name.
+        attempts: Attempts made in this invocation.
+    """
+
+    def __init__(self, key: str, stage: str, attempts: int, cause: BaseException) -> None:
+        super().__init__(f"[{key}] stage {stage} failed after {attempts} attempt(s): {cause}")
+        self.key = key
+        self.stage = stage
+        self.attempts = attempts
+
+
+class StageState:
+    """Per-key stage records persisted as JSON next to the key's outputs.
+
+    Every transition is written atomically, so an interrupted campaign shows
+    which stage was running and what already succeeded. `session` orders the
+    stages that succeeded in this process, so a stage split across several
+    `Pipeline.run` calls (build now, capture later) sees its inputs as fresh.
+
+    Args:
+        path: State file.
+        key: Pipeline key (profile name) used in messages.
+        fresh: Discard any state persisted by an earlier invocation.
+    """
+
+    def __init__(self, path: Path, key: str, fresh: bool = False) -> None:
+        if fresh and path.is_file():
+            path.unlink()
+        self.path = path
+        self.key = key
+        self._lock = threading.Lock()
+        self.records: dict[str, StageRecord] = {}
+        self.session: dict[str, int] = {}
+        self._session_seq = 0
+        if path.is_file():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                data = {}
+            for name, raw in dict(data.get("stages", {})).items():
+                self.records[name] = StageRecord(
+                    status=str(raw.get("status", "pending")),
+                    result=dict(raw.get("result") or {}),
+                    attempts=list(raw.get("attempts") or []),
+                )
+
+    def record(self, stage: str) -> StageRecord:
+        """Returns the record of `stage`, creating a pending one."""
+
+        with self._lock:
+            return self.records.setdefault(stage, StageRecord())
+
+    def mark_ran(self, stage: str) -> None:
+        """Records that `stage` succeeded in this process, after all earlier ones."""
+
+        with self._lock:
+            self._session_seq += 1
+            self.session[stage] = self._session_seq
+
+    def save(self) -> None:
+        """Writes all records atomically."""
+
+        with self._lock:
+            payload = {
+                "schema_version": STATE_SCHEMA_VERSION,
+                "key": self.key,
+                "stages": {
+                    name: {
+                        "status": rec.status,
+                        "result": rec.result,
+                        "attempts": rec.attempts,
+                    }
+                    for name, rec in self.records.items()
+                },
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = json.dumps(payload, indent=2, ensure_ascii=False, default=str)
+            atomic_write_bytes(self.path, data.encode("utf-8"))
+
+
+def _iso_utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Pipeline:
+    """A DAG of stages run in dependency order against a `StageState`.
+
+    A stage that already succeeded is reused (not rerun) unless it is forced
+    or one of its inputs ran after it. A success from this process only needs
+    its outputs to exist; one persisted by an earlier invocation must also
+    pass `reusable`. A failed stage is retried per its policy and then stops
+    the pipeline; its dependents do not run.
+
+    Raises:
+        ValueError: Duplicate stage names, unknown inputs or a cycle.
+    """
+
+    def __init__(self, stages: Sequence[Stage]) -> None:
+        by_name: dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in by_name:
+                raise ValueError(f"Duplicate stage: {stage.name}")
+            by_name[stage.name] = stage
+        for stage in stages:
+            unknown = [name for name in stage.inputs if name not in by_name]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} has unknown inputs: {', '.join(unknown)}")
+        self.stages = by_name
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> list[str]:
+        order: list[str] = []
+        visiting: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage cycle through {name}")
+            visiting.add(name)
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _closure(self, targets: Collection[str]) -> set[str]:
+        needed: set[str] = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].inputs)
+        return needed
+
+    def _reusable(self, stage: Stage, state: StageState) -> bool:
+        record = state.record(stage.name)
+        if record.status != "succeeded":
+            return False
+        ran_at = state.session.get(stage.name, 0)
+        if any(state.session.get(dep, 0) > ran_at for dep in stage.inputs):
+            return False
+        for key in stage.outputs:
+            value = record.result.get(key)
+            if value is not None and not Path(str(value)).exists():
+                return False
+        if ran_at:
+            return True
+        return stage.reusable is None or stage.reusable(record.result)
+
+    def run(
+        self,
+        state: StageState,
+        targets: Collection[str] | None = None,
+        force: Collection[str] = (),
+        log: Callable[[str], object] = print,
+    ) -> dict[str, StageResult]:
+        """Runs `targets` (default: every stage) and their inputs.
+
+        Returns:
+            Results of every stage that ran or was reused, by name.
+
+        Raises:
+            StageError: A stage failed after its retries.
+        """
+
+        needed = self._closure(targets if targets is not None else self.order)
+        results: dict[str, StageResult] = {}
+        for name in self.order:
+            if name not in needed:
+                continue
+            stage = self.stages[name]
+            record = state.record(name)
+            if name not in force and self._reusable(stage, state):
+                results[name] = record.result
+                continue
+            inputs = {dep: results[dep] for dep in stage.inputs}
+            results[name] = self._run_stage(stage, state, record, inputs, log)
+        return results
+
+    def _run_stage(
+        self,
+        stage: Stage,
+        state: StageState,
+        record: StageRecord,
+        inputs: Mapping[str, StageResult],
+        log: Callable[[str], object],
+    ) -> StageResult:
+        for attempt in range(1, stage.retries + 2):
+            started = time.monotonic()
+            entry: dict[str, object] = {"started_at": _iso_utc_now(), "outcome": "running"}
+            record.status = "running"
+            record.attempts.append(entry)
+            state.save()
+            try:
+                result = dict(stage.run(inputs) or {})
+            except BaseException as exc:
+                entry.update(
+                    duration_sec=round(time.monotonic() - started, 3),
+                    outcome="failed",
+                    error=f"{type(exc).__name__}: {exc}",
+                )
+                record.status = "failed"
+                state.save()
+                retryable = isinstance(exc, stage.retry_on) and isinstance(exc, Exception)
+                if not retryable or attempt > stage.retries:
+                    raise StageError(state.key, stage.name, attempt, exc) from exc
+                log(
+                    f"[{state.key}] stage {stage.name} failed ({exc}); "
+                    f"retry {attempt}/{stage.retries}."
+                )
+                time.sleep(stage.retry_delay_sec)
+                continue
+            entry.update(duration_sec=round(time.monotonic() - started, 3), outcome="succeeded")
+            record.status = "succeeded"
+            record.result = result
+            state.mark_ran(stage.name)
+            state.save()
+            return result
+        raise AssertionError("unreachable")
+
+
+@dataclass(frozen=True)
+class StageSummary:
+    """Time spent in one stage over a campaign.
+
+    Args:
+        stage: Stage name.
+        keys: Pipeline keys (profiles) that ran the stage.
+        attempts: Attempts over all keys.
+        failures: Failed attempts over all keys.
+        total_sec: Time over all attempts.
+        slowest_key: Key with the largest time in this stage.
+        slowest_sec: That key's time.
+    """
+
+    stage: str
+    keys: int
+    attempts: int
+    failures: int
+    total_sec: float
+    slowest_key: str
+    slowest_sec: float
+
+
+def summarize_stages(states: Sequence[StageState]) -> list[StageSummary]:
+    """Aggregates stage timings over keys, largest total first."""
+
+    per_stage: dict[str, list[tuple[str, StageRecord]]] = {}
+    for state in states:
+        for name, record in state.records.items():
+            if record.attempts:
+                per_stage.setdefault(name, []).append((state.key, record))
+    summaries = []
+    for name, items in per_stage.items():
+        slowest_key, slowest = max(items, key=lambda item: item[1].duration_sec)
+        summaries.append(
+            StageSummary(
+                stage=name,
+                keys=len(items),
+                attempts=sum(len(rec.attempts) for _, rec in items),
+                failures=sum(
+                    1 for _, rec in items for a in rec.attempts if a.get("outcome") == "failed"
+                ),
+                total_sec=sum(rec.duration_sec for _, rec in items),
+                slowest_key=slowest_key,
+                slowest_sec=slowest.duration_sec,
+            )
+        )
+    return sorted(summaries, key=lambda item: item.total_sec, reverse=True)
+
+
+def format_stage_summary(summaries: Sequence[StageSummary], wall_sec: float) -> list[str]:
+    """Renders the summary as console lines.
+
+    Stage times are summed over profiles, so with several boards or a build
+    pipeline their total can exceed the wall time of this invocation.
+    """
+
+    total = sum(item.total_sec for item in summaries)
+    lines = [
+        f"Stage time summary (wall {wall_sec:.1f}s this run, stage total {total:.1f}s):",
+        f"{'stage':<10} {'profiles':>8} {'attempts':>8} {'failed':>6} "
+        f"{'total_s':>9} {'share':>6}  slowest",
+    ]
+    for item in summaries:
+        share = item.total_sec / total if total > 0 else 0.0
+        lines.append(
+            f"{item.stage:<10} {item.keys:>8} {item.attempts:>8} {item.failures:>6} "
+            f"{item.total_sec:>9.1f} {share:>6.1%}  {item.slowest_key} ({item.slowest_sec:.1f}s)"
+        )
+    return lines
+
+
+def write_stage_summary(path: Path, summaries: Sequence[StageSummary], wall_sec: float) -> None:
+    """Writes the summary as JSON."""
+
+    payload = {
+        "wall_sec": round(wall_sec, 3),
+        "stages": [asdict(summary) for summary in summaries],
+    }
+    atomic_write_bytes(path, json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8"))
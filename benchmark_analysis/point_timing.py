@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+from typing import Mapping
+
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import NOMINAL_HCLK_HZ
+from full_matrix_common import atomic_write_bytes
+
+
+HISTORY_SCHEMA_VERSION = 1
+HISTORY_MAX_SAMPLES = 256
+MIN_HISTORY_SAMPLES = 5
+MIN_POINT_TIMEOUT_SEC = 5.0
+DEFAULT_TIMEOUT_QUANTILE = 0.99
+TIMESTAMP_SIDECAR_NAME = "serial_capture.times.tsv"
+# Points shorter than this are dominated by USB latency and chunk granularity.
+MIN_CLOCK_WALL_SEC = 0.05
+DEFAULT_CLOCK_TOLERANCE = 0.2
+CLOCK_CHECK_COLUMNS: tuple[str, ...] = (
+    "profile",
+    "run_id",
+    "implied_clock_mhz",
+    "clock_deviation",
+    "clock_flagged",
+)
+
+Point = tuple[str, int]
+
+
+class PointTracker:
+    """Follows the firmware output on the reader thread to know which point is due.
+
+    Only looks at raw line prefixes, so it stays cheap enough for the reader.
+    Records the host-side gap before each record line (time since the previous
+    line), which is what a per-point idle deadline has to cover.
+    """
+
+    def __init__(self) -> None:
+        self._in_run = False
+        self._position = 0
+        self._last_line_at: float | None = None
+        self.gaps: dict[Point, list[float]] = {}
+
+    @property
+    def expected_point(self) -> Point | None:
+        """Point the board is computing now, or `None` between runs."""
+
+        if not self._in_run or self._position >= len(EXPECTED_RECORD_ORDER):
+            return None
+        return EXPECTED_RECORD_ORDER[self._position]
+
+    def observe(self, line: bytes, received_at: float) -> None:
+        """Feeds one raw line received at host monotonic time `received_at`."""
+
+        stripped = line.strip().lstrip(b"\xef\xbb\xbf")
+        if stripped.startswith(b"op,"):
+            self._in_run = True
+            self._position = 0
+        elif stripped.lower() == b"done":
+            self._in_run = False
+        elif self._in_run and self.expected_point is not None:
+            op, n = self.expected_point
+            if stripped.startswith(f"{op},{n},".encode("ascii")):
+                if self._last_line_at is not None:
+                    self.gaps.setdefault((op, n), []).append(received_at - self._last_line_at)
+                self._position += 1
+        self._last_line_at = received_at
+
+
+class PointTimingHistory:
+    """Per-profile history of inter-line gaps before each `(op, n)` record.
+
+    Args:
+        gaps: Observed gaps in seconds, most recent last.
+    """
+
+    def __init__(self, gaps: Mapping[Point, list[float]] | None = None) -> None:
+        self.gaps: dict[Point, list[float]] = {k: list(v) for k, v in (gaps or {}).items()}
+
+    @classmethod
+    def load(cls, path: Path) -> PointTimingHistory:
+        """Loads a history file; a missing or unreadable file yields an empty history."""
+
+        if not path.is_file():
+            return cls()
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError:
+            return cls()
+        if not isinstance(data, dict) or data.get("version") != HISTORY_SCHEMA_VERSION:
+            return cls()
+        gaps: dict[Point, list[float]] = {}
+        for key, values in data.get("gaps", {}).items():
+            op, _, n = key.partition(",")
+            gaps[(op, int(n))] = [float(v) for v in values]
+        return cls(gaps)
+
+    def save(self, path: Path) -> None:
+        """Writes the history atomically."""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": HISTORY_SCHEMA_VERSION,
+            "gaps": {f"{op},{n}": values for (op, n), values in sorted(self.gaps.items())},
+        }
+        atomic_write_bytes(path, json.dumps(payload, indent=2).encode("utf-8"))
+
+    def extend(self, observed: Mapping[Point, list[float]]) -> None:
+        """Adds freshly observed gaps, keeping the newest `HISTORY_MAX_SAMPLES` per point."""
+
+        for point, values in observed.items():
+            merged = self.gaps.get(point, []) + list(values)
+            self.gaps[point] = merged[-HISTORY_MAX_SAMPLES:]
+
+    def deadlines(
+        self,
+        safety_factor: float,
+        fallback_sec: float,
+        quantile: float = DEFAULT_TIMEOUT_QUANTILE,
+    ) -> dict[Point, float]:
+        """Returns per-point idle deadlines.
+
+        Each deadline is `quantile(gaps) * safety_factor`, at least
+        `MIN_POINT_TIMEOUT_SEC` and at most `fallback_sec`. Points with fewer
+        than `MIN_HISTORY_SAMPLES` gaps are omitted (callers use the global
+        timeout for them).
+        """
+
+        result: dict[Point, float] = {}
+        for point, values in self.gaps.items():
+            if len(values) < MIN_HISTORY_SAMPLES:
+                continue
+            ordered = sorted(values)
+            index = min(len(ordered) - 1, math.ceil(quantile * len(ordered)) - 1)
+            deadline = ordered[max(0, index)] * safety_factor
+            result[point] = min(fallback_sec, max(MIN_POINT_TIMEOUT_SEC, deadline))
+        return result
+
+
+def load_point_wall_times(sidecar: Path) -> dict[int, dict[Point, float]]:
+    """Derives per-point wall time from a capture timestamp sidecar.
+
+    A point's wall time is the host-side gap between its record line and the
+    previous line. Blocks are attributed to runs through the
+    `# committed run=<k>` markers; a later session recapturing run `k`
+    replaces the earlier one. Timestamps are only compared within a session.
+
+    Returns:
+        `{run_index: {(op, n): seconds}}`; empty when the sidecar is missing.
+    """
+
+    result: dict[int, dict[Point, float]] = {}
+    if not sidecar.is_file():
+        return result
+
+    block: dict[Point, float] = {}
+    prev_at: float | None = None
+    with sidecar.open("r", encoding="utf-8", errors="replace") as fp:
+        for raw in fp:
+            stamp, sep, line = raw.rstrip("\n").partition("\t")
+            if not sep:
+                # Session header: monotonic clocks of different sessions are unrelated.
+                block = {}
+                prev_at = None
+                continue
+            try:
+                received_at = float(stamp)
+            except ValueError:
+                continue
+            line = line.strip()
+            if line.startswith("# committed run="):
+                result[int(line.split("=", 1)[1])] = block
+                block = {}
+                continue
+            cols = line.lstrip("\ufeff").split(",")
+            if cols[0] == "op":
+                block = {}
+            elif cols[0] in ("mul", "inv") and len(cols) >= 2 and cols[1].isdigit():
+                if prev_at is not None:
+                    block[(cols[0], int(cols[1]))] = received_at - prev_at
+            prev_at = received_at
+    return result
+
+
+@dataclass(frozen=True)
+class ClockCheck:
+    """Implied core clock of one run.
+
+    Args:
+        run_id: Run identifier (for example `run_001`).
+        implied_hz: Clock implied by DWT cycles over host wall time.
+        deviation: `implied_hz / nominal - 1`.
+        flagged: Whether `deviation` exceeds the tolerance.
+    """
+
+    run_id: str
+    implied_hz: float
+    deviation: float
+    flagged: bool
+
+
+def implied_clock_hz(cycles_per_iteration: float, iterations: int, wall_sec: float) -> float:
+    """Returns `cycles x iterations / elapsed` in Hz."""
+
+    return cycles_per_iteration * iterations / wall_sec
+
+
+def run_clock_checks(
+    rows: Iterable[Mapping[str, object]],
+    wall_times: Mapping[int, Mapping[Point, float]],
+    nominal_hz: float = NOMINAL_HCLK_HZ,
+    tolerance: float = DEFAULT_CLOCK_TOLERANCE,
+) -> list[ClockCheck]:
+    """Estimates each run's core clock and flags deviations from `nominal_hz`.
+
+    Per point the implied clock is
+    `(eigen + cmsis cycles) x (repeat + warmup) / wall time`: warmup rounds and
+    rounds later counted invalid still ran both timed sections. Input generation and checks between the timed sections are not counted, so
+    this underestimates the real clock; the run estimate therefore takes the
+    most compute-bound point (highest implied clock) among points lasting at
+    least `MIN_CLOCK_WALL_SEC`.
+
+    Args:
+        rows: Record dicts with `run_id`, `op`, `n`, `repeat`, `warmup`,
+            `eigen_avg_cycles` and `cmsis_avg_cycles`.
+        wall_times: Output of `load_point_wall_times`.
+        nominal_hz: Configured HCLK.
+        tolerance: Allowed relative deviation.
+
+    Returns:
+        One check per run with usable timing, in run order.
+    """
+
+    best: dict[str, float] = {}
+    for row in rows:
+        run_id = str(row["run_id"])
+        _, _, suffix = run_id.partition("_")
+        if not suffix.isdigit():
+            continue
+        wall = wall_times.get(int(suffix), {}).get((str(row["op"]), int(row["n"])))
+        if wall is None or wall < MIN_CLOCK_WALL_SEC:
+            continue
+        cycles = float(row["eigen_avg_cycles"]) + float(row["cmsis_avg_cycles"])
+        iterations = int(row["repeat"]) + int(row["warmup"])
+        implied = implied_clock_hz(cycles, iterations, wall)
+        best[run_id] = max(best.get(run_id, 0.0), implied)
+
+    checks: list[ClockCheck] = []
+    for run_id in sorted(best):
+        deviation = best[run_id] / nominal_hz - 1.0
+        checks.append(
+            ClockCheck(
+                run_id=run_id,
+                implied_hz=best[run_id],
+                deviation=deviation,
+                flagged=abs(deviation) > tolerance,
+            )
+        )
+    return checks
+
+
+def profile_clock_rows(
+    profile: str,
+    samples_dir: Path,
+    rows: Iterable[Mapping[str, object]],
+    tolerance: float = DEFAULT_CLOCK_TOLERANCE,
+) -> list[dict[str, object]]:
+    """Runs `run_clock_checks` for one profile and returns report/CSV rows.
+
+    The timestamp sidecar is read from `logs/` next to `samples_dir`; profiles
+    captured before timestamps existed yield no rows.
+    """
+
+    sidecar = samples_dir.parent / "logs" / TIMESTAMP_SIDECAR_NAME
+    checks = run_clock_checks(rows, load_point_wall_times(sidecar), tolerance=tolerance)
+    return [
+        {
+            "profile": profile,
+            "run_id": check.run_id,
+            "implied_clock_mhz": check.implied_hz / 1e6,
+            "clock_deviation": check.deviation,
+            "clock_flagged": check.flagged,
+        }
+        for check in checks
+    ]
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping
+from typing import Sequence
+
+from campaign_store import STORE_DIR_NAME
+from campaign_store import stored_runs
+from full_matrix_common import BuildProfile
+from full_matrix_common import DISTINCT_CURVE_DIFF
+from full_matrix_common import SampleRecord
+from full_matrix_common import atomic_write_bytes
+from full_matrix_common import parse_run_lines
+from full_matrix_common import resolve_samples_dir
+from point_timing import Point
+from sequential_stop import eigen_over_cmsis
+
+
+SCHEDULE_FILE_NAME = "profile_schedule.json"
+DEFAULT_ANCHORS = "C1,C3"
+
+Curve = dict[Point, float]
+
+
+def load_curve(profile_dir: Path) -> Curve:
+    """Returns the mean `eigen_over_cmsis` per `(op, n)` over a profile's runs.
+
+    Runs come from the campaign store next to `profile_dir`, or from the run
+    files for profiles the store does not hold. Aliased profiles read the
+    samples of the profile they alias. A profile without runs yields an
+    empty curve.
+    """
+
+    samples_dir = resolve_samples_dir(profile_dir)
+    runs: list[Sequence[SampleRecord]] = list(
+        stored_runs(profile_dir.parent / STORE_DIR_NAME, samples_dir.parent.name).values()
+    )
+    if not runs:
+        for run_file in sorted(samples_dir.glob("run_*.csv")):
+            text = run_file.read_bytes().decode("utf-8", errors="ignore")
+            runs.append(parse_run_lines(text.splitlines()))
+    sums: dict[Point, tuple[int, float]] = {}
+    for records in runs:
+        for record in records:
+            count, total = sums.get((record.op, record.n), (0, 0.0))
+            sums[(record.op, record.n)] = (count + 1, total + eigen_over_cmsis(record))
+    return {point: total / count for point, (count, total) in sums.items()}
+
+
+def mean_curve_diff(curve_a: Mapping[Point, float], curve_b: Mapping[Point, float]) -> float:
+    """Returns the mean absolute curve difference over the shared points.
+
+    Same measure as the report's `_mean_curve_diff`; NaN without shared points.
+    """
+
+    shared = [point for point in curve_a if point in curve_b]
+    if not shared:
+        return float("nan")
+    return sum(abs(curve_a[point] - curve_b[point]) for point in shared) / len(shared)
+
+
+@dataclass(frozen=True)
+class ScheduledProfile:
+    """One piloted profile in its scheduled position.
+
+    Args:
+        name: Profile name.
+        nearest: Closest already captured or scheduled profile, if any.
+        nearest_diff: Mean curve difference to `nearest` (NaN if unknown).
+        baseline_diff: Mean curve difference to the baseline anchor (NaN if unknown).
+        distinctive: Whether `nearest_diff` reaches `DISTINCT_CURVE_DIFF`
+            (an unknown distance counts as distinctive).
+    """
+
+    name: str
+    nearest: str | None
+    nearest_diff: float
+    baseline_diff: float
+    distinctive: bool
+
+
+def split_anchors(
+    profiles: Sequence[BuildProfile],
+    anchor_names: Sequence[str],
+) -> tuple[list[BuildProfile], list[BuildProfile]]:
+    """Splits the selection into anchors (captured in full first) and the rest.
+
+    Falls back to the first selected profile when no anchor is selected.
+    """
+
+    wanted = set(anchor_names)
+    anchors = [profile for profile in profiles if profile.name in wanted]
+    if not anchors and profiles:
+        anchors = [profiles[0]]
+    names = {profile.name for profile in anchors}
+    return anchors, [profile for profile in profiles if profile.name not in names]
+
+
+def schedule_by_distinctiveness(
+    pilots: Mapping[str, Curve],
+    anchors: Mapping[str, Curve],
+    baseline: str | None = None,
+) -> list[ScheduledProfile]:
+    """Orders piloted profiles so the least redundant curves are captured first.
+
+    Greedy farthest-first: each step picks the pilot whose nearest neighbour
+    among the anchors and the profiles scheduled so far is furthest away, so a
+    profile that merely duplicates an earlier curve sinks to the end. Pilots
+    without a curve go first, since nothing is known about them. Ties keep the
+    input order.
+
+    Args:
+        pilots: Pilot curves by profile name, in selection order.
+        anchors: Fully captured reference curves by profile name.
+        baseline: Anchor for `baseline_diff` (default: the first anchor).
+    """
+
+    reference = {name: curve for name, curve in anchors.items() if curve}
+    if baseline is None:
+        baseline = next(iter(anchors), None)
+    base_curve = anchors.get(baseline, {}) if baseline is not None else {}
+    remaining = dict(pilots)
+    order: list[ScheduledProfile] = []
+    while remaining:
+        best: ScheduledProfile | None = None
+        best_key = -math.inf
+        for name, curve in remaining.items():
+            nearest, nearest_diff = None, float("nan")
+            for other, other_curve in reference.items():
+                diff = mean_curve_diff(curve, other_curve)
+                if not math.isnan(diff) and (math.isnan(nearest_diff) or diff < nearest_diff):
+                    nearest, nearest_diff = other, diff
+            key = math.inf if math.isnan(nearest_diff) else nearest_diff
+            if key > best_key:
+                best_key = key
+                best = ScheduledProfile(
+                    name=name,
+                    nearest=nearest,
+                    nearest_diff=nearest_diff,
+                    baseline_diff=mean_curve_diff(curve, base_curve),
+                    distinctive=key >= DISTINCT_CURVE_DIFF,
+                )
+        assert best is not None
+        order.append(best)
+        if remaining[best.name]:
+            reference[best.name] = remaining[best.name]
+        del remaining[best.name]
+    return order
+
+
+def schedule_profiles(
+    build_root: Path,
+    anchors: Sequence[BuildProfile],
+    pilots: Sequence[BuildProfile],
+) -> list[ScheduledProfile]:
+    """Loads the captured anchor and pilot curves and schedules the pilots."""
+
+    return schedule_by_distinctiveness(
+        {profile.name: load_curve(build_root / profile.name) for profile in pilots},
+        {profile.name: load_curve(build_root / profile.name) for profile in anchors},
+    )
+
+
+def save_schedule(
+    path: Path,
+    schedule: Sequence[ScheduledProfile],
+    anchors: Sequence[str],
+    pilot_runs: int,
+) -> None:
+    """Writes the schedule as JSON (NaN distances become `null`)."""
+
+    items = []
+    for item in schedule:
+        entry = asdict(item)
+        for key in ("nearest_diff", "baseline_diff"):
+            if math.isnan(entry[key]):
+                entry[key] = None
+        items.append(entry)
+    payload = {"anchors": list(anchors), "pilot_runs": pilot_runs, "schedule": items}
+    atomic_write_bytes(path, json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def describe_schedule(schedule: Sequence[ScheduledProfile]) -> list[str]:
+    """Returns one console line per scheduled profile."""
+
+    lines = []
+    for rank, item in enumerate(schedule, start=1):
+        if item.nearest is None:
+            lines.append(f"{rank:2d}. {item.name}: no pilot curve")
+            continue
+        verdict = "distinctive" if item.distinctive else f"likely duplicates {item.nearest}"
+        lines.append(
+            f"{rank:2d}. {item.name}: nearest {item.nearest} diff={item.nearest_diff:.4f}, "
+            f"vs baseline {item.baseline_diff:.4f} ({verdict})"
+        )
+    return lines
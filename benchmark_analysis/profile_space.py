@@ -0,0 +1,459 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import json
+import math
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Mapping
+from typing import Sequence
+
+from full_matrix_common import BuildProfile
+from full_matrix_common import atomic_write_bytes
+
+
+PLAN_FILE_NAME = "profile_plan.json"
+PLAN_SCHEMA_VERSION = 1
+DESIGNS: tuple[str, ...] = ("full", "fractional", "screening")
+FACTOR_LETTERS = "ABCDEFGHJKL"
+
+# Standard minimum-aberration 2^(k-p) generators (Montgomery, Design and
+# Analysis of Experiments, table 8.14): the last p factors are products of
+# the k-p base factors.
+FRACTIONAL_GENERATORS: dict[tuple[int, int], tuple[str, ...]] = {
+    (3, 1): ("AB",),
+    (4, 1): ("ABC",),
+    (5, 1): ("ABCD",),
+    (5, 2): ("AB", "AC"),
+    (6, 1): ("ABCDE",),
+    (6, 2): ("ABC", "BCD"),
+    (6, 3): ("AB", "AC", "BC"),
+    (7, 1): ("ABCDEF",),
+    (7, 2): ("ABCD", "ABDE"),
+    (7, 3): ("ABC", "BCD", "ACD"),
+    (7, 4): ("AB", "AC", "BC", "ABC"),
+}
+
+# Plackett-Burman first rows; the other rows are cyclic shifts plus a row of
+# all low levels.
+PLACKETT_BURMAN_ROWS: dict[int, str] = {
+    4: "++-",
+    8: "+++-+--",
+    12: "++-+++---+-",
+}
+
+
+@dataclass(frozen=True)
+class AxisLevel:
+    """One setting of a profile axis.
+
+    Args:
+        name: Short level name (for example `O3`, `on`).
+        flags: Flags added to both C and C++ compiler flags.
+        ldflags: Flags added to the linker flags.
+    """
+
+    name: str
+    flags: str = ""
+    ldflags: str = ""
+
+
+@dataclass(frozen=True)
+class ProfileAxis:
+    """One compiler option axis; the first level is the baseline.
+
+    Args:
+        name: Axis name (for example `lto`).
+        levels: Possible settings, baseline first.
+    """
+
+    name: str
+    levels: tuple[AxisLevel, ...]
+
+    def level(self, name: str) -> AxisLevel:
+        """Returns the level called `name`."""
+
+        for level in self.levels:
+            if level.name == name:
+                return level
+        raise ValueError(f"Axis {self.name} has no level {name!r}.")
+
+
+@dataclass(frozen=True)
+class ProfileSpace:
+    """Profiles described as axes instead of literals.
+
+    Args:
+        axes: Option axes, in flag order.
+        flags_template: Compiler flags with `{flags}` for the axis flags.
+        ldflags_template: Linker flags with `{ldflags}` for the axis flags.
+        name_prefix: Prefix of generated profile names (`P` gives `P01`...).
+    """
+
+    axes: tuple[ProfileAxis, ...]
+    flags_template: str = "{flags}"
+    ldflags_template: str = "{ldflags}"
+    name_prefix: str = "P"
+
+    def build_profile(self, name: str, levels: Mapping[str, str]) -> BuildProfile:
+        """Builds the profile that sets each axis to `levels[axis]` (baseline if absent)."""
+
+        chosen = [axis.level(levels.get(axis.name, axis.levels[0].name)) for axis in self.axes]
+        flags = " ".join(level.flags for level in chosen if level.flags)
+        ldflags = " ".join(level.ldflags for level in chosen if level.ldflags)
+        cflags = " ".join(self.flags_template.format(flags=flags).split())
+        return BuildProfile(
+            name=name,
+            cflags=cflags,
+            cxxflags=cflags,
+            ldflags=" ".join(self.ldflags_template.format(ldflags=ldflags).split()),
+            uses_lto="-flto" in cflags.split(),
+        )
+
+
+def load_profile_space(path: Path) -> ProfileSpace:
+    """Loads a profile space from JSON.
+
+    Expected shape::
+
+        {"flags_template": "-g0 {flags} -DNDEBUG",
+         "ldflags_template": "{ldflags} -Wl,--undefined=vTaskSwitchContext",
+         "name_prefix": "P",
+         "axes": [{"name": "lto", "levels": [{"name": "on", "flags": "-flto",
+                                              "ldflags": "-flto"},
+                                             {"name": "off"}]}]}
+
+    Raises:
+        ValueError: The file does not describe a valid space.
+    """
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(data, dict) or not isinstance(data.get("axes"), list):
+        raise ValueError(f"{path}: expected an object with an 'axes' list.")
+    axes: list[ProfileAxis] = []
+    for raw_axis in data["axes"]:
+        name = str(raw_axis.get("name", ""))
+        raw_levels = raw_axis.get("levels") or []
+        if not name or not raw_levels:
+            raise ValueError(f"{path}: every axis needs a name and at least one level.")
+        levels = tuple(
+            AxisLevel(
+                name=str(level["name"]),
+                flags=str(level.get("flags", "")),
+                ldflags=str(level.get("ldflags", "")),
+            )
+            for level in raw_levels
+        )
+        if len({level.name for level in levels}) != len(levels):
+            raise ValueError(f"{path}: duplicate level names on axis {name}.")
+        axes.append(ProfileAxis(name=name, levels=levels))
+    if len({axis.name for axis in axes}) != len(axes):
+        raise ValueError(f"{path}: duplicate axis names.")
+    prefix = str(data.get("name_prefix", "P")).upper()
+    if not prefix or not prefix.isalnum():
+        raise ValueError(f"{path}: name_prefix must be alphanumeric.")
+    return ProfileSpace(
+        axes=tuple(axes),
+        flags_template=str(data.get("flags_template", "{flags}")),
+        ldflags_template=str(data.get("ldflags_template", "{ldflags}")),
+        name_prefix=prefix,
+    )
+
+
+def fractional_factorial(factors: int, fraction: int) -> list[tuple[int, ...]]:
+    """Returns the rows (+1/-1 per factor) of a two-level 2^(k-p) design.
+
+    Base factors run in standard order; the last `fraction` factors follow
+    `FRACTIONAL_GENERATORS`.
+    """
+
+    if fraction == 0:
+        base_count, generators = factors, ()
+    elif (factors, fraction) in FRACTIONAL_GENERATORS:
+        base_count, generators = factors - fraction, FRACTIONAL_GENERATORS[(factors, fraction)]
+    else:
+        known = sorted(p for k, p in FRACTIONAL_GENERATORS if k == factors)
+        raise ValueError(
+            f"No 2^({factors}-{fraction}) design; available fractions for "
+            f"{factors} factors: {[0, *known]}."
+        )
+    rows: list[tuple[int, ...]] = []
+    for index in range(2**base_count):
+        base = [1 if index >> bit & 1 else -1 for bit in range(base_count)]
+        generated = [
+            math.prod(base[FACTOR_LETTERS.index(letter)] for letter in word)
+            for word in generators
+        ]
+        rows.append(tuple(base + generated))
+    return rows
+
+
+def design_resolution(factors: int, fraction: int) -> int | None:
+    """Returns the resolution of the 2^(k-p) design, `None` for a full factorial."""
+
+    if fraction == 0:
+        return None
+    words = [
+        set(word) | {FACTOR_LETTERS[factors - fraction + index]}
+        for index, word in enumerate(FRACTIONAL_GENERATORS[(factors, fraction)])
+    ]
+    lengths: list[int] = []
+    for count in range(1, len(words) + 1):
+        for combo in itertools.combinations(words, count):
+            product: set[str] = set()
+            for word in combo:
+                product ^= word
+            lengths.append(len(product))
+    return min(lengths)
+
+
+def plackett_burman(factors: int) -> list[tuple[int, ...]]:
+    """Returns a Plackett-Burman screening design for up to 11 two-level factors.
+
+    Main effects are estimable (resolution III) from 4, 8 or 12 runs.
+    """
+
+    for runs, first in sorted(PLACKETT_BURMAN_ROWS.items()):
+        if factors <= runs - 1:
+            signs = [1 if char == "+" else -1 for char in first]
+            rows = [tuple((signs[-shift:] + signs[:-shift])[:factors]) for shift in range(runs - 1)]
+            rows.append(tuple([-1] * factors))
+            return rows
+    raise ValueError(f"Screening supports at most 11 two-level axes, got {factors}.")
+
+
+@dataclass(frozen=True)
+class PlannedProfile:
+    """A generated profile and the axis levels it was built from.
+
+    Args:
+        profile: Generated profile.
+        levels: `{axis name: level name}` for every axis.
+    """
+
+    profile: BuildProfile
+    levels: dict[str, str]
+
+
+@dataclass(frozen=True)
+class CampaignPlan:
+    """Profiles selected by a design.
+
+    Args:
+        design: `full`, `fractional` or `screening`.
+        fraction: `p` of the 2^(k-p) design (0 unless fractional).
+        resolution: Design resolution, `None` for a full factorial.
+        two_level_axes: Axes varied by the two-level design, mapped to their
+            baseline level.
+        profiles: Planned profiles in run order.
+    """
+
+    design: str
+    fraction: int
+    resolution: int | None
+    two_level_axes: dict[str, str]
+    profiles: list[PlannedProfile] = field(default_factory=list)
+
+    @property
+    def build_profiles(self) -> list[BuildProfile]:
+        """The planned `BuildProfile`s in run order."""
+
+        return [item.profile for item in self.profiles]
+
+
+def plan_campaign(
+    space: ProfileSpace,
+    design: str = "fractional",
+    fraction: int = 1,
+) -> CampaignPlan:
+    """Expands `space` into profiles following `design`.
+
+    Two-level axes form the factorial or screening design; axes with more
+    levels are crossed in full with it and single-level axes stay fixed.
+    Duplicate flag sets are planned once.
+
+    Args:
+        space: Profile space.
+        design: `full` (every combination), `fractional` (2^(k-p)) or
+            `screening` (Plackett-Burman, main effects only).
+        fraction: `p` for the fractional design.
+    """
+
+    if design not in DESIGNS:
+        raise ValueError(f"Unknown design {design!r}; choose from {', '.join(DESIGNS)}.")
+    two_level = [axis for axis in space.axes if len(axis.levels) == 2]
+    crossed = [axis for axis in space.axes if len(axis.levels) > 2]
+
+    if design == "full" or not two_level:
+        fraction = 0
+        rows = fractional_factorial(len(two_level), 0)
+    elif design == "fractional":
+        rows = fractional_factorial(len(two_level), fraction)
+    else:
+        fraction = 0
+        rows = plackett_burman(len(two_level))
+    resolution = design_resolution(len(two_level), fraction) if design == "fractional" else None
+
+    plan = CampaignPlan(
+        design=design,
+        fraction=fraction,
+        resolution=resolution,
+        two_level_axes={axis.name: axis.levels[0].name for axis in two_level},
+    )
+    seen: set[tuple[str, str]] = set()
+    combos = itertools.product(*[[level.name for level in axis.levels] for axis in crossed])
+    for crossed_levels in combos:
+        for row in rows:
+            levels = {axis.name: axis.levels[0].name for axis in space.axes}
+            for axis, sign in zip(two_level, row):
+                levels[axis.name] = axis.levels[1 if sign > 0 else 0].name
+            for axis, level_name in zip(crossed, crossed_levels):
+                levels[axis.name] = level_name
+            name = f"{space.name_prefix}{len(plan.profiles) + 1:02d}"
+            profile = space.build_profile(name, levels)
+            key = (profile.cflags, profile.ldflags)
+            if key in seen:
+                continue
+            seen.add(key)
+            plan.profiles.append(PlannedProfile(profile=profile, levels=levels))
+    return plan
+
+
+def save_plan(plan: CampaignPlan, path: Path) -> None:
+    """Writes a plan as JSON (atomically)."""
+
+    payload = {
+        "version": PLAN_SCHEMA_VERSION,
+        "design": plan.design,
+        "fraction": plan.fraction,
+        "resolution": plan.resolution,
+        "two_level_axes": plan.two_level_axes,
+        "profiles": [
+            {
+                "name": item.profile.name,
+                "cflags": item.profile.cflags,
+                "cxxflags": item.profile.cxxflags,
+                "ldflags": item.profile.ldflags,
+                "uses_lto": item.profile.uses_lto,
+                "levels": item.levels,
+            }
+            for item in plan.profiles
+        ],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(path, json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def load_plan(path: Path) -> CampaignPlan:
+    """Reads a plan written by `save_plan`."""
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != PLAN_SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported plan version {data.get('version')!r}.")
+    plan = CampaignPlan(
+        design=str(data["design"]),
+        fraction=int(data["fraction"]),
+        resolution=data.get("resolution"),
+        two_level_axes=dict(data.get("two_level_axes", {})),
+    )
+    for item in data["profiles"]:
+        profile = BuildProfile(
+            name=str(item["name"]),
+            cflags=str(item["cflags"]),
+            cxxflags=str(item["cxxflags"]),
+            ldflags=str(item["ldflags"]),
+            uses_lto=bool(item["uses_lto"]),
+        )
+        plan.profiles.append(PlannedProfile(profile=profile, levels=dict(item["levels"])))
+    return plan
+
+
+def planned_profiles(input_root: Path) -> dict[str, BuildProfile]:
+    """Returns the profiles of the plan stored under `input_root`, if any."""
+
+    path = input_root / PLAN_FILE_NAME
+    if not path.is_file():
+        return {}
+    return {profile.name: profile for profile in load_plan(path).build_profiles}
+
+
+def main_effects(plan: CampaignPlan, responses: Mapping[str, float]) -> dict[str, float]:
+    """Estimates each two-level axis' main effect as a ratio.
+
+    The effect is `exp(mean(log y | second level) - mean(log y | baseline))`,
+    so `0.9` means the non-baseline level lowers the response by 10%.
+    Profiles without a positive response are ignored.
+
+    Args:
+        plan: Executed plan.
+        responses: `{profile name: response}`, for example geometric-mean cycles.
+    """
+
+    effects: dict[str, float] = {}
+    for axis, baseline in plan.two_level_axes.items():
+        high: list[float] = []
+        low: list[float] = []
+        for item in plan.profiles:
+            value = responses.get(item.profile.name)
+            if value is None or value <= 0:
+                continue
+            bucket = low if item.levels.get(axis) == baseline else high
+            bucket.append(math.log(value))
+        if high and low:
+            effects[axis] = math.exp(sum(high) / len(high) - sum(low) / len(low))
+    return effects
+
+
+def profile_responses(summary_csv: Path, metric: str) -> dict[str, float]:
+    """Reads a per-point summary CSV and returns the per-profile geometric mean of `metric`."""
+
+    logs: dict[str, list[float]] = {}
+    with summary_csv.open("r", encoding="utf-8", newline="") as fp:
+        for row in csv.DictReader(fp):
+            value = float(row[metric])
+            if value > 0:
+                logs.setdefault(row["profile"], []).append(math.log(value))
+    return {name: math.exp(sum(values) / len(values)) for name, values in logs.items()}
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parses CLI arguments."""
+
+    parser = argparse.ArgumentParser(description="Plan profile campaigns from a profile space.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    plan_parser = sub.add_parser("plan", help="Expand a profile space into profiles.")
+    plan_parser.add_argument("--space", required=True)
+    plan_parser.add_argument("--design", choices=DESIGNS, default="fractional")
+    plan_parser.add_argument("--fraction", type=int, default=1)
+    plan_parser.add_argument("--output", default="", help="Optional plan JSON path.")
+    effects_parser = sub.add_parser("effects", help="Estimate main effects of a captured plan.")
+    effects_parser.add_argument("--plan", required=True)
+    effects_parser.add_argument("--summary", required=True, help="summary_full_matrix.csv")
+    effects_parser.add_argument("--metric", default="eigen_mean")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entry point."""
+
+    args = parse_args(argv)
+    if args.command == "plan":
+        plan = plan_campaign(load_profile_space(Path(args.space)), args.design, args.fraction)
+        resolution = f", resolution {plan.resolution}" if plan.resolution else ""
+        print(f"{plan.design} design{resolution}: {len(plan.profiles)} profiles")
+        for item in plan.profiles:
+            print(f"{item.profile.name}\t{item.profile.cflags}\t{item.profile.ldflags}")
+        if args.output:
+            save_plan(plan, Path(args.output))
+        return
+    plan = load_plan(Path(args.plan))
+    effects = main_effects(plan, profile_responses(Path(args.summary), args.metric))
+    for axis, ratio in effects.items():
+        print(f"{axis}\t{ratio:.4f}\t({(ratio - 1.0) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+from typing import Mapping
+from typing import Sequence
+
+from elf_image import read_elf_symbols
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import atomic_write_bytes
+from point_timing import Point
+
+
+# Exported by User/benchmark_runner.cpp (extern "C", volatile uint32_t).
+PROGRESS_SYMBOLS: tuple[str, ...] = (
+    "g_bench_progress_op",
+    "g_bench_progress_n",
+    "g_bench_progress_line",
+    "g_bench_progress_done",
+)
+PROGRESS_OPS: dict[int, str] = {1: "mul", 2: "inv"}
+PROGRESS_FILE_NAME = "progress.json"
+DEFAULT_PROGRESS_INTERVAL_SEC = 1.0
+# Consecutive hung polls required before a hang is reported.
+DEFAULT_HUNG_CONFIRM_POLLS = 2
+
+# Cortex-M debug/system registers, readable while the core runs.
+ICSR_ADDR = 0xE000ED04
+DHCSR_ADDR = 0xE000EDF0
+DWT_CYCCNT_ADDR = 0xE0001004
+DHCSR_S_HALT = 1 << 17
+DHCSR_S_LOCKUP = 1 << 19
+ICSR_VECTACTIVE_MASK = 0x1FF
+FAULT_HANDLERS: dict[int, str] = {
+    2: "NMI",
+    3: "HardFault",
+    4: "MemManage",
+    5: "BusFault",
+    6: "UsageFault",
+}
+
+
+@dataclass(frozen=True)
+class ProgressAddresses:
+    """Target addresses of the firmware progress globals.
+
+    Args:
+        op: `g_bench_progress_op` (0=idle, 1=mul, 2=inv).
+        n: `g_bench_progress_n` (matrix size being computed).
+        line: `g_bench_progress_line` (points finished in the current run).
+        done: `g_bench_progress_done` (1 once the run printed `done`).
+    """
+
+    op: int
+    n: int
+    line: int
+    done: int
+
+
+def progress_addresses(elf_path: Path) -> ProgressAddresses:
+    """Resolves the progress globals from the ELF symbol table.
+
+    Raises:
+        ValueError: The ELF does not export all of `PROGRESS_SYMBOLS`.
+    """
+
+    symbols = read_elf_symbols(elf_path.read_bytes())
+    missing = [name for name in PROGRESS_SYMBOLS if name not in symbols]
+    if missing:
+        raise ValueError(f"{elf_path} lacks progress symbols: {', '.join(missing)}")
+    op, n, line, done = (symbols[name] for name in PROGRESS_SYMBOLS)
+    return ProgressAddresses(op=op, n=n, line=line, done=done)
+
+
+@dataclass(frozen=True)
+class ProgressSample:
+    """One poll of the target.
+
+    Args:
+        at: Host monotonic time of the poll.
+        op: Progress op code.
+        n: Progress matrix size.
+        line: Points finished in the current run.
+        done: Run finished flag.
+        dhcsr: Debug Halting Control and Status Register.
+        icsr: Interrupt Control and State Register.
+        cycles: DWT cycle counter.
+    """
+
+    at: float
+    op: int
+    n: int
+    line: int
+    done: int
+    dhcsr: int = 0
+    icsr: int = 0
+    cycles: int = 0
+
+
+@dataclass(frozen=True)
+class ProgressStatus:
+    """Progress of one capture as derived from the polls so far.
+
+    Args:
+        state: `idle`, `computing`, `overdue` (past its history deadline but
+            still executing), `hung` or `done`.
+        point: `(op, n)` being computed, if any.
+        points_done: Points finished over the whole capture.
+        points_total: Points the capture needs.
+        points_per_sec: Average rate since the first poll, once known.
+        eta_sec: Estimated time to finish, once the rate is known.
+        point_elapsed_sec: Time spent in the current point so far.
+        detail: Human-readable reason for `hung`/`overdue`.
+    """
+
+    state: str
+    point: Point | None
+    points_done: int
+    points_total: int
+    points_per_sec: float | None
+    eta_sec: float | None
+    point_elapsed_sec: float
+    detail: str = ""
+
+    def describe(self) -> str:
+        """Returns a one-line summary for the console."""
+
+        text = f"{self.points_done}/{self.points_total} points"
+        if self.points_per_sec is not None:
+            text += f", {self.points_per_sec:.2f} pt/s"
+        if self.eta_sec is not None:
+            text += f", ETA {self.eta_sec:.0f}s"
+        if self.point is not None:
+            op, n = self.point
+            text += f", {self.state} {op}-{n} for {self.point_elapsed_sec:.1f}s"
+        else:
+            text += f", {self.state}"
+        if self.detail:
+            text += f" ({self.detail})"
+        return text
+
+
+class ProgressTracker:
+    """Turns raw progress polls into capture progress and a hung/alive verdict.
+
+    The firmware resets the globals at the start of every run, so run
+    boundaries are detected from `done` rising or `line` falling (a poll
+    interval longer than the 200 ms pause between runs misses `done`).
+
+    Args:
+        runs_total: Firmware runs the capture waits for.
+        point_deadlines: Optional per-`(op, n)` expected upper bounds in seconds;
+            a point running longer is reported `overdue`.
+    """
+
+    def __init__(
+        self,
+        runs_total: int,
+        point_deadlines: Mapping[Point, float] | None = None,
+    ) -> None:
+        self._points_per_run = len(EXPECTED_RECORD_ORDER)
+        self._points_total = runs_total * self._points_per_run
+        self._deadlines = dict(point_deadlines or {})
+        self._runs_done = 0
+        self._prev: ProgressSample | None = None
+        self._first: tuple[float, int] | None = None
+        self._point_key: tuple[int, int, int, int] | None = None
+        self._point_since = 0.0
+
+    def update(self, sample: ProgressSample) -> ProgressStatus:
+        """Feeds one poll and returns the resulting status."""
+
+        prev = self._prev
+        if prev is not None:
+            if sample.done and not prev.done:
+                self._runs_done += 1
+            elif not prev.done and sample.line < prev.line:
+                self._runs_done += 1
+        self._prev = sample
+
+        in_run = 0 if sample.done else sample.line
+        points_done = min(self._points_total, self._runs_done * self._points_per_run + in_run)
+        if self._first is None:
+            self._first = (sample.at, points_done)
+        first_at, first_points = self._first
+        rate: float | None = None
+        eta: float | None = None
+        if sample.at > first_at and points_done > first_points:
+            rate = (points_done - first_points) / (sample.at - first_at)
+            eta = (self._points_total - points_done) / rate
+
+        point: Point | None = None
+        if not sample.done and sample.op in PROGRESS_OPS:
+            point = (PROGRESS_OPS[sample.op], sample.n)
+        key = (self._runs_done, sample.op, sample.n, sample.line)
+        if key != self._point_key:
+            self._point_key = key
+            self._point_since = sample.at
+        elapsed = sample.at - self._point_since
+
+        state, detail = self._classify(sample, prev, point, elapsed, points_done)
+        return ProgressStatus(
+            state=state,
+            point=point,
+            points_done=points_done,
+            points_total=self._points_total,
+            points_per_sec=rate,
+            eta_sec=eta,
+            point_elapsed_sec=elapsed,
+            detail=detail,
+        )
+
+    def _classify(
+        self,
+        sample: ProgressSample,
+        prev: ProgressSample | None,
+        point: Point | None,
+        elapsed: float,
+        points_done: int,
+    ) -> tuple[str, str]:
+        if sample.dhcsr & DHCSR_S_LOCKUP:
+            return "hung", "core locked up"
+        if sample.dhcsr & DHCSR_S_HALT:
+            return "hung", "core halted"
+        handler = FAULT_HANDLERS.get(sample.icsr & ICSR_VECTACTIVE_MASK)
+        if handler is not None:
+            return "hung", f"core in {handler} handler"
+        if points_done >= self._points_total:
+            return "done", ""
+        if point is None:
+            return "idle", ""
+        if prev is not None and elapsed > 0 and sample.cycles == prev.cycles:
+            return "hung", "DWT cycle counter stopped"
+        deadline = self._deadlines.get(point)
+        if deadline is not None and elapsed > deadline:
+            return "overdue", f"history deadline {deadline:.1f}s"
+        return "computing", ""
+
+
+class ProgressMonitor(threading.Thread):
+    """Polls the progress globals through the debug probe on a background thread.
+
+    Probe errors stop the monitor (recorded in `error`) but never the capture.
+
+    Args:
+        read_words: Reads `{address: value}` for 32-bit words from the running
+            target (for example `JLinkSession.read_words`).
+        addresses: Progress global addresses.
+        tracker: Progress interpretation.
+        interval_sec: Poll interval.
+        status_path: Optional JSON file rewritten atomically after every poll.
+        on_status: Optional callback receiving every status.
+        hung_confirm_polls: Consecutive `hung` polls before `hung_reason` is set.
+    """
+
+    def __init__(
+        self,
+        read_words: Callable[[Sequence[int]], Mapping[int, int]],
+        addresses: ProgressAddresses,
+        tracker: ProgressTracker,
+        interval_sec: float = DEFAULT_PROGRESS_INTERVAL_SEC,
+        status_path: Path | None = None,
+        on_status: Callable[[ProgressStatus], object] | None = None,
+        hung_confirm_polls: int = DEFAULT_HUNG_CONFIRM_POLLS,
+    ) -> None:
+        super().__init__(name="bench-progress-monitor", daemon=True)
+        self._read_words = read_words
+        self._addresses = addresses
+        self._tracker = tracker
+        self._interval_sec = interval_sec
+        self._status_path = status_path
+        self._on_status = on_status
+        self._hung_confirm_polls = max(1, hung_confirm_polls)
+        self._stop_event = threading.Event()
+        self.status: ProgressStatus | None = None
+        self.hung_reason: str | None = None
+        self.error: BaseException | None = None
+
+    def poll(self) -> ProgressStatus:
+        """Reads the target once and updates `status`."""
+
+        a = self._addresses
+        words = self._read_words(
+            [a.op, a.n, a.line, a.done, DHCSR_ADDR, ICSR_ADDR, DWT_CYCCNT_ADDR]
+        )
+        sample = ProgressSample(
+            at=time.monotonic(),
+            op=words[a.op],
+            n=words[a.n],
+            line=words[a.line],
+            done=words[a.done],
+            dhcsr=words[DHCSR_ADDR],
+            icsr=words[ICSR_ADDR],
+            cycles=words[DWT_CYCCNT_ADDR],
+        )
+        self.status = self._tracker.update(sample)
+        return self.status
+
+    def stop(self) -> None:
+        """Stops polling and waits for the thread."""
+
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+
+    def run(self) -> None:
+        hung_polls = 0
+        try:
+            while not self._stop_event.is_set():
+                status = self.poll()
+                if self._status_path is not None:
+                    payload = asdict(status)
+                    atomic_write_bytes(self._status_path, json.dumps(payload).encode("utf-8"))
+                if self._on_status is not None:
+                    self._on_status(status)
+                hung_polls = hung_polls + 1 if status.state == "hung" else 0
+                if hung_polls >= self._hung_confirm_polls:
+                    self.hung_reason = status.describe()
+                    return
+                if status.state == "done":
+                    return
+                self._stop_event.wait(self._interval_sec)
+        except Exception as exc:
+            self.error = exc
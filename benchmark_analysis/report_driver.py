@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import generate_full_matrix_report as full_report
+import generate_readable_report as readable_report
+from campaign_data import CampaignData
+from campaign_data import load_campaign
+from campaign_data import select_profiles
+from point_timing import DEFAULT_CLOCK_TOLERANCE
+
+
+DEFAULT_FULL_MD = "report_full_matrix.md"
+DEFAULT_FULL_DIR = "benchmark_analysis/output/full_matrix"
+DEFAULT_READABLE_MD = "report_readable.md"
+DEFAULT_READABLE_DIR = "benchmark_analysis/output/readable"
+DEFAULT_GROUP_TOLERANCE = 0.02
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses CLI args for the combined report driver."""
+
+    parser = argparse.ArgumentParser(
+        description="Load a campaign once and emit the full-matrix and readable reports."
+    )
+    parser.add_argument("--input-root", default="build/bench_matrix")
+    parser.add_argument("--profiles", default="C1,C2,C3,C4,C5,C6,C7,C8,C9,C10")
+    parser.add_argument("--full-md", default=DEFAULT_FULL_MD)
+    parser.add_argument("--full-dir", default=DEFAULT_FULL_DIR)
+    parser.add_argument("--readable-md", default=DEFAULT_READABLE_MD)
+    parser.add_argument("--readable-dir", default=DEFAULT_READABLE_DIR)
+    parser.add_argument("--strict", action="store_true")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Validate every run file even when the sample manifest vouches for it.",
+    )
+    parser.add_argument(
+        "--clock-tolerance",
+        type=float,
+        default=DEFAULT_CLOCK_TOLERANCE,
+        help="Flag runs whose implied core clock deviates from the nominal HCLK by more than this fraction.",
+    )
+    parser.add_argument("--group-tolerance", type=float, default=DEFAULT_GROUP_TOLERANCE)
+    return parser.parse_args()
+
+
+def _resolve(repo_dir: Path, value: str | Path) -> Path:
+    path = Path(value)
+    return path if path.is_absolute() else repo_dir / path
+
+
+def report_paths(
+    repo_dir: Path,
+    input_root: Path,
+    full_md: str | Path = DEFAULT_FULL_MD,
+    full_dir: str | Path = DEFAULT_FULL_DIR,
+    readable_md: str | Path = DEFAULT_READABLE_MD,
+    readable_dir: str | Path = DEFAULT_READABLE_DIR,
+) -> tuple[full_report.ReportPaths, readable_report.ReportPaths]:
+    """Builds both reports' paths; relative paths resolve against `repo_dir`."""
+
+    return (
+        full_report.ReportPaths(
+            repo_dir=repo_dir,
+            input_root=input_root,
+            output_md=_resolve(repo_dir, full_md),
+            output_dir=_resolve(repo_dir, full_dir),
+        ),
+        readable_report.ReportPaths(
+            repo_dir=repo_dir,
+            input_root=input_root,
+            output_md=_resolve(repo_dir, readable_md),
+            output_dir=_resolve(repo_dir, readable_dir),
+        ),
+    )
+
+
+def emit_reports(
+    data: CampaignData,
+    full_paths: full_report.ReportPaths,
+    readable_paths: readable_report.ReportPaths,
+    group_tolerance: float = DEFAULT_GROUP_TOLERANCE,
+) -> list[Path]:
+    """Emits every report from one loaded campaign.
+
+    Both emitters read `data.df` and `data.stats`; nothing is parsed,
+    validated or aggregated again.
+
+    Returns:
+        Paths of the written markdown reports.
+    """
+
+    return [
+        full_report.emit_full_matrix_report(data, full_paths),
+        readable_report.emit_readable_report(data, readable_paths, group_tolerance=group_tolerance),
+    ]
+
+
+def main() -> None:
+    """Entry point for combined report generation."""
+
+    args = parse_args()
+    repo_dir = Path(__file__).resolve().parents[1]
+    input_root = _resolve(repo_dir, args.input_root)
+    started = time.monotonic()
+    data = load_campaign(
+        input_root,
+        select_profiles(input_root, args.profiles),
+        strict=args.strict,
+        revalidate=args.revalidate,
+        clock_tolerance=args.clock_tolerance,
+    )
+    print(
+        f"Loaded {len(data.df)} records from {len(data.data_profile_names())} profiles "
+        f"in {time.monotonic() - started:.2f}s."
+    )
+    full_paths, readable_paths = report_paths(
+        repo_dir,
+        input_root,
+        full_md=args.full_md,
+        full_dir=args.full_dir,
+        readable_md=args.readable_md,
+        readable_dir=args.readable_dir,
+    )
+    emit_reports(data, full_paths, readable_paths, group_tolerance=args.group_tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Sequence
+
+from campaign_data import CampaignData
+from campaign_data import load_campaign
+from campaign_data import select_profiles
+
+
+DEFAULT_DB_PATH = "build/bench_results.sqlite"
+DB_SCHEMA_VERSION = 1
+# Sample columns stored per run, after the (campaign, profile, op, n, run_id) key.
+SAMPLE_VALUE_COLUMNS: tuple[str, ...] = (
+    "repeat",
+    "warmup",
+    "eigen_avg_cycles",
+    "cmsis_avg_cycles",
+    "cmsis_over_eigen",
+    "error_l2",
+    "valid",
+    "invalid",
+    "build_mode",
+)
+# Per-point summary columns, copied from `compute_stats` so history survives compaction.
+POINT_STAT_COLUMNS: tuple[str, ...] = (
+    "runs",
+    "eigen_mean",
+    "eigen_ci",
+    "cmsis_mean",
+    "cmsis_ci",
+    "eigen_over_cmsis_mean",
+    "eigen_over_cmsis_ci",
+    "error_max",
+    "leader",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign TEXT PRIMARY KEY,
+    captured_at TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    input_root TEXT NOT NULL,
+    compacted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS samples (
+    campaign TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    op TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    run_id TEXT NOT NULL,
+    repeat INTEGER NOT NULL,
+    warmup INTEGER NOT NULL,
+    eigen_avg_cycles REAL NOT NULL,
+    cmsis_avg_cycles REAL NOT NULL,
+    cmsis_over_eigen REAL NOT NULL,
+    error_l2 REAL NOT NULL,
+    valid INTEGER NOT NULL,
+    invalid INTEGER NOT NULL,
+    build_mode TEXT NOT NULL,
+    PRIMARY KEY (campaign, profile, op, n, run_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS point_stats (
+    campaign TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    op TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    runs INTEGER NOT NULL,
+    eigen_mean REAL,
+    eigen_ci REAL,
+    cmsis_mean REAL,
+    cmsis_ci REAL,
+    eigen_over_cmsis_mean REAL,
+    eigen_over_cmsis_ci REAL,
+    error_max REAL,
+    leader TEXT,
+    PRIMARY KEY (campaign, profile, op, n)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS profile_meta (
+    campaign TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    PRIMARY KEY (campaign, profile)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS memory (
+    campaign TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    section TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    PRIMARY KEY (campaign, profile, section)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_by_point ON samples (profile, op, n, campaign);
+CREATE INDEX IF NOT EXISTS point_stats_by_point ON point_stats (profile, op, n, campaign);
+CREATE INDEX IF NOT EXISTS campaigns_by_time ON campaigns (captured_at);
+"""
+CAMPAIGN_TABLES: tuple[str, ...] = ("samples", "point_stats", "profile_meta", "memory", "campaigns")
+
+
+def open_db(path: Path) -> sqlite3.Connection:
+    """Opens (creating if needed) a results database.
+
+    Raises:
+        RuntimeError: The file was written by another schema version.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, DB_SCHEMA_VERSION):
+        conn.close()
+        raise RuntimeError(
+            f"{path} has schema version {version}, expected {DB_SCHEMA_VERSION}."
+        )
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+    return conn
+
+
+def _sql_value(value: object) -> object:
+    # NaN (for example the CI of a single run) is stored as NULL.
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def campaign_captured_at(data: CampaignData) -> str:
+    """Returns the latest `captured_at` of the campaign's profiles (now if none)."""
+
+    stamps = [
+        str(meta["captured_at"]) for meta in data.profile_meta.values() if meta.get("captured_at")
+    ]
+    return max(stamps) if stamps else datetime.now(timezone.utc).isoformat()
+
+
+def ingest_campaign(db_path: Path, data: CampaignData, campaign: str | None = None) -> str:
+    """Loads one campaign into the results database, replacing an earlier ingest.
+
+    Args:
+        db_path: Results database.
+        data: Campaign loaded by `load_campaign`.
+        campaign: Campaign name (default: its `captured_at`).
+
+    Returns:
+        The campaign name.
+    """
+
+    captured_at = campaign_captured_at(data)
+    campaign = campaign or captured_at
+    df = data.df
+    sample_rows = zip(
+        [campaign] * len(df),
+        *(df[name].tolist() for name in ("profile", "op", "n", "run_id", *SAMPLE_VALUE_COLUMNS)),
+    )
+    stats = data.stats
+    stat_rows = zip(
+        [campaign] * len(stats),
+        *(stats[name].tolist() for name in ("profile", "op", "n", *POINT_STAT_COLUMNS)),
+    )
+    meta_rows = []
+    memory_rows = []
+    for profile, meta in data.profile_meta.items():
+        if not meta:
+            continue
+        meta_rows.append((campaign, profile, json.dumps(meta, sort_keys=True)))
+        for section, size in dict(meta.get("memory") or {}).items():
+            memory_rows.append((campaign, profile, str(section), int(size)))
+
+    key_columns = "campaign, profile, op, n"
+    with closing(open_db(db_path)) as conn, conn:
+        for table in CAMPAIGN_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE campaign = ?", (campaign,))
+        conn.execute(
+            "INSERT INTO campaigns (campaign, captured_at, ingested_at, input_root) "
+            "VALUES (?, ?, ?, ?)",
+            (campaign, captured_at, datetime.now(timezone.utc).isoformat(), str(data.input_root)),
+        )
+        columns = (key_columns, "run_id", *SAMPLE_VALUE_COLUMNS)
+        conn.executemany(
+            f"INSERT INTO samples ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * (5 + len(SAMPLE_VALUE_COLUMNS)))})",
+            sample_rows,
+        )
+        conn.executemany(
+            f"INSERT INTO point_stats ({key_columns}, {', '.join(POINT_STAT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * (4 + len(POINT_STAT_COLUMNS)))})",
+            (tuple(map(_sql_value, row)) for row in stat_rows),
+        )
+        conn.executemany("INSERT INTO profile_meta VALUES (?, ?, ?)", meta_rows)
+        conn.executemany("INSERT INTO memory VALUES (?, ?, ?, ?)", memory_rows)
+    return campaign
+
+
+def point_history(
+    db_path: Path,
+    profile: str,
+    op: str,
+    n: int,
+    limit: int = 30,
+) -> list[dict[str, object]]:
+    """Returns one point's summary over the latest `limit` campaigns, oldest first.
+
+    Reads `point_stats`, so compacted campaigns are included.
+    """
+
+    with closing(open_db(db_path)) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            f"SELECT c.campaign, c.captured_at, {', '.join('s.' + c for c in POINT_STAT_COLUMNS)} "
+            "FROM point_stats AS s JOIN campaigns AS c USING (campaign) "
+            "WHERE s.profile = ? AND s.op = ? AND s.n = ? "
+            "ORDER BY c.captured_at DESC LIMIT ?",
+            (profile, op, n, limit),
+        ).fetchall()
+    return [dict(row) for row in reversed(rows)]
+
+
+def compact_db(
+    db_path: Path,
+    keep_samples: int | None = None,
+    keep_campaigns: int | None = None,
+) -> tuple[int, int]:
+    """Applies retention to a results database.
+
+    Args:
+        db_path: Results database.
+        keep_samples: Newest campaigns that keep their per-run samples; older
+            ones keep only `point_stats`, `profile_meta` and `memory`.
+        keep_campaigns: Newest campaigns kept at all; older ones are deleted.
+
+    Returns:
+        Number of campaigns deleted and number newly compacted.
+    """
+
+    for name, value in (("keep_samples", keep_samples), ("keep_campaigns", keep_campaigns)):
+        if value is not None and value < 0:
+            raise ValueError(f"{name} must be >= 0.")
+    with closing(open_db(db_path)) as conn:
+        with conn:
+            ordered = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT campaign FROM campaigns ORDER BY captured_at DESC, campaign DESC"
+                )
+            ]
+            dropped = ordered[keep_campaigns:] if keep_campaigns is not None else []
+            for table in CAMPAIGN_TABLES:
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE campaign = ?", [(name,) for name in dropped]
+                )
+            compacted = 0
+            if keep_samples is not None:
+                for name in ordered[keep_samples:]:
+                    if name in dropped:
+                        continue
+                    conn.execute("DELETE FROM samples WHERE campaign = ?", (name,))
+                    compacted += conn.execute(
+                        "UPDATE campaigns SET compacted = 1 WHERE campaign = ? AND compacted = 0",
+                        (name,),
+                    ).rowcount
+        if dropped or compacted:
+            conn.execute("VACUUM")
+    return len(dropped), compacted
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parses CLI arguments."""
+
+    parser = argparse.ArgumentParser(description="Keep benchmark campaigns in a SQLite database.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = sub.add_parser("ingest", help="Load one campaign into the database.")
+    ingest_parser.add_argument("--input-root", default="build/bench_matrix")
+    ingest_parser.add_argument("--profiles", default="C1,C2,C3,C4,C5,C6,C7,C8,C9,C10")
+    ingest_parser.add_argument("--campaign", default="", help="Name (default: captured_at).")
+    history_parser = sub.add_parser("history", help="Print one point across campaigns.")
+    history_parser.add_argument("--profile", required=True)
+    history_parser.add_argument("--op", choices=("mul", "inv"), required=True)
+    history_parser.add_argument("--n", type=int, required=True)
+    history_parser.add_argument("--limit", type=int, default=30)
+    compact_parser = sub.add_parser("compact", help="Apply retention.")
+    for retention_parser in (ingest_parser, compact_parser):
+        retention_parser.add_argument(
+            "--keep-samples",
+            type=int,
+            default=None,
+            help="Newest campaigns that keep per-run samples (older keep summaries only).",
+        )
+        retention_parser.add_argument(
+            "--keep-campaigns",
+            type=int,
+            default=None,
+            help="Newest campaigns kept; older ones are deleted.",
+        )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Entry point."""
+
+    args = parse_args(argv)
+    repo_dir = Path(__file__).resolve().parents[1]
+    db_path = Path(args.db)
+    if not db_path.is_absolute():
+        db_path = repo_dir / db_path
+    if args.command == "history":
+        for row in point_history(db_path, args.profile, args.op, args.n, args.limit):
+            print(
+                f"{row['captured_at']}\t{row['campaign']}\truns={row['runs']}\t"
+                f"eigen/cmsis={row['eigen_over_cmsis_mean']:.4f}\t{row['leader']}"
+            )
+        return
+    if args.command == "ingest":
+        input_root = Path(args.input_root)
+        if not input_root.is_absolute():
+            input_root = repo_dir / input_root
+        data = load_campaign(input_root, select_profiles(input_root, args.profiles))
+        campaign = ingest_campaign(db_path, data, args.campaign or None)
+        print(f"Ingested campaign {campaign} ({len(data.df)} samples) into {db_path}")
+    dropped, compacted = compact_db(db_path, args.keep_samples, args.keep_campaigns)
+    if dropped or compacted:
+        print(f"Retention: deleted {dropped} campaigns, compacted {compacted}.")
+
+
+if __name__ == "__main__":
+    main()
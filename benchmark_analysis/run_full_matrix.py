@@ -3,17 +3,25 @@ from __future__ import annotations
 import argparse
 import glob
 import json
+import math
 import os
 import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 from dataclasses import dataclass
+from dataclasses import replace
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
+from typing import Callable
+from typing import Collection
+from typing import Mapping
 from typing import Sequence
 
 try:
@@ -23,14 +31,82 @@ except ImportError as exc:  # pragma: no cover - runtime dependency
     serial = None  # type: ignore[assignment]
     _SERIAL_IMPORT_ERROR = exc
 
+from build_cache import ELF_NAME
+from build_cache import BuildCache
+from build_cache import hash_source_tree
+from build_cache import toolchain_identity
+from campaign_data import load_campaign
+from campaign_store import STORE_DIR_NAME
+from campaign_store import append_run
+from campaign_store import compact_profile
+from campaign_store import drop_profile
+from campaign_store import stored_runs
+from elf_image import elf_image_digest
+from full_matrix_common import BoardTarget
 from full_matrix_common import BuildProfile
 from full_matrix_common import RunConfig
 from full_matrix_common import SampleRecord
+from full_matrix_common import commit_run_file
 from full_matrix_common import default_profiles
+from full_matrix_common import load_sample_manifest
+from full_matrix_common import manifest_entry_matches
+from full_matrix_common import parse_board_targets
 from full_matrix_common import parse_profile_names
 from full_matrix_common import parse_run_lines
 from full_matrix_common import profiles_to_dict
 from full_matrix_common import validate_records
+from jlink_session import FLASH_FAILURE_MARKERS
+from jlink_session import JLinkError
+from jlink_session import JLinkSession
+from jlink_session import JLinkSessionPool
+from jlink_session import jlink_command_line
+from pipeline import STATE_FILE_NAME
+from pipeline import SUMMARY_FILE_NAME
+from pipeline import Pipeline
+from pipeline import Stage
+from pipeline import StageState
+from pipeline import format_stage_summary
+from pipeline import summarize_stages
+from pipeline import write_stage_summary
+from point_timing import Point
+from point_timing import TIMESTAMP_SIDECAR_NAME
+from point_timing import PointTimingHistory
+from profile_scheduler import DEFAULT_ANCHORS
+from profile_scheduler import SCHEDULE_FILE_NAME
+from profile_scheduler import describe_schedule
+from profile_scheduler import save_schedule
+from profile_scheduler import schedule_profiles
+from profile_scheduler import split_anchors
+from profile_space import DESIGNS
+from profile_space import PLAN_FILE_NAME
+from profile_space import load_profile_space
+from profile_space import plan_campaign
+from profile_space import save_plan
+from progress_monitor import DEFAULT_PROGRESS_INTERVAL_SEC
+from progress_monitor import PROGRESS_FILE_NAME
+from progress_monitor import ProgressMonitor
+from progress_monitor import ProgressStatus
+from progress_monitor import ProgressTracker
+from progress_monitor import progress_addresses
+from report_driver import emit_reports
+from report_driver import report_paths
+from sequential_stop import DEFAULT_MIN_RUNS
+from sequential_stop import CiStoppingRule
+from sequential_stop import seed_from_run_files
+from serial_capture import DEFAULT_LOG_FLUSH_SEC
+from serial_capture import stream_serial_runs
+from usb_ports import USB_PORT_PREFIX
+from usb_ports import DevWatcher
+from usb_ports import PortResolver
+
+
+# Capture failures worth retrying without a rebuild: silent/hung board
+# (`TimeoutError`), serial/USB errors (`serial.SerialException`), both `OSError`s,
+# and a J-Link commander failing or stalling while flashing.
+CAPTURE_RETRY_ERRORS: tuple[type[BaseException], ...] = (OSError, JLinkError)
+CAPTURE_RETRY_DELAY_SEC = 2.0
+HOST_STAGES = ("configure", "build", "size")
+PROFILE_STAGES = (*HOST_STAGES, "capture")
 
 
 @dataclass(frozen=True)
@@ -65,11 +141,80 @@ def parse_args() -> argparse.Namespace:
     """Parses command-line arguments."""
 
     parser = argparse.ArgumentParser(
-        description="Build/flash/capture C1~C10 matrix and generate report_full_matrix.md"
+        description="Build/flash/capture C1~C10 matrix and generate the full-matrix and readable reports"
     )
     parser.add_argument("--profiles", default="C1,C2,C3,C4,C5,C6,C7,C8,C9,C10")
+    parser.add_argument(
+        "--profile-space",
+        default="",
+        help=(
+            "Profile space JSON (see benchmark_analysis/profile_space.json); replaces "
+            "--profiles with the profiles planned by --design."
+        ),
+    )
+    parser.add_argument(
+        "--design",
+        choices=DESIGNS,
+        default="fractional",
+        help="Design used with --profile-space: full factorial, 2^(k-p) fraction or screening.",
+    )
+    parser.add_argument(
+        "--fraction",
+        type=int,
+        default=1,
+        help="p of the 2^(k-p) fractional design (each step halves the two-level runs).",
+    )
     parser.add_argument("--runs", type=int, default=10)
-    parser.add_argument("--port", default="/dev/ttyACM0")
+    parser.add_argument(
+        "--pilot-runs",
+        type=int,
+        default=0,
+        help=(
+            "Information-driven scheduling: capture the --anchors in full, every other "
+            "profile for this many runs, then finish the profiles whose pilot curves "
+            "differ most from what is already captured first (0 disables)."
+        ),
+    )
+    parser.add_argument(
+        "--anchors",
+        default=DEFAULT_ANCHORS,
+        help="Profiles captured in full before the pilots (with --pilot-runs).",
+    )
+    parser.add_argument(
+        "--ci-target",
+        type=float,
+        default=0.0,
+        help=(
+            "Stop a profile's capture once every (op, n) eigen_over_cmsis 95%% CI "
+            "half-width is below this fraction of its mean, e.g. 0.01 (0 disables)."
+        ),
+    )
+    parser.add_argument(
+        "--min-runs",
+        type=int,
+        default=DEFAULT_MIN_RUNS,
+        help="Runs always captured before --ci-target may stop a profile.",
+    )
+    parser.add_argument(
+        "--max-runs",
+        type=int,
+        default=0,
+        help="Run cap (firmware autorun count) with --ci-target; defaults to --runs.",
+    )
+    parser.add_argument(
+        "--port",
+        default="/dev/ttyACM0",
+        help="Serial device path, or usb:<SERIAL> to select the board by USB serial number.",
+    )
+    parser.add_argument(
+        "--boards",
+        default="",
+        help=(
+            "Comma-separated PORT=JLINK_SERIAL list for multi-board capture, "
+            "for example /dev/ttyACM0=000683000001,/dev/ttyACM1=000683000002. "
+            "PORT may be usb:<SERIAL>. Overrides --port."
+        ),
+    )
     parser.add_argument("--jlink", default="/usr/bin/JLinkExe")
     parser.add_argument(
         "--cube-cmake",
@@ -95,12 +240,94 @@ def parse_args() -> argparse.Namespace:
         ),
     )
     parser.add_argument("--resume", action="store_true")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help=(
+            "On --resume, revalidate stored runs and run files instead of trusting the "
+            "campaign store and the sample manifest."
+        ),
+    )
+    parser.add_argument(
+        "--export-run-files",
+        action="store_true",
+        help=(
+            "Also write every captured run as samples_release/run_NNN.csv; the campaign "
+            "store is always written (campaign_store.py --export exports later)."
+        ),
+    )
     parser.add_argument("--timeout-sec", type=int, default=420)
+    parser.add_argument(
+        "--point-timeout-factor",
+        type=float,
+        default=3.0,
+        help="Per-point idle deadline = p99 of past gaps for that (op, n) x factor; 0 disables.",
+    )
     parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument(
+        "--log-flush-sec",
+        type=float,
+        default=DEFAULT_LOG_FLUSH_SEC,
+        help="Maximum seconds captured serial lines may stay unflushed in serial_capture.log.",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=DEFAULT_PROGRESS_INTERVAL_SEC,
+        help=(
+            "Seconds between progress polls of the firmware globals through the "
+            "JLink session during capture (0 disables)."
+        ),
+    )
+    parser.add_argument(
+        "--capture-retries",
+        type=int,
+        default=1,
+        help=(
+            "Retries of a profile's capture stage after a timeout, serial/USB or J-Link "
+            "error; a retry reflashes and continues from the runs already committed."
+        ),
+    )
+    parser.add_argument(
+        "--rerun-stages",
+        default="",
+        help=(
+            "With --resume, comma-separated stages (configure,build,size,capture) to "
+            "run again even if their recorded state is still current."
+        ),
+    )
     parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=0,
+        help=(
+            "Build up to N profiles ahead while earlier profiles are being captured "
+            "(0 = strict build->flash->capture sequence). --jobs is split across "
+            "concurrent builds."
+        ),
+    )
     parser.add_argument("--device", default="STM32F407ZG")
     parser.add_argument("--swd-speed", default="4000")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--no-build-cache",
+        action="store_true",
+        help="Always rebuild instead of reusing ELFs from build/bench_matrix/_cache.",
+    )
+    parser.add_argument(
+        "--no-dedup",
+        action="store_true",
+        help="Capture every profile even when its firmware image matches an earlier profile.",
+    )
+    parser.add_argument(
+        "--no-jlink-session",
+        action="store_true",
+        help=(
+            "Run a one-shot JLinkExe commander script per profile instead of one "
+            "persistent session per probe (which also skips matching downloads)."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -211,17 +438,16 @@ def collect_memory_metrics(
     return parse_size_sections(result.stdout)
 
 
-def configure_and_build(
+def configure_build_dir(
     repo_dir: Path,
     build_dir: Path,
     profile: BuildProfile,
     cfg: RunConfig,
     paths: ToolchainPaths,
     env: dict[str, str],
-    jobs: int,
     log_path: Path,
-) -> Path:
-    """Configures and builds one profile, returning produced ELF path."""
+) -> None:
+    """Configures the CMake build directory of one profile."""
 
     build_dir.mkdir(parents=True, exist_ok=True)
     configure_cmd = [
@@ -246,10 +472,21 @@ def configure_and_build(
     ]
     run_command(configure_cmd, cwd=repo_dir, env=env, log_path=log_path)
 
+
+def build_configured_dir(
+    repo_dir: Path,
+    build_dir: Path,
+    paths: ToolchainPaths,
+    env: dict[str, str],
+    jobs: int,
+    log_path: Path,
+) -> Path:
+    """Builds a configured build directory, returning produced ELF path."""
+
     build_cmd = [str(paths.cube_cmake), "--build", str(build_dir), "-j", str(jobs)]
     run_command(build_cmd, cwd=repo_dir, env=env, log_path=log_path)
 
-    elf_path = build_dir / "cmsis-dsp-vs-eigen.elf"
+    elf_path = build_dir / ELF_NAME
     if not elf_path.is_file():
         raise FileNotFoundError(f"ELF not found after build: {elf_path}")
     return elf_path
@@ -263,8 +500,22 @@ def flash_with_jlink(
     swd_speed: str,
     env: dict[str, str],
     log_path: Path,
-) -> None:
-    """Flashes ELF to target via JLink commander script."""
+    jlink_serial: str | None = None,
+    sessions: JLinkSessionPool | None = None,
+) -> bool:
+    """Flashes ELF to target via JLink.
+
+    `jlink_serial` selects a specific probe when several boards are attached.
+    With `sessions` the probe's persistent commander session is reused and the
+    download is skipped when the target flash already matches the ELF;
+    otherwise a one-shot commander script is run.
+
+    Returns:
+        Whether the image was downloaded.
+    """
+
+    if sessions is not None:
+        return sessions.flash(elf_path, log_path, jlink_serial=jlink_serial)
 
     cmd_file = profile_dir / "logs" / "flash.jlink"
     cmd_file.parent.mkdir(parents=True, exist_ok=True)
@@ -273,52 +524,101 @@ def flash_with_jlink(
         encoding="utf-8",
     )
 
-    cmd = [
-        str(paths.jlink),
-        "-device",
-        device,
-        "-if",
-        "SWD",
-        "-speed",
-        swd_speed,
-        "-autoconnect",
-        "1",
-        "-CommanderScript",
-        str(cmd_file),
-    ]
+    cmd = jlink_command_line(paths.jlink, device, swd_speed, jlink_serial)
+    cmd.extend(["-CommanderScript", str(cmd_file)])
+    # Only this invocation's output is checked, not earlier flashes in the log.
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    start_offset = log_path.stat().st_size if log_path.is_file() else 0
     run_command(cmd, cwd=profile_dir, env=env, log_path=log_path)
 
-    text = log_path.read_text(encoding="utf-8", errors="ignore")
-    critical_markers = (
-        "Cannot connect",
-        "Could not connect",
-        "Error while programming",
-        "Downloading file failed",
-        "Failed to execute script command",
-    )
-    for marker in critical_markers:
+    with log_path.open("rb") as fp:
+        fp.seek(start_offset)
+        text = fp.read().decode("utf-8", errors="ignore")
+    for marker in FLASH_FAILURE_MARKERS:
         if marker in text:
-            raise RuntimeError(f"JLink flash failed ({marker}). See {log_path}.")
+            raise JLinkError(f"JLink flash failed ({marker}). See {log_path}.")
+    return True
 
 
 def write_run_file(run_lines: Sequence[str], run_index: int, samples_dir: Path) -> Path:
-    """Writes one run file with normalized LF line endings."""
+    """Commits one run file with normalized LF line endings and updates the manifest."""
 
-    samples_dir.mkdir(parents=True, exist_ok=True)
-    file_path = samples_dir / f"run_{run_index:03d}.csv"
     normalized = "\n".join(line.rstrip("\r\n") for line in run_lines) + "\n"
-    file_path.write_text(normalized, encoding="utf-8")
-    return file_path
+    return commit_run_file(samples_dir, f"run_{run_index:03d}.csv", normalized.encode("utf-8"))
 
 
-def candidate_serial_ports(preferred_port: str) -> list[str]:
-    """Returns ordered candidate serial device paths for CDC reconnect scenarios."""
+def commit_captured_run(
+    run_lines: Sequence[str],
+    run_index: int,
+    samples_dir: Path,
+    store_root: Path | None = None,
+    export_run_file: bool = False,
+) -> Path:
+    """Commits one captured run to the campaign store.
+
+    The run becomes its own store shard under `store_root`, named after the
+    profile directory holding `samples_dir`. The raw run file is only written
+    with `export_run_file`, or when there is no store to commit to.
+
+    Returns:
+        The store shard, or the run file without a store.
+    """
+
+    if store_root is None:
+        return write_run_file(run_lines, run_index, samples_dir)
+    if export_run_file:
+        write_run_file(run_lines, run_index, samples_dir)
+    return append_run(
+        store_root,
+        samples_dir.parent.name,
+        f"run_{run_index:03d}",
+        parse_run_lines(run_lines),
+    )
+
+
+def run_file_ok(
+    run_file: Path,
+    manifest: dict[str, dict[str, object]],
+    revalidate: bool = False,
+) -> bool:
+    """Checks one committed run file.
+
+    Files covered by the sample manifest are accepted on a size and mtime
+    match (SHA-256 if the mtime moved) without reparsing. Files without an
+    entry (captured before the manifest existed), or every file when
+    `revalidate` is set, are parsed and validated.
+    """
+
+    if not revalidate:
+        entry = manifest.get(run_file.name)
+        if entry is not None:
+            return manifest_entry_matches(entry, run_file)
+    if not run_file.is_file():
+        return False
+    try:
+        records = parse_run_lines(run_file.read_text(encoding="utf-8").splitlines())
+        validate_records(records, expected_repeat=records[0].repeat)
+    except ValueError:
+        return False
+    return True
+
+
+def candidate_serial_ports(preferred_port: str, scan_fallback: bool = True) -> list[str]:
+    """Returns ordered candidate serial device paths for CDC reconnect scenarios.
+
+    With `scan_fallback=False` only the preferred port is returned, so that in
+    multi-board mode one board never opens another board's port.
+    """
 
     candidates: list[str] = [preferred_port]
-    if preferred_port.startswith("/dev/ttyACM"):
-        candidates.extend(sorted(glob.glob("/dev/ttyACM*")))
-    elif preferred_port.startswith("/dev/ttyUSB"):
-        candidates.extend(sorted(glob.glob("/dev/ttyUSB*")))
+    if not scan_fallback:
+        return candidates
+    # Scan siblings of the same family in the same directory (normally /dev).
+    preferred = Path(preferred_port)
+    for family in ("ttyACM", "ttyUSB"):
+        if preferred.name.startswith(family):
+            candidates.extend(sorted(glob.glob(str(preferred.parent / f"{family}*"))))
+            break
 
     seen: set[str] = set()
     ordered: list[str] = []
@@ -335,34 +635,55 @@ def open_serial_with_retry(
     baudrate: int,
     wait_timeout_sec: int,
     log_fp,
+    scan_fallback: bool = True,
+    resolver: PortResolver | None = None,
 ):
-    """Opens serial port with retry and ACM/USB fallback scanning."""
-
+    """Opens serial port with retry, following the board across re-enumeration.
+
+    When the board's USB identity is known (a `usb:<SERIAL>` spec, or learned
+    by `resolver` from sysfs while the board was still on `preferred_port`),
+    only device nodes reporting that identity are tried, so a board is found
+    under its new name without ever opening another board's port. Otherwise
+    falls back to `candidate_serial_ports`. Between attempts the device
+    directory is watched, so a reappearing node is opened immediately.
+    """
+
+    resolver = resolver or PortResolver()
+    identity = resolver.identity_for(preferred_port)
+    if identity is None and preferred_port.startswith(USB_PORT_PREFIX):
+        raise ValueError(f"Invalid USB port spec: {preferred_port}")
+    watch_dir = resolver.dev_dir if identity is not None else Path(preferred_port).parent
     deadline = time.monotonic() + wait_timeout_sec
     last_error: Exception | None = None
     attempt = 0
 
-    while time.monotonic() <= deadline:
-        attempt += 1
-        ports = candidate_serial_ports(preferred_port)
-        for port in ports:
-            try:
-                ser = serial.Serial(port=port, baudrate=baudrate, timeout=1)  # type: ignore[arg-type]
+    with DevWatcher(watch_dir) as watcher:
+        while time.monotonic() <= deadline:
+            attempt += 1
+            if identity is not None:
+                ports = resolver.resolve(preferred_port, identity)
+            else:
+                ports = candidate_serial_ports(preferred_port, scan_fallback=scan_fallback)
+            for port in ports:
+                try:
+                    ser = serial.Serial(port=port, baudrate=baudrate, timeout=1)  # type: ignore[arg-type]
+                    resolver.remember(preferred_port, port)
+                    usb_serial = identity.serial if identity is not None else None
+                    log_fp.write(
+                        f"# serial open success: port={port}, usb_serial={usb_serial}, "
+                        f"attempt={attempt}, time={iso_utc_now()}\n"
+                    )
+                    return ser, port
+                except Exception as exc:  # pragma: no cover - hardware dependent
+                    last_error = exc
+                    continue
+
+            if attempt == 1 or attempt % 5 == 0:
                 log_fp.write(
-                    f"# serial open success: port={port}, attempt={attempt}, "
+                    f"# serial open retry: attempt={attempt}, candidates={ports}, "
                     f"time={iso_utc_now()}\n"
                 )
-                return ser, port
-            except Exception as exc:  # pragma: no cover - hardware dependent
-                last_error = exc
-                continue
-
-        if attempt == 1 or attempt % 5 == 0:
-            log_fp.write(
-                f"# serial open retry: attempt={attempt}, candidates={ports}, "
-                f"time={iso_utc_now()}\n"
-            )
-        time.sleep(0.5)
+            watcher.wait(min(0.5, max(0.0, deadline - time.monotonic())))
 
     raise RuntimeError(
         f"Failed to open serial port within {wait_timeout_sec}s. "
@@ -377,8 +698,35 @@ def capture_serial_runs(
     timeout_sec: int,
     samples_dir: Path,
     log_path: Path,
-) -> None:
-    """Captures benchmark CSV blocks from serial until expected runs are collected."""
+    scan_fallback: bool = True,
+    start_index: int = 1,
+    log_flush_sec: float = DEFAULT_LOG_FLUSH_SEC,
+    point_deadlines: dict[Point, float] | None = None,
+    resolver: PortResolver | None = None,
+    abort_reason: Callable[[], str | None] | None = None,
+    stop_rule: CiStoppingRule | None = None,
+    store_root: Path | None = None,
+    export_run_files: bool = False,
+) -> dict[Point, list[float]]:
+    """Captures benchmark CSV blocks from serial until expected runs are collected.
+
+    Runs `<start_index>` .. `<expected_runs>` are committed through
+    `commit_captured_run` (store shards under `store_root`, and/or
+    `run_NNN.csv` in `samples_dir`). When
+    resuming (`start_index > 1`) the firmware still emits its full autorun
+    count; the port is closed once the missing runs are captured and the extra
+    runs are ignored. With `stop_rule`, every committed run is fed to it and
+    the port is closed as soon as the rule is satisfied. Reading and run validation/writes are split across two
+    threads, see `serial_capture.stream_serial_runs`. Every line is also
+    stamped with the host monotonic time in `serial_capture.times.tsv` next to
+    `log_path`.
+
+    Returns:
+        Observed gaps before each `(op, n)` record, for the timing history.
+    """
+
+    if start_index > expected_runs:
+        return {}
 
     if serial is None:
         raise RuntimeError(
@@ -388,17 +736,18 @@ def capture_serial_runs(
     samples_dir.mkdir(parents=True, exist_ok=True)
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    run_index = 1
-    current_lines: list[str] = []
-    last_rx_at = time.monotonic()
-
     serial_wait_timeout = max(20, min(120, timeout_sec // 3))
-    with log_path.open("a", encoding="utf-8") as fp:
+    times_path = log_path.with_name(TIMESTAMP_SIDECAR_NAME)
+    with log_path.open("a", encoding="utf-8") as fp, times_path.open(
+        "a", encoding="utf-8"
+    ) as times_fp:
         ser, actual_port = open_serial_with_retry(
             preferred_port=port,
             baudrate=baudrate,
             wait_timeout_sec=serial_wait_timeout,
             log_fp=fp,
+            scan_fallback=scan_fallback,
+            resolver=resolver,
         )
         with ser:
             # Clear any stale bytes before asserting DTR to avoid dropping run head lines.
@@ -415,40 +764,121 @@ def capture_serial_runs(
             time.sleep(0.2)
             fp.write(f"# serial capture started at {iso_utc_now()}\n")
             fp.write(f"# serial capture port={actual_port}\n")
+            if start_index > 1:
+                fp.write(f"# serial capture resumed at run {start_index}/{expected_runs}\n")
             fp.flush()
-            while run_index <= expected_runs:
-                if (time.monotonic() - last_rx_at) > timeout_sec:
-                    raise TimeoutError(
-                        f"Serial capture idle-timeout ({timeout_sec}s), got "
-                        f"{run_index - 1}/{expected_runs} runs."
-                    )
+            times_fp.write(f"# session start={iso_utc_now()} port={actual_port}\n")
+            return stream_serial_runs(
+                ser,
+                log_fp=fp,
+                commit_run=lambda lines, idx: commit_captured_run(
+                    lines, idx, samples_dir, store_root, export_run_files
+                ),
+                start_index=start_index,
+                expected_runs=expected_runs,
+                timeout_sec=timeout_sec,
+                log_flush_sec=log_flush_sec,
+                point_deadlines=point_deadlines,
+                times_fp=times_fp,
+                abort_reason=abort_reason,
+                stop_after=(
+                    (lambda lines, idx: stop_rule.add_run(parse_run_lines(lines)))
+                    if stop_rule is not None
+                    else None
+                ),
+            )
 
-                raw = ser.readline()
-                if not raw:
-                    continue
-                last_rx_at = time.monotonic()
-                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
-                fp.write(line + "\n")
-                fp.flush()
-                current_lines.append(line)
 
-                if line.strip().lower() != "done":
-                    continue
+def first_missing_run(
+    samples_dir: Path,
+    expected_runs: int,
+    revalidate: bool = False,
+    store_root: Path | None = None,
+) -> int:
+    """Returns the first run index that is neither stored nor a valid run file.
 
-                records = parse_run_lines(current_lines)
-                expected_repeat = records[0].repeat
-                validate_records(records, expected_repeat=expected_repeat)
-                write_run_file(current_lines, run_index, samples_dir)
-                current_lines = []
-                run_index += 1
+    Runs in the campaign store under `store_root` were validated when
+    committed; `revalidate` validates their records again.
 
+    Returns:
+        The run index, `expected_runs + 1` if every run is present.
+    """
 
-def profile_complete(profile_dir: Path, expected_runs: int) -> bool:
-    """Checks whether a profile already has complete run files and marker metadata."""
+    stored = stored_runs(store_root, samples_dir.parent.name) if store_root is not None else {}
+    manifest = load_sample_manifest(samples_dir)
+    for idx in range(1, expected_runs + 1):
+        records = stored.get(f"run_{idx:03d}")
+        if records is not None and (not revalidate or _records_ok(records)):
+            continue
+        if not run_file_ok(samples_dir / f"run_{idx:03d}.csv", manifest, revalidate):
+            return idx
+    return expected_runs + 1
+
+
+def _records_ok(records: Sequence[SampleRecord]) -> bool:
+    try:
+        validate_records(records, expected_repeat=records[0].repeat)
+    except (ValueError, IndexError):
+        return False
+    return True
+
+
+def resume_start_index(
+    profile_dir: Path,
+    expected_runs: int,
+    image_digest: str | None,
+    revalidate: bool = False,
+) -> int:
+    """Decides where a resumed capture continues.
+
+    Already captured runs are only kept when the previous attempt recorded the
+    same firmware image digest in `profile_meta.json`; otherwise the stale run
+    files are removed and the capture restarts at run 1.
+    """
 
-    marker = profile_dir / "profile_meta.json"
     samples_dir = profile_dir / "samples_release"
-    if not marker.is_file() or not samples_dir.is_dir():
+    marker = profile_dir / "profile_meta.json"
+    previous_digest = None
+    if marker.is_file():
+        try:
+            previous_digest = json.loads(marker.read_text(encoding="utf-8")).get("image_digest")
+        except ValueError:
+            previous_digest = None
+
+    if image_digest is None or previous_digest != image_digest:
+        if samples_dir.is_dir():
+            shutil.rmtree(samples_dir)
+        drop_profile(profile_dir.parent / STORE_DIR_NAME, profile_dir.name)
+        return 1
+    return first_missing_run(
+        samples_dir, expected_runs, revalidate, store_root=profile_dir.parent / STORE_DIR_NAME
+    )
+
+
+def write_profile_meta(profile_dir: Path, meta: dict[str, object]) -> None:
+    """Writes `profile_meta.json` atomically."""
+
+    marker = profile_dir / "profile_meta.json"
+    tmp = marker.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, marker)
+
+
+def profile_complete(
+    profile_dir: Path,
+    expected_runs: int,
+    follow_alias: bool = True,
+    revalidate: bool = False,
+) -> bool:
+    """Checks whether a profile already has complete run files and marker metadata.
+
+    An alias profile (`alias_of` in its metadata) is complete when the profile it
+    aliases is complete. Run files are checked against the sample manifest
+    unless `revalidate` is set.
+    """
+
+    marker = profile_dir / "profile_meta.json"
+    if not marker.is_file():
         return False
 
     try:
@@ -460,49 +890,131 @@ def profile_complete(profile_dir: Path, expected_runs: int) -> bool:
         return False
     if int(meta.get("runs", 0)) != expected_runs:
         return False
-
-    for idx in range(1, expected_runs + 1):
-        f = samples_dir / f"run_{idx:03d}.csv"
-        if not f.is_file():
+    # A capture ended by the sequential stopping rule is complete at fewer runs.
+    last_run = expected_runs
+    stop = meta.get("sequential_stop")
+    if isinstance(stop, dict) and stop.get("runs_captured"):
+        last_run = int(stop["runs_captured"])
+
+    alias_of = meta.get("alias_of")
+    if alias_of:
+        if not follow_alias:
             return False
-        records = parse_run_lines(f.read_text(encoding="utf-8").splitlines())
-        validate_records(records, expected_repeat=records[0].repeat)
-    return True
+        return profile_complete(
+            profile_dir.parent / str(alias_of),
+            expected_runs,
+            follow_alias=False,
+            revalidate=revalidate,
+        )
+
+    store_root = profile_dir.parent / STORE_DIR_NAME
+    missing = first_missing_run(
+        profile_dir / "samples_release", last_run, revalidate, store_root=store_root
+    )
+    return missing > last_run
+
 
+@dataclass(frozen=True)
+class ProfileBuild:
+    """Build stage output for one profile.
+
+    Args:
+        profile: Built profile.
+        elf_path: Produced ELF, `None` when nothing was built.
+        memory: Section sizes collected from the ELF.
+        meta: Final profile metadata when no capture is needed (resume skip or dry-run).
+        cache_key: Build cache key, `None` when the cache is disabled.
+        cache_hit: Whether the ELF was reused from the build cache.
+    """
+
+    profile: BuildProfile
+    elf_path: Path | None
+    memory: dict[str, int]
+    meta: dict[str, object] | None = None
+    cache_key: str | None = None
+    cache_hit: bool = False
+    image_digest: str | None = None
+
+
+class CaptureDeduplicator:
+    """Maps firmware image digests to the profile that captures them.
+
+    The first profile claiming a digest captures it; later profiles with the
+    same digest become aliases and skip flashing/capture. Thread-safe, so it can
+    be shared by multi-board and pipelined schedulers.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._owners: dict[str, str] = {}
+
+    def claim(self, digest: str, profile_name: str) -> str | None:
+        """Claims `digest` for `profile_name`.
+
+        Returns:
+            `None` if the caller owns the digest, otherwise the owning profile.
+        """
+
+        with self._lock:
+            owner = self._owners.setdefault(digest, profile_name)
+        return None if owner == profile_name else owner
+
+
+def create_build_cache(repo_dir: Path, cache_dir: Path, paths: ToolchainPaths) -> BuildCache:
+    """Fingerprints sources and toolchain once per campaign."""
+
+    return BuildCache(
+        cache_dir=cache_dir,
+        source_digest=hash_source_tree(repo_dir),
+        toolchain_digest=toolchain_identity(
+            [
+                paths.cube_cmake,
+                paths.toolchain_bin / "starm-clang",
+                paths.toolchain_bin / "starm-clang++",
+                paths.toolchain_bin / "starm-size",
+            ]
+        ),
+    )
 
-def run_profile(
+
+def configure_profile(
     repo_dir: Path,
     cfg: RunConfig,
     profile: BuildProfile,
     paths: ToolchainPaths,
     env: dict[str, str],
     args: argparse.Namespace,
-) -> dict[str, object]:
-    """Executes build/flash/capture for one profile."""
+    build_cache: BuildCache | None = None,
+) -> ProfileBuild:
+    """Executes the configure stage of one profile.
+
+    A profile needing no build (completed on `--resume`, or dry-run) comes
+    back with its final `meta`. With `build_cache`, a previously built ELF
+    with the same flags, autorun count, sources and toolchain is copied into
+    the build directory together with its recorded memory metrics, so the
+    build and size stages have nothing left to do. Otherwise the build
+    directory is configured and the ELF is left to `build_profile`.
+    """
 
     profile_dir = cfg.build_root / profile.name
     build_dir = profile_dir / "build"
     logs_dir = profile_dir / "logs"
-    samples_dir = profile_dir / "samples_release"
     logs_dir.mkdir(parents=True, exist_ok=True)
 
-    if args.resume and profile_complete(profile_dir, cfg.runs):
+    if args.resume and profile_complete(profile_dir, cfg.runs, revalidate=args.revalidate):
         print(f"[{profile.name}] already completed, skip (--resume).")
-        return json.loads((profile_dir / "profile_meta.json").read_text(encoding="utf-8"))
+        meta = json.loads((profile_dir / "profile_meta.json").read_text(encoding="utf-8"))
+        return ProfileBuild(profile=profile, elf_path=None, memory={}, meta=meta)
 
     if not args.resume:
         if profile_dir.exists():
             shutil.rmtree(profile_dir)
+        drop_profile(cfg.build_root / STORE_DIR_NAME, profile.name)
         logs_dir.mkdir(parents=True, exist_ok=True)
 
-    cfg_log = logs_dir / "configure_build.log"
-    jlink_log = logs_dir / "jlink_flash.log"
-    serial_log = logs_dir / "serial_capture.log"
-    size_log = logs_dir / "size.log"
-
     if args.dry_run:
         print(f"[{profile.name}] dry-run only: skip build/flash/capture.")
-        return {
+        meta = {
             "profile": profile.name,
             "status": "dry-run",
             "runs": cfg.runs,
@@ -510,100 +1022,596 @@ def run_profile(
             "cxxflags": profile.cxxflags,
             "ldflags": profile.ldflags,
         }
+        return ProfileBuild(profile=profile, elf_path=None, memory={}, meta=meta)
+
+    cfg_log = logs_dir / "configure_build.log"
+    cache_key: str | None = None
+    if build_cache is not None:
+        cache_key = build_cache.key_for(profile, cfg.runs)
+        cached = build_cache.lookup(cache_key)
+        if cached is not None:
+            build_dir.mkdir(parents=True, exist_ok=True)
+            elf_path = build_dir / ELF_NAME
+            shutil.copy2(cached.elf_path, elf_path)
+            with cfg_log.open("a", encoding="utf-8") as fp:
+                fp.write(f"# build cache hit: key={cache_key}, elf={cached.elf_path}\n")
+            print(f"[{profile.name}] build cache hit ({cache_key[:12]}), skip build.")
+            return ProfileBuild(
+                profile=profile,
+                elf_path=elf_path,
+                memory=dict(cached.memory),
+                cache_key=cache_key,
+                cache_hit=True,
+                image_digest=elf_image_digest(elf_path),
+            )
 
-    elf_path = configure_and_build(
+    configure_build_dir(
         repo_dir=repo_dir,
         build_dir=build_dir,
         profile=profile,
         cfg=cfg,
         paths=paths,
         env=env,
-        jobs=args.jobs,
         log_path=cfg_log,
     )
+    return ProfileBuild(profile=profile, elf_path=None, memory={}, cache_key=cache_key)
+
+
+def build_profile(
+    repo_dir: Path,
+    cfg: RunConfig,
+    configured: ProfileBuild,
+    paths: ToolchainPaths,
+    env: dict[str, str],
+    jobs: int,
+) -> ProfileBuild:
+    """Executes the build stage: compiles a configured profile into its ELF.
+
+    A profile the configure stage already settled (final `meta` or cached
+    ELF) is returned unchanged.
+    """
+
+    if configured.meta is not None or configured.elf_path is not None:
+        return configured
+    profile_dir = cfg.build_root / configured.profile.name
+    elf_path = build_configured_dir(
+        repo_dir=repo_dir,
+        build_dir=profile_dir / "build",
+        paths=paths,
+        env=env,
+        jobs=jobs,
+        log_path=profile_dir / "logs" / "configure_build.log",
+    )
+    return replace(configured, elf_path=elf_path)
+
+
+def size_profile(
+    repo_dir: Path,
+    cfg: RunConfig,
+    built: ProfileBuild,
+    paths: ToolchainPaths,
+    env: dict[str, str],
+    build_cache: BuildCache | None = None,
+) -> ProfileBuild:
+    """Executes the size stage: collects memory metrics and caches the ELF.
+
+    A profile without a fresh ELF to measure (final `meta` or cached ELF,
+    which carries its recorded metrics) is returned unchanged.
+    """
+
+    if built.meta is not None or built.elf_path is None or built.image_digest is not None:
+        return built
     memory = collect_memory_metrics(
         toolchain_bin=paths.toolchain_bin,
-        elf_path=elf_path,
+        elf_path=built.elf_path,
         cwd=repo_dir,
         env=env,
-        log_path=size_log,
-    )
-    flash_with_jlink(
-        elf_path=elf_path,
-        profile_dir=profile_dir,
-        paths=paths,
-        device=args.device,
-        swd_speed=args.swd_speed,
-        env=env,
-        log_path=jlink_log,
+        log_path=cfg.build_root / built.profile.name / "logs" / "size.log",
     )
-    capture_serial_runs(
-        port=cfg.serial_port,
-        baudrate=args.baudrate,
-        expected_runs=cfg.runs,
-        timeout_sec=cfg.timeout_sec,
-        samples_dir=samples_dir,
-        log_path=serial_log,
+    if build_cache is not None and built.cache_key is not None:
+        build_cache.store(built.cache_key, built.elf_path, memory)
+    return replace(built, memory=memory, image_digest=elf_image_digest(built.elf_path))
+
+
+def start_progress_monitor(
+    profile_name: str,
+    elf_path: Path,
+    session: JLinkSession,
+    runs_total: int,
+    point_deadlines: dict[Point, float] | None,
+    interval_sec: float,
+    status_path: Path,
+) -> ProgressMonitor | None:
+    """Starts polling the firmware progress globals through the probe session.
+
+    Prints a progress line whenever the board moves to another point or its
+    state changes. Returns `None` when the ELF does not export the globals.
+    """
+
+    try:
+        addresses = progress_addresses(elf_path)
+    except ValueError as exc:
+        print(f"[{profile_name}] progress monitor disabled: {exc}")
+        return None
+
+    last: list[tuple[str, Point | None]] = []
+
+    def report(status: ProgressStatus) -> None:
+        key = (status.state, status.point)
+        if not last or last[0] != key:
+            print(f"[{profile_name}] progress: {status.describe()}")
+            last[:] = [key]
+
+    monitor = ProgressMonitor(
+        read_words=session.read_words,
+        addresses=addresses,
+        tracker=ProgressTracker(runs_total, point_deadlines),
+        interval_sec=interval_sec,
+        status_path=status_path,
+        on_status=report,
     )
+    monitor.start()
+    return monitor
+
+
+def timing_history_path(build_root: Path, profile_name: str) -> Path:
+    """Returns the per-profile point timing history file.
 
+    Lives outside the profile directory so it survives profile rebuilds.
+    """
+
+    return build_root / "_history" / "timing" / f"{profile_name}.json"
+
+
+def capture_profile(
+    cfg: RunConfig,
+    build: ProfileBuild,
+    paths: ToolchainPaths,
+    env: dict[str, str],
+    args: argparse.Namespace,
+    board: BoardTarget | None = None,
+    dedup: CaptureDeduplicator | None = None,
+    resolver: PortResolver | None = None,
+    flasher: JLinkSessionPool | None = None,
+    run_limit: int | None = None,
+) -> dict[str, object]:
+    """Executes the board stages (flash/capture) for one built profile.
+
+    With `dedup`, a profile whose firmware image matches an earlier profile is
+    recorded as an alias of it (`alias_of` in `profile_meta.json`) instead of
+    being flashed and captured again. `resolver` caches each board's USB
+    identity so the port is found again after the flash re-enumerates it.
+    `flasher` keeps one JLink session per probe across profiles. With
+    `--ci-target`, capture stops once the sequential stopping rule is met
+    (`cfg.runs` is then only the cap); `sequential_stop` in the metadata
+    records how many runs were kept. `run_limit` captures only the first runs
+    as a pilot (`status: pilot`); a later `--resume` pass continues it.
+    """
+
+    if build.meta is not None:
+        digest = build.meta.get("image_digest")
+        if dedup is not None and digest and not build.meta.get("alias_of"):
+            dedup.claim(str(digest), build.profile.name)
+        return build.meta
+    assert build.elf_path is not None
+
+    if board is None:
+        board = BoardTarget(port=cfg.serial_port)
+    multi_board = len(cfg.boards) > 1
+    resolver = resolver or PortResolver()
+
+    profile = build.profile
+    elf_path = build.elf_path
+    profile_dir = cfg.build_root / profile.name
+    build_dir = profile_dir / "build"
+    logs_dir = profile_dir / "logs"
+    samples_dir = profile_dir / "samples_release"
+    store_root = cfg.build_root / STORE_DIR_NAME
+    cfg_log = logs_dir / "configure_build.log"
+    jlink_log = logs_dir / "jlink_flash.log"
+    serial_log = logs_dir / "serial_capture.log"
+    size_log = logs_dir / "size.log"
+    timing_path = timing_history_path(cfg.build_root, profile.name)
+
+    alias_of: str | None = None
+    if dedup is not None and build.image_digest is not None:
+        alias_of = dedup.claim(build.image_digest, profile.name)
+
+    start_index = 1
+    last_run = cfg.runs if run_limit is None else max(1, min(cfg.runs, run_limit))
+    stop_rule: CiStoppingRule | None = None
+    if alias_of is None and args.ci_target > 0:
+        stop_rule = CiStoppingRule(args.ci_target, min_runs=args.min_runs)
+    if alias_of is not None:
+        print(f"[{profile.name}] firmware image identical to {alias_of}, skip capture (alias).")
+    else:
+        if args.resume:
+            start_index = resume_start_index(
+                profile_dir, cfg.runs, build.image_digest, revalidate=args.revalidate
+            )
+            if start_index > 1:
+                print(
+                    f"[{profile.name}] resume capture at run {start_index}/{cfg.runs} "
+                    "(same firmware image)."
+                )
+        write_profile_meta(
+            profile_dir,
+            {
+                "profile": profile.name,
+                "status": "capturing",
+                "runs": cfg.runs,
+                "image_digest": build.image_digest,
+            },
+        )
+        if stop_rule is not None and start_index > 1:
+            stored = stored_runs(store_root, profile.name)
+            seed_from_run_files(stop_rule, samples_dir, start_index - 1, stored=stored)
+            if stop_rule.satisfied():
+                print(f"[{profile.name}] CI target already met: {stop_rule.describe()}")
+        if start_index <= last_run and not (stop_rule is not None and stop_rule.satisfied()):
+            # Learn the USB identity while the board still sits on its known port.
+            resolver.identity_for(board.port)
+            downloaded = flash_with_jlink(
+                elf_path=elf_path,
+                profile_dir=profile_dir,
+                paths=paths,
+                device=args.device,
+                swd_speed=args.swd_speed,
+                env=env,
+                log_path=jlink_log,
+                jlink_serial=board.jlink_serial,
+                sessions=flasher,
+            )
+            if not downloaded:
+                print(f"[{profile.name}] target flash already matches ELF, download skipped.")
+            history = PointTimingHistory.load(timing_path)
+            point_deadlines = None
+            if args.point_timeout_factor > 0:
+                point_deadlines = history.deadlines(
+                    safety_factor=args.point_timeout_factor, fallback_sec=cfg.timeout_sec
+                )
+            monitor = None
+            session = flasher.session(board.jlink_serial) if flasher is not None else None
+            if session is not None and args.progress_interval > 0:
+                monitor = start_progress_monitor(
+                    profile_name=profile.name,
+                    elf_path=elf_path,
+                    session=session,
+                    runs_total=last_run - start_index + 1,
+                    point_deadlines=point_deadlines,
+                    interval_sec=args.progress_interval,
+                    status_path=logs_dir / PROGRESS_FILE_NAME,
+                )
+            try:
+                observed = capture_serial_runs(
+                    port=board.port,
+                    baudrate=args.baudrate,
+                    expected_runs=last_run,
+                    timeout_sec=cfg.timeout_sec,
+                    samples_dir=samples_dir,
+                    log_path=serial_log,
+                    scan_fallback=not multi_board,
+                    start_index=start_index,
+                    log_flush_sec=args.log_flush_sec,
+                    point_deadlines=point_deadlines,
+                    resolver=resolver,
+                    abort_reason=(lambda: monitor.hung_reason) if monitor is not None else None,
+                    stop_rule=stop_rule,
+                    store_root=store_root,
+                    export_run_files=args.export_run_files,
+                )
+            finally:
+                if monitor is not None:
+                    monitor.stop()
+                    if monitor.error is not None:
+                        print(f"[{profile.name}] progress monitor stopped: {monitor.error}")
+            history.extend(observed)
+            history.save(timing_path)
+            if stop_rule is not None:
+                print(f"[{profile.name}] sequential stop: {stop_rule.describe()}")
+
+    if alias_of is None:
+        # Reports then read one file per profile instead of one per run.
+        compact_profile(store_root, profile.name)
+    pilot = alias_of is None and last_run < cfg.runs
+    if stop_rule is not None and stop_rule.satisfied():
+        pilot = False
     meta = {
         "profile": profile.name,
-        "status": "completed",
+        "status": "pilot" if pilot else "completed",
         "runs": cfg.runs,
+        "pilot_runs": last_run if pilot else None,
         "captured_at": iso_utc_now(),
         "cflags": profile.cflags,
         "cxxflags": profile.cxxflags,
         "ldflags": profile.ldflags,
         "uses_lto": profile.uses_lto,
+        "board": {
+            "port": board.port,
+            "jlink_serial": board.jlink_serial,
+            "usb_serial": getattr(resolver.identity_for(board.port), "serial", None),
+        },
         "tools": {
             "cube_cmake": str(paths.cube_cmake),
             "cube": str(paths.cube),
             "starm_clang": str(paths.toolchain_bin / "starm-clang"),
             "jlink": str(paths.jlink),
         },
-        "memory": memory,
+        "memory": build.memory,
+        "build_cache": {"key": build.cache_key, "hit": build.cache_hit},
+        "image_digest": build.image_digest,
+        "alias_of": alias_of,
+        "resumed_from_run": start_index,
+        "sequential_stop": sequential_stop_meta(stop_rule, cfg.runs),
         "paths": {
             "profile_dir": str(profile_dir),
             "build_dir": str(build_dir),
             "samples_dir": str(samples_dir),
+            "campaign_store": str(store_root / profile.name),
             "elf": str(elf_path),
             "configure_build_log": str(cfg_log),
             "jlink_flash_log": str(jlink_log),
             "serial_capture_log": str(serial_log),
+            "serial_timestamps": str(logs_dir / TIMESTAMP_SIDECAR_NAME),
+            "progress": str(logs_dir / PROGRESS_FILE_NAME),
             "size_log": str(size_log),
         },
     }
-    (profile_dir / "profile_meta.json").write_text(
-        json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8"
-    )
+    write_profile_meta(profile_dir, meta)
     return meta
 
 
-def invoke_report_generator(
+def sequential_stop_meta(rule: CiStoppingRule | None, max_runs: int) -> dict[str, object] | None:
+    """Summarizes the stopping rule outcome for `profile_meta.json`."""
+
+    if rule is None:
+        return None
+    widest = rule.widest()
+    return {
+        "target_rel_ci": rule.target_rel_ci,
+        "min_runs": rule.min_runs,
+        "max_runs": max_runs,
+        "runs_captured": rule.runs,
+        "stopped_early": rule.satisfied() and rule.runs < max_runs,
+        "widest_point": list(widest.point) if widest is not None else None,
+        "widest_rel_ci": (
+            widest.rel_ci if widest is not None and math.isfinite(widest.rel_ci) else None
+        ),
+    }
+
+
+def build_to_result(build: ProfileBuild) -> dict[str, object]:
+    """Converts a build stage output into its persisted stage result."""
+
+    return {
+        "elf_path": str(build.elf_path) if build.elf_path is not None else None,
+        "memory": dict(build.memory),
+        "meta": to_jsonable(build.meta),
+        "cache_key": build.cache_key,
+        "cache_hit": build.cache_hit,
+        "image_digest": build.image_digest,
+    }
+
+
+def build_from_result(profile: BuildProfile, result: dict[str, object]) -> ProfileBuild:
+    """Restores a build stage output from its persisted stage result."""
+
+    elf_path = result.get("elf_path")
+    meta = result.get("meta")
+    return ProfileBuild(
+        profile=profile,
+        elf_path=Path(str(elf_path)) if elf_path else None,
+        memory={str(k): int(v) for k, v in dict(result.get("memory") or {}).items()},
+        meta=dict(meta) if isinstance(meta, dict) else None,
+        cache_key=str(result["cache_key"]) if result.get("cache_key") else None,
+        cache_hit=bool(result.get("cache_hit")),
+        image_digest=str(result["image_digest"]) if result.get("image_digest") else None,
+    )
+
+
+def profile_pipeline(
+    cfg: RunConfig,
+    profile: BuildProfile,
+    args: argparse.Namespace,
+    configure_one: Callable[[], ProfileBuild],
+    build_one: Callable[[ProfileBuild], ProfileBuild],
+    size_one: Callable[[ProfileBuild], ProfileBuild],
+    capture_one: Callable[[ProfileBuild, argparse.Namespace], dict[str, object]],
+    build_cache: BuildCache | None = None,
+) -> Pipeline:
+    """Declares the stage DAG of one profile: `configure` -> `build` -> `size` -> `capture`.
+
+    Each host stage passes the profile's `ProfileBuild` on to the next and is
+    timed on its own. They are reused from their persisted results only while
+    the build cache key they recorded is still current; `capture`
+    (flash/capture) only while `profile_complete` holds. A capture failing
+    with an OS/serial error, a timeout or a J-Link error is retried
+    `--capture-retries` times, continuing from the runs the failed attempt
+    already committed.
+    """
+
+    profile_dir = cfg.build_root / profile.name
+    attempts: list[int] = []
+
+    def build_current(result: dict[str, object]) -> bool:
+        if build_cache is None or not result.get("cache_key"):
+            return False
+        return result["cache_key"] == build_cache.key_for(profile, cfg.runs)
+
+    def host_stage(
+        name: str, step: Callable[[ProfileBuild], ProfileBuild], after: str
+    ) -> Stage:
+        return Stage(
+            name,
+            run=lambda inputs: build_to_result(step(build_from_result(profile, inputs[after]))),
+            inputs=(after,),
+            outputs=("elf_path",),
+            reusable=build_current,
+        )
+
+    def run_capture(inputs: Mapping[str, dict[str, object]]) -> dict[str, object]:
+        stage_args = args
+        if attempts:
+            stage_args = argparse.Namespace(**{**vars(args), "resume": True})
+        attempts.append(len(attempts) + 1)
+        meta = capture_one(build_from_result(profile, inputs["size"]), stage_args)
+        return {"meta": to_jsonable(meta)}
+
+    return Pipeline(
+        [
+            Stage(
+                "configure",
+                run=lambda inputs: build_to_result(configure_one()),
+                outputs=("elf_path",),
+                reusable=build_current,
+            ),
+            host_stage("build", build_one, after="configure"),
+            host_stage("size", size_one, after="build"),
+            Stage(
+                "capture",
+                run=run_capture,
+                inputs=("size",),
+                reusable=lambda result: profile_complete(
+                    profile_dir, cfg.runs, revalidate=args.revalidate
+                ),
+                retries=max(0, args.capture_retries),
+                retry_on=CAPTURE_RETRY_ERRORS,
+                retry_delay_sec=CAPTURE_RETRY_DELAY_SEC,
+            ),
+        ]
+    )
+
+
+def report_stage_summary(
+    build_root: Path,
+    states: Sequence[StageState],
+    wall_sec: float,
+) -> None:
+    """Prints where the campaign's time went and writes `pipeline_summary.json`."""
+
+    summaries = summarize_stages(states)
+    if not summaries:
+        return
+    print()
+    for line in format_stage_summary(summaries, wall_sec):
+        print(line)
+    write_stage_summary(build_root / SUMMARY_FILE_NAME, summaries, wall_sec)
+
+
+def run_profiles_on_boards(
+    profiles: Sequence[BuildProfile],
+    boards: Sequence[BoardTarget],
+    run_one: Callable[[BuildProfile, BoardTarget], dict[str, object]],
+) -> list[dict[str, object]]:
+    """Runs profiles across boards, each board taking the next pending profile.
+
+    With one board this is the plain sequential loop. With several boards each
+    board gets its own worker thread. After the first failure no new profile is
+    started; in-flight profiles are allowed to finish and the first error is
+    re-raised.
+
+    Returns:
+        Profile metadata in the order of `profiles`.
+    """
+
+    if not boards:
+        raise ValueError("At least one board is required.")
+
+    lock = threading.Lock()
+    pending = list(enumerate(profiles))
+    results: dict[int, dict[str, object]] = {}
+    failures: list[Exception] = []
+
+    def worker(board: BoardTarget) -> None:
+        while True:
+            with lock:
+                if failures or not pending:
+                    return
+                index, profile = pending.pop(0)
+            suffix = f" on {board.port}" if len(boards) > 1 else ""
+            print(f"\n===== [{profile.name}] start{suffix} =====")
+            try:
+                meta = run_one(profile, board)
+            except Exception as exc:
+                print(f"===== [{profile.name}] failed: {exc} =====")
+                with lock:
+                    failures.append(exc)
+                return
+            with lock:
+                results[index] = meta
+            print(f"===== [{profile.name}] success =====")
+
+    if len(boards) == 1:
+        worker(boards[0])
+    else:
+        threads = [
+            threading.Thread(target=worker, args=(board,), name=f"board-{board.port}")
+            for board in boards
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    if failures:
+        raise failures[0]
+    return [results[index] for index in sorted(results)]
+
+
+def run_profiles_pipelined(
+    profiles: Sequence[BuildProfile],
+    boards: Sequence[BoardTarget],
+    build_one: Callable[[BuildProfile], ProfileBuild],
+    capture_one: Callable[[ProfileBuild, BoardTarget], dict[str, object]],
+    depth: int,
+) -> list[dict[str, object]]:
+    """Overlaps host builds with board captures.
+
+    Builds are queued in profile order on `depth` worker threads, so profile
+    k+1..k+depth compile while profile k is being captured. Boards consume the
+    build results in order through `run_profiles_on_boards`, which keeps its
+    abort-on-first-failure semantics; a failed build fails its own profile when
+    a board picks it up. Builds that have not started yet are cancelled on abort.
+
+    Returns:
+        Profile metadata in the order of `profiles`.
+    """
+
+    if depth <= 0:
+        raise ValueError("depth must be positive.")
+
+    with ThreadPoolExecutor(max_workers=depth, thread_name_prefix="build") as pool:
+        builds: dict[str, Future[ProfileBuild]] = {
+            profile.name: pool.submit(build_one, profile) for profile in profiles
+        }
+        try:
+            return run_profiles_on_boards(
+                profiles,
+                boards,
+                lambda profile, board: capture_one(builds[profile.name].result(), board),
+            )
+        finally:
+            for future in builds.values():
+                future.cancel()
+
+
+def generate_reports(
     repo_dir: Path,
     input_root: Path,
-    output_md: Path,
-    output_dir: Path,
     profiles: Sequence[BuildProfile],
-) -> None:
-    """Calls report generator script after all profiles succeed."""
-
-    cmd = [
-        sys.executable,
-        str(repo_dir / "benchmark_analysis" / "generate_full_matrix_report.py"),
-        "--input-root",
-        str(input_root),
-        "--output-md",
-        str(output_md),
-        "--output-dir",
-        str(output_dir),
-        "--profiles",
-        ",".join(p.name for p in profiles),
-        "--strict",
-    ]
-    result = subprocess.run(cmd, check=False)
-    if result.returncode != 0:
-        raise RuntimeError("Report generator failed.")
+) -> list[Path]:
+    """Emits the full-matrix and readable reports after all profiles succeed.
+
+    Runs in-process: the campaign is loaded and validated once and both
+    reports are built from the same samples and stats frame.
+
+    Returns:
+        Paths of the written markdown reports (full-matrix first).
+    """
+
+    data = load_campaign(input_root, profiles, strict=True)
+    full_paths, readable_paths = report_paths(repo_dir, input_root)
+    return emit_reports(data, full_paths, readable_paths)
 
 
 def main() -> None:
@@ -611,21 +1619,36 @@ def main() -> None:
 
     args = parse_args()
     repo_dir = Path(__file__).resolve().parents[1]
-    profiles_map = default_profiles()
-    selected_names = parse_profile_names(args.profiles)
-
-    selected_profiles: list[BuildProfile] = []
-    for name in selected_names:
-        if name not in profiles_map:
-            raise ValueError(f"Unknown profile: {name}")
-        selected_profiles.append(profiles_map[name])
+    plan = None
+    if args.profile_space:
+        plan = plan_campaign(
+            load_profile_space(Path(args.profile_space)), args.design, args.fraction
+        )
+        selected_profiles = plan.build_profiles
+        print(f"Planned {len(selected_profiles)} profiles ({plan.design} design).")
+    else:
+        profiles_map = default_profiles()
+        selected_profiles = []
+        for name in parse_profile_names(args.profiles):
+            if name not in profiles_map:
+                raise ValueError(f"Unknown profile: {name}")
+            selected_profiles.append(profiles_map[name])
+
+    boards = parse_board_targets(args.boards) if args.boards else []
+    if not boards:
+        boards = [BoardTarget(port=args.port)]
+    if len(boards) > 1 and any(board.jlink_serial is None for board in boards):
+        raise ValueError("--boards requires PORT=JLINK_SERIAL for every board.")
+    if args.max_runs > 0 and args.ci_target <= 0:
+        raise ValueError("--max-runs requires --ci-target.")
 
     cfg = RunConfig(
         repo_dir=repo_dir,
         build_root=repo_dir / "build" / "bench_matrix",
-        serial_port=args.port,
-        runs=args.runs,
+        serial_port=boards[0].port,
+        runs=args.max_runs if args.ci_target > 0 and args.max_runs > 0 else args.runs,
         timeout_sec=args.timeout_sec,
+        boards=tuple(boards),
     )
     paths = ToolchainPaths(
         cube_cmake=Path(args.cube_cmake).resolve(),
@@ -637,6 +1660,8 @@ def main() -> None:
     env = build_env(paths)
 
     cfg.build_root.mkdir(parents=True, exist_ok=True)
+    if plan is not None:
+        save_plan(plan, cfg.build_root / PLAN_FILE_NAME)
     manifest_path = cfg.build_root / "matrix_manifest.json"
     manifest = {
         "generated_at": iso_utc_now(),
@@ -648,36 +1673,171 @@ def main() -> None:
         json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8"
     )
 
-    completed: list[dict[str, object]] = []
-    for profile in selected_profiles:
-        print(f"\n===== [{profile.name}] start =====")
-        try:
-            meta = run_profile(
+    build_cache: BuildCache | None = None
+    if not args.no_build_cache and not args.dry_run:
+        build_cache = create_build_cache(repo_dir, cfg.build_root / "_cache" / "elf", paths)
+    dedup = None if args.no_dedup else CaptureDeduplicator()
+    resolver = PortResolver()
+    flasher: JLinkSessionPool | None = None
+    if not args.no_jlink_session and not args.dry_run:
+        flasher = JLinkSessionPool(
+            jlink=paths.jlink,
+            device=args.device,
+            swd_speed=args.swd_speed,
+            cwd=cfg.build_root,
+            env=env,
+        )
+
+    states: dict[str, StageState] = {}
+    states_lock = threading.Lock()
+    rerun = {name.strip() for name in args.rerun_stages.split(",") if name.strip()}
+    unknown = rerun - set(PROFILE_STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage in --rerun-stages: {', '.join(sorted(unknown))}")
+    build_jobs = max(1, args.jobs // args.pipeline_depth) if args.pipeline_depth > 0 else None
+
+    def state_for(profile: BuildProfile) -> StageState:
+        with states_lock:
+            if profile.name not in states:
+                states[profile.name] = StageState(
+                    cfg.build_root / profile.name / STATE_FILE_NAME,
+                    profile.name,
+                    fresh=not args.resume,
+                )
+            return states[profile.name]
+
+    def stages_for(
+        profile: BuildProfile,
+        batch_args: argparse.Namespace,
+        run_limit: int | None,
+        board: BoardTarget | None,
+    ) -> Pipeline:
+        return profile_pipeline(
+            cfg,
+            profile,
+            batch_args,
+            configure_one=lambda: configure_profile(
                 repo_dir=repo_dir,
                 cfg=cfg,
                 profile=profile,
                 paths=paths,
                 env=env,
-                args=args,
+                args=batch_args,
+                build_cache=build_cache,
+            ),
+            build_one=lambda configured: build_profile(
+                repo_dir=repo_dir,
+                cfg=cfg,
+                configured=configured,
+                paths=paths,
+                env=env,
+                jobs=build_jobs if build_jobs is not None else batch_args.jobs,
+            ),
+            size_one=lambda built: size_profile(
+                repo_dir=repo_dir,
+                cfg=cfg,
+                built=built,
+                paths=paths,
+                env=env,
+                build_cache=build_cache,
+            ),
+            capture_one=lambda build, stage_args: capture_profile(
+                cfg=cfg,
+                build=build,
+                paths=paths,
+                env=env,
+                args=stage_args,
+                board=board,
+                dedup=dedup,
+                resolver=resolver,
+                flasher=flasher,
+                run_limit=run_limit,
+            ),
+            build_cache=build_cache,
+        )
+
+    def run_batch(
+        profiles: Sequence[BuildProfile],
+        batch_args: argparse.Namespace,
+        run_limit: int | None = None,
+        force: Collection[str] = (),
+    ) -> None:
+        force = set(force) | (rerun if batch_args.resume else set())
+        if args.pipeline_depth > 0:
+            run_profiles_pipelined(
+                profiles,
+                cfg.boards,
+                lambda profile: build_from_result(
+                    profile,
+                    stages_for(profile, batch_args, run_limit, None).run(
+                        state_for(profile), ["size"], force=force
+                    )["size"],
+                ),
+                lambda build, board: stages_for(build.profile, batch_args, run_limit, board).run(
+                    state_for(build.profile), ["capture"], force=force - set(HOST_STAGES)
+                )["capture"]["meta"],
+                depth=args.pipeline_depth,
             )
-            completed.append(meta)
-            print(f"===== [{profile.name}] success =====")
-        except Exception as exc:
-            print(f"===== [{profile.name}] failed: {exc} =====")
-            raise SystemExit(1) from exc
+        else:
+            run_profiles_on_boards(
+                profiles,
+                cfg.boards,
+                lambda profile, board: stages_for(profile, batch_args, run_limit, board).run(
+                    state_for(profile), ["capture"], force=force
+                )["capture"]["meta"],
+            )
+
+    def run_report() -> dict[str, object]:
+        full_md, readable_md = generate_reports(repo_dir, cfg.build_root, selected_profiles)
+        shutil.copyfile(full_md, repo_dir / "report.md")
+        return {"report": str(full_md), "readable_report": str(readable_md)}
+
+    campaign_state = StageState(
+        cfg.build_root / STATE_FILE_NAME, "campaign", fresh=not args.resume
+    )
+    started = time.monotonic()
+    try:
+        if args.pilot_runs > 0 and not args.dry_run:
+            anchors, pilots = split_anchors(selected_profiles, parse_profile_names(args.anchors))
+            print(f"Anchors: {', '.join(p.name for p in anchors)}; pilot runs: {args.pilot_runs}.")
+            run_batch(anchors, args)
+            run_batch(pilots, args, run_limit=args.pilot_runs)
+            schedule = schedule_profiles(cfg.build_root, anchors, pilots)
+            save_schedule(
+                cfg.build_root / SCHEDULE_FILE_NAME,
+                schedule,
+                [p.name for p in anchors],
+                args.pilot_runs,
+            )
+            print("Full-run schedule (most distinctive first):")
+            for line in describe_schedule(schedule):
+                print(f"  {line}")
+            by_name = {p.name: p for p in pilots}
+            # The full pass continues every pilot from its captured runs.
+            resume_args = argparse.Namespace(**{**vars(args), "resume": True})
+            run_batch(
+                [by_name[item.name] for item in schedule], resume_args, force={"capture"}
+            )
+        else:
+            run_batch(selected_profiles, args)
+        if not args.dry_run:
+            report_pipeline = Pipeline([Stage("report", run=lambda inputs: run_report())])
+            report_pipeline.run(campaign_state, force={"report"})
+    except Exception as exc:
+        # `SystemExit` prints nothing, so name the failure here: a profile's
+        # `StageError`, or a scheduling or report error.
+        print(f"===== failed: {type(exc).__name__}: {exc} =====")
+        raise SystemExit(1) from exc
+    finally:
+        if flasher is not None:
+            flasher.close()
+        report_stage_summary(
+            cfg.build_root, [*states.values(), campaign_state], time.monotonic() - started
+        )
 
     if args.dry_run:
         print("Dry-run complete.")
         return
-
-    invoke_report_generator(
-        repo_dir=repo_dir,
-        input_root=cfg.build_root,
-        output_md=repo_dir / "report_full_matrix.md",
-        output_dir=repo_dir / "benchmark_analysis" / "output" / "full_matrix",
-        profiles=selected_profiles,
-    )
-    shutil.copyfile(repo_dir / "report_full_matrix.md", repo_dir / "report.md")
     print("Full matrix pipeline finished successfully.")
 
 
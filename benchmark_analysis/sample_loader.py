@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import Sequence
+
+try:
+    import numpy as np
+    import pandas as pd
+    _IMPORT_ERROR: Exception | None = None
+except ImportError as exc:  # pragma: no cover - runtime dependency
+    np = None  # type: ignore[assignment]
+    pd = None  # type: ignore[assignment]
+    _IMPORT_ERROR = exc
+
+
+# The 11 fields of a benchmark CSV line, with their column types.
+SAMPLE_COLUMNS: tuple[tuple[str, str], ...] = (
+    ("op", "str"),
+    ("n", "int64"),
+    ("repeat", "int64"),
+    ("warmup", "int64"),
+    ("eigen_avg_cycles", "float64"),
+    ("cmsis_avg_cycles", "float64"),
+    ("cmsis_over_eigen", "float64"),
+    ("error_l2", "float64"),
+    ("valid", "int64"),
+    ("invalid", "int64"),
+    ("build_mode", "str"),
+)
+
+
+def record_line_mask(lines: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    """Selects the benchmark record lines of raw text lines.
+
+    Vectorized form of `full_matrix_common.parse_csv_record_line`: lines are
+    stripped, a leading BOM is dropped, and blank lines, `done` markers, the
+    `op,...` header and lines without exactly 11 fields are skipped.
+
+    Returns:
+        Cleaned lines and the boolean mask of record lines among them.
+    """
+
+    cleaned = np.char.lstrip(np.char.strip(lines), "\ufeff")
+    fields = np.char.count(cleaned, ",") + 1
+    header = np.char.startswith(cleaned, "op,")
+    return cleaned, (fields == len(SAMPLE_COLUMNS)) & ~header
+
+
+def parse_sample_bytes(
+    contents: Sequence[bytes],
+    run_ids: Sequence[str],
+    sources: Sequence[object] | None = None,
+) -> pd.DataFrame:
+    """Parses the raw bytes of several run files into one typed DataFrame.
+
+    Every file's lines are filtered together with `record_line_mask` and the
+    surviving records are parsed by one `pandas.read_csv` call, so the cost is
+    dominated by I/O rather than per-line Python objects.
+
+    Args:
+        contents: Raw file contents, in output order.
+        run_ids: Value of the leading `run_id` column per file.
+        sources: Names used in error messages (default: the run ids).
+
+    Returns:
+        `run_id` followed by the 11 sample columns, rows in file order.
+
+    Raises:
+        ValueError: A file has no record line, or a field does not parse.
+    """
+
+    if pd is None or np is None:
+        raise RuntimeError(
+            "pandas/numpy are required. Install dependencies in benchmark_analysis first."
+        ) from _IMPORT_ERROR
+    if len(run_ids) != len(contents):
+        raise ValueError("run_ids must match contents one to one.")
+    names = [name for name, _ in SAMPLE_COLUMNS]
+    if not contents:
+        return pd.DataFrame(columns=["run_id", *names])
+
+    texts = [raw.decode("utf-8", errors="ignore").splitlines() for raw in contents]
+    counts = np.array([len(lines) for lines in texts], dtype=np.int64)
+    all_lines = np.array([line for lines in texts for line in lines], dtype=str)
+    file_index = np.repeat(np.arange(len(contents)), counts)
+    cleaned, keep = record_line_mask(all_lines)
+
+    per_file = np.bincount(file_index[keep], minlength=len(contents))
+    for source, count in zip(sources or run_ids, per_file):
+        if count == 0:
+            raise ValueError(f"No valid benchmark records found in {source}")
+
+    frame = pd.read_csv(
+        io.StringIO("\n".join(cleaned[keep].tolist())),
+        header=None,
+        names=names,
+        dtype=dict(SAMPLE_COLUMNS),
+        skipinitialspace=True,
+        engine="c",
+    )
+    frame.insert(0, "run_id", np.asarray(run_ids, dtype=str)[file_index[keep]])
+    return frame
+
+
+def load_sample_files(
+    paths: Sequence[Path],
+    run_ids: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """Reads run files with `parse_sample_bytes`.
+
+    Args:
+        paths: Run files to read, in output order.
+        run_ids: `run_id` per file (default: each file's stem).
+    """
+
+    if run_ids is None:
+        run_ids = [path.stem for path in paths]
+    return parse_sample_bytes([path.read_bytes() for path in paths], run_ids, sources=paths)
+
+
+def load_sample_dir(samples_dir: Path) -> pd.DataFrame:
+    """Loads every `run_*.csv` in a directory, `run_id` taken from the file stem.
+
+    Raises:
+        RuntimeError: The directory holds no run file.
+    """
+
+    # Sorting by name string avoids the slow `Path` comparisons on big campaigns.
+    files = sorted(samples_dir.glob("run_*.csv"), key=lambda path: path.name)
+    if not files:
+        raise RuntimeError(f"No sample csv files found in {samples_dir}")
+    return load_sample_files(files)
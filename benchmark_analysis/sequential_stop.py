@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+from typing import Mapping
+
+from full_matrix_common import SampleRecord
+from full_matrix_common import parse_run_lines
+from point_timing import Point
+from stats_engine import CI_Z
+
+
+DEFAULT_MIN_RUNS = 3
+
+
+def eigen_over_cmsis(record: SampleRecord) -> float:
+    """Returns the Eigen/CMSIS cycle ratio exactly as the reports derive it."""
+
+    return (1.0 / record.cmsis_over_eigen) if record.cmsis_over_eigen > 0 else float("inf")
+
+
+@dataclass(frozen=True)
+class PointInterval:
+    """Current `eigen_over_cmsis` confidence interval of one `(op, n)` point.
+
+    Args:
+        point: `(op, n)`.
+        runs: Runs observed for the point.
+        mean: Sample mean.
+        ci: Half-width of the 95% CI (`std * 1.96 / sqrt(runs)`), NaN below 2 runs.
+        rel_ci: `ci / |mean|`, NaN when undefined.
+    """
+
+    point: Point
+    runs: int
+    mean: float
+    ci: float
+    rel_ci: float
+
+
+class CiStoppingRule:
+    """Sequential stopping rule on the per-point `eigen_over_cmsis` CI.
+
+    Fed one committed run at a time, it keeps running sums per `(op, n)` and
+    reports the capture as done once every point's 95% CI half-width is below
+    `target_rel_ci` of its mean (after at least `min_runs` runs).
+
+    Args:
+        target_rel_ci: Target relative CI half-width, for example 0.01 for ±1%.
+        min_runs: Runs always captured before the rule may stop.
+    """
+
+    def __init__(self, target_rel_ci: float, min_runs: int = DEFAULT_MIN_RUNS) -> None:
+        if target_rel_ci <= 0:
+            raise ValueError("target_rel_ci must be positive.")
+        self.target_rel_ci = target_rel_ci
+        self.min_runs = max(2, min_runs)
+        self.runs = 0
+        self._sums: dict[Point, tuple[int, float, float]] = {}
+
+    def add_run(self, records: Iterable[SampleRecord]) -> bool:
+        """Adds one run and returns whether the capture may stop now."""
+
+        for record in records:
+            count, total, total_sq = self._sums.get((record.op, record.n), (0, 0.0, 0.0))
+            value = eigen_over_cmsis(record)
+            self._sums[(record.op, record.n)] = (count + 1, total + value, total_sq + value * value)
+        self.runs += 1
+        return self.satisfied()
+
+    def intervals(self) -> dict[Point, PointInterval]:
+        """Returns the current interval of every observed point."""
+
+        result: dict[Point, PointInterval] = {}
+        for point, (count, total, total_sq) in self._sums.items():
+            mean = total / count
+            ci = float("nan")
+            if count > 1 and math.isfinite(mean):
+                # Sample variance (ddof=1), as `stats_engine.group_stats`.
+                var = max(0.0, (total_sq - count * mean * mean) / (count - 1))
+                ci = math.sqrt(var) * CI_Z / math.sqrt(count)
+            rel_ci = ci / abs(mean) if mean and math.isfinite(ci) else float("nan")
+            result[point] = PointInterval(point, count, mean, ci, rel_ci)
+        return result
+
+    def widest(self) -> PointInterval | None:
+        """Returns the point furthest from the target (undefined widths first)."""
+
+        items = list(self.intervals().values())
+        if not items:
+            return None
+        return max(items, key=lambda item: math.inf if math.isnan(item.rel_ci) else item.rel_ci)
+
+    def satisfied(self) -> bool:
+        """Whether at least `min_runs` runs are in and every point meets the target."""
+
+        if self.runs < self.min_runs or not self._sums:
+            return False
+        widest = self.widest()
+        return widest is not None and widest.rel_ci < self.target_rel_ci
+
+    def describe(self) -> str:
+        """Returns a one-line summary for the console."""
+
+        widest = self.widest()
+        if widest is None or math.isnan(widest.rel_ci):
+            return f"{self.runs} runs, CI undefined"
+        op, n = widest.point
+        return (
+            f"{self.runs} runs, widest CI ±{widest.rel_ci * 100:.2f}% at {op}-{n} "
+            f"(target ±{self.target_rel_ci * 100:.2f}%)"
+        )
+
+
+def seed_from_run_files(
+    rule: CiStoppingRule,
+    samples_dir: Path,
+    last_run: int,
+    stored: Mapping[str, Iterable[SampleRecord]] | None = None,
+) -> None:
+    """Feeds already committed runs 1 .. `last_run` into `rule`.
+
+    Runs found in `stored` (the campaign store's runs by run id) are taken
+    from there; the others are read from `run_NNN.csv` in `samples_dir`.
+    """
+
+    for idx in range(1, last_run + 1):
+        records = (stored or {}).get(f"run_{idx:03d}")
+        if records is not None:
+            rule.add_run(records)
+            continue
+        run_file = samples_dir / f"run_{idx:03d}.csv"
+        text = run_file.read_bytes().decode("utf-8", errors="ignore")
+        rule.add_run(parse_run_lines(text.splitlines()))
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable
+from typing import Mapping
+from typing import TextIO
+
+from full_matrix_common import StreamingRunValidator
+from point_timing import Point
+from point_timing import PointTracker
+
+
+READ_CHUNK_BYTES = 4096
+QUEUE_MAX_BATCHES = 256
+DEFAULT_LOG_FLUSH_SEC = 1.0
+
+
+class LineSplitter:
+    """Splits a byte stream into complete lines using one reusable buffer.
+
+    Lines are returned as raw bytes; decoding is left to the consumer so the
+    reader thread never touches text.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """Appends `chunk` and returns every line completed by it (without `\\n`)."""
+
+        self._buffer += chunk
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return []
+        lines = bytes(self._buffer[:end]).split(b"\n")
+        del self._buffer[: end + 1]
+        return lines
+
+    def pending(self) -> bytes:
+        """Returns the bytes of the current incomplete line."""
+
+        return bytes(self._buffer)
+
+
+class RunWriter(threading.Thread):
+    """Consumer thread: decodes line batches, logs them and commits finished runs.
+
+    Each record is validated as soon as it arrives (`StreamingRunValidator`),
+    so a bad run stops the capture on its first offending line.
+
+    Args:
+        log_fp: Open text file receiving every captured line.
+        times_fp: Optional timestamp sidecar receiving `<monotonic>\t<line>` for
+            every line, plus a `# committed run=<k>` marker after each commit.
+        on_finish: Called once the writer stops, e.g. to cancel a blocking read.
+        commit_run: Called as `commit_run(lines, run_index)` for each validated run.
+        start_index: Index of the first run to commit.
+        expected_runs: Last run index; the thread stops after committing it.
+        log_flush_sec: Upper bound on how long captured lines stay unflushed.
+        max_batches: Queue bound; a slow consumer blocks the reader instead of
+            growing memory without limit.
+        stop_after: Optional `stop_after(lines, run_index)` called after each
+            commit; returning true stops the thread before `expected_runs`.
+    """
+
+    def __init__(
+        self,
+        log_fp: TextIO,
+        commit_run: Callable[[list[str], int], object],
+        start_index: int,
+        expected_runs: int,
+        log_flush_sec: float = DEFAULT_LOG_FLUSH_SEC,
+        max_batches: int = QUEUE_MAX_BATCHES,
+        times_fp: TextIO | None = None,
+        on_finish: Callable[[], object] | None = None,
+        stop_after: Callable[[list[str], int], bool] | None = None,
+    ) -> None:
+        super().__init__(name="serial-run-writer", daemon=True)
+        self._log_fp = log_fp
+        self._times_fp = times_fp
+        self._on_finish = on_finish
+        self._commit_run = commit_run
+        self._stop_after = stop_after
+        self._expected_runs = expected_runs
+        self._log_flush_sec = max(0.0, log_flush_sec)
+        self._batches: queue.Queue[tuple[float, list[bytes]] | None] = queue.Queue(
+            maxsize=max_batches
+        )
+        self.run_index = start_index
+        self._validator = StreamingRunValidator()
+        self.error: BaseException | None = None
+        self.stopped_early = False
+        self.finished = threading.Event()
+
+    def submit(self, batch: tuple[float, list[bytes]] | None) -> None:
+        """Queues `(received_at, raw lines)` (`None` ends the stream).
+
+        Blocks while the queue is full unless the writer has already stopped.
+        """
+
+        while not self.finished.is_set():
+            try:
+                self._batches.put(batch, timeout=0.2)
+                return
+            except queue.Full:
+                continue
+
+    def close(self) -> None:
+        """Ends the stream and waits for pending batches to be written."""
+
+        self.submit(None)
+        self.join()
+
+    def run(self) -> None:
+        try:
+            self._consume()
+        except BaseException as exc:
+            self.error = exc
+        finally:
+            self._log_fp.flush()
+            if self._times_fp is not None:
+                self._times_fp.flush()
+            self.finished.set()
+            if self._on_finish is not None:
+                self._on_finish()
+
+    def _consume(self) -> None:
+        current: list[str] = []
+        last_flush = time.monotonic()
+        wait = self._log_flush_sec if self._log_flush_sec > 0 else None
+        while True:
+            try:
+                batch = self._batches.get(timeout=wait)
+            except queue.Empty:
+                batch = (0.0, [])
+            if batch is None:
+                return
+            received_at, raw_lines = batch
+            if raw_lines:
+                text = b"\n".join(raw_lines).decode("utf-8", errors="replace")
+                lines = [line.rstrip("\r") for line in text.split("\n")]
+                self._log_fp.write("\n".join(lines) + "\n")
+                stamp = f"{received_at:.6f}\t"
+                for line in lines:
+                    if self._times_fp is not None:
+                        self._times_fp.write(stamp + line + "\n")
+                    current.append(line)
+                    try:
+                        self._validator.feed(line)
+                        if line.strip().lower() != "done":
+                            continue
+                        self._validator.finish()
+                    except ValueError as exc:
+                        raise ValueError(
+                            f"Run {self.run_index} rejected at line {line.strip()!r}: {exc}"
+                        ) from exc
+                    self._commit_run(current, self.run_index)
+                    if self._times_fp is not None:
+                        self._times_fp.write(f"{stamp}# committed run={self.run_index}\n")
+                    committed, current = current, []
+                    self.run_index += 1
+                    if self.run_index > self._expected_runs:
+                        return
+                    if self._stop_after is not None and self._stop_after(
+                        committed, self.run_index - 1
+                    ):
+                        self.stopped_early = True
+                        return
+            now = time.monotonic()
+            if now - last_flush >= self._log_flush_sec:
+                self._log_fp.flush()
+                if self._times_fp is not None:
+                    self._times_fp.flush()
+                last_flush = now
+
+
+def stream_serial_runs(
+    ser,
+    log_fp: TextIO,
+    commit_run: Callable[[list[str], int], object],
+    start_index: int,
+    expected_runs: int,
+    timeout_sec: float,
+    log_flush_sec: float = DEFAULT_LOG_FLUSH_SEC,
+    point_deadlines: Mapping[Point, float] | None = None,
+    times_fp: TextIO | None = None,
+    abort_reason: Callable[[], str | None] | None = None,
+    stop_after: Callable[[list[str], int], bool] | None = None,
+) -> dict[Point, list[float]]:
+    """Reads benchmark output from an open port until `expected_runs` are committed.
+
+    The calling thread only bulk-reads whatever `ser.in_waiting` reports and
+    splits it into lines; decoding, logging, validation and run file writes
+    happen on a `RunWriter` thread behind a bounded queue.
+
+    While the board computes a point listed in `point_deadlines`, that
+    deadline replaces `timeout_sec` as the idle limit. `abort_reason` lets an
+    outside observer (the probe progress monitor) end the capture early: it is
+    checked between reads and a non-`None` result aborts. `stop_after` ends
+    it early on the host's own terms (the sequential stopping rule): the
+    capture returns normally with fewer than `expected_runs` runs.
+
+    Args:
+        ser: Open pyserial-like port (`in_waiting`, `read(size)`), with a read
+            timeout so an idle link returns empty reads.
+        log_fp: Open text log file; must not be written by the caller meanwhile.
+        commit_run: Called as `commit_run(lines, run_index)` for each validated run.
+        start_index: Index of the first run to commit.
+        expected_runs: Last run index to capture.
+        timeout_sec: Idle timeout (no bytes received) in seconds.
+        log_flush_sec: Maximum time captured lines stay unflushed in the log.
+        point_deadlines: Optional per-`(op, n)` idle limits in seconds.
+        times_fp: Optional timestamp sidecar, see `RunWriter`.
+        abort_reason: Optional callable returning why to give up, or `None`.
+        stop_after: Optional early-stop predicate, see `RunWriter`.
+
+    Returns:
+        Observed gaps before each record line, keyed by `(op, n)`.
+
+    Raises:
+        TimeoutError: No data within `timeout_sec`, or `abort_reason` fired.
+        ValueError: A run failed parsing or validation.
+    """
+
+    writer = RunWriter(
+        log_fp,
+        commit_run,
+        start_index,
+        expected_runs,
+        log_flush_sec,
+        times_fp=times_fp,
+        stop_after=stop_after,
+        # Wake the reader from its blocking read as soon as the last run is in.
+        on_finish=getattr(ser, "cancel_read", None),
+    )
+    writer.start()
+    splitter = LineSplitter()
+    tracker = PointTracker()
+    deadlines = point_deadlines or {}
+    last_rx_at = time.monotonic()
+    try:
+        while not writer.finished.is_set():
+            point = tracker.expected_point
+            limit = deadlines.get(point, timeout_sec) if point is not None else timeout_sec
+            reason = abort_reason() if abort_reason is not None else None
+            if reason is not None:
+                raise TimeoutError(
+                    f"Board hung: {reason}, got {writer.run_index - 1}/{expected_runs} runs."
+                )
+            idle = time.monotonic() - last_rx_at
+            if idle > limit:
+                if limit < timeout_sec:
+                    op, n = point  # type: ignore[misc]
+                    raise TimeoutError(
+                        f"Board silent for {idle:.1f}s while computing {op}-{n} "
+                        f"(history deadline {limit:.1f}s), got "
+                        f"{writer.run_index - 1}/{expected_runs} runs."
+                    )
+                raise TimeoutError(
+                    f"Serial capture idle-timeout ({timeout_sec}s), got "
+                    f"{writer.run_index - 1}/{expected_runs} runs."
+                )
+            chunk = ser.read(max(1, min(ser.in_waiting, READ_CHUNK_BYTES)))
+            if not chunk:
+                continue
+            last_rx_at = time.monotonic()
+            lines = splitter.feed(chunk)
+            if lines:
+                for line in lines:
+                    tracker.observe(line, last_rx_at)
+                writer.submit((last_rx_at, lines))
+    finally:
+        writer.close()
+    if writer.error is not None:
+        raise writer.error
+    return tracker.gaps
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Mapping
+from typing import Sequence
+
+try:
+    import numpy as np
+    import pandas as pd
+    _IMPORT_ERROR: Exception | None = None
+except ImportError as exc:  # pragma: no cover - runtime dependency
+    np = None  # type: ignore[assignment]
+    pd = None  # type: ignore[assignment]
+    _IMPORT_ERROR = exc
+
+
+# Normal quantile of every 95% CI in the reports (and of the sequential stopping rule).
+CI_Z = 1.96
+
+
+def group_stats(
+    df: pd.DataFrame,
+    keys: Sequence[str],
+    values: Mapping[str, str],
+    run_key: str | None = "run_id",
+    counts: Sequence[str] = (),
+    minima: Sequence[str] = (),
+    maxima: Sequence[str] = (),
+    geomeans: Sequence[str] = (),
+    z: float = CI_Z,
+) -> pd.DataFrame:
+    """Computes per-group moments of several columns in one vectorized pass.
+
+    Rows are assigned group codes once; every moment is then a `bincount`
+    (or `ufunc.at`) over those codes, so the cost grows with the row count
+    and not with the number of groups. Semantics follow pandas: NaN values
+    are skipped, variance uses ddof=1, and an infinite value makes the mean
+    infinite and the variance NaN.
+
+    Args:
+        df: Input rows.
+        keys: Grouping columns; groups come out sorted by them.
+        values: Output prefix -> source column. Each prefix gets `_mean`,
+            `_var`, `_std` and `_ci` columns.
+        run_key: Column whose distinct values per group are the `runs`
+            count the CI is based on; `None` counts rows instead.
+        counts: Prefixes that also get a `_count` column (non-NaN values).
+        minima: Prefixes that also get a `_min` column.
+        maxima: Prefixes that also get a `_max` column.
+        geomeans: Prefixes that also get a `_gmean` column, the geometric
+            mean of the positive values (NaN if none).
+        z: Normal quantile of the CI; `ci_mult = z / sqrt(runs)`.
+
+    Returns:
+        One row per group: `keys`, `runs`, per prefix `mean/var/std` plus the
+        requested `count/min/max/gmean`, then `ci_mult` and per prefix `_ci`.
+    """
+
+    if np is None or pd is None:
+        raise RuntimeError(
+            "pandas/numpy are required. Install dependencies in benchmark_analysis first."
+        ) from _IMPORT_ERROR
+    keys = list(keys)
+    grouped = df.groupby(keys, sort=True)
+    codes = grouped.ngroup().to_numpy()
+    out = grouped.size().reset_index()[keys]
+    size = len(out)
+
+    if run_key is None:
+        runs = np.bincount(codes, minlength=size)
+    else:
+        run_codes, run_values = pd.factorize(df[run_key])
+        width = max(len(run_values), 1)
+        # Distinct (group, run) pairs; sorting beats `np.unique`'s hashing here.
+        pairs = np.sort(codes * width + run_codes)
+        first = np.ones(len(pairs), dtype=bool)
+        first[1:] = pairs[1:] != pairs[:-1]
+        runs = np.bincount(pairs[first] // width, minlength=size)
+    out["runs"] = runs
+
+    for prefix, column in values.items():
+        x = df[column].to_numpy(dtype=float)
+        present = ~np.isnan(x)
+        count = np.bincount(codes, weights=present, minlength=size)
+        total = np.bincount(codes, weights=np.where(present, x, 0.0), minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(count > 0, total / count, np.nan)
+            dev = np.where(present, x - mean[codes], 0.0)
+            var = np.bincount(codes, weights=dev * dev, minlength=size) / (count - 1)
+        var[count < 2] = np.nan
+        out[f"{prefix}_mean"] = mean
+        out[f"{prefix}_var"] = var
+        out[f"{prefix}_std"] = np.sqrt(var)
+        if prefix in counts:
+            out[f"{prefix}_count"] = count.astype(np.int64)
+        if prefix in minima:
+            lowest = np.full(size, np.inf)
+            np.fmin.at(lowest, codes, x)
+            out[f"{prefix}_min"] = np.where(count > 0, lowest, np.nan)
+        if prefix in maxima:
+            highest = np.full(size, -np.inf)
+            np.fmax.at(highest, codes, x)
+            out[f"{prefix}_max"] = np.where(count > 0, highest, np.nan)
+        if prefix in geomeans:
+            positive = x > 0
+            logs = np.log(x, out=np.zeros_like(x), where=positive)
+            positives = np.bincount(codes, weights=positive, minlength=size)
+            log_total = np.bincount(codes, weights=logs, minlength=size)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[f"{prefix}_gmean"] = np.where(
+                    positives > 0, np.exp(log_total / positives), np.nan
+                )
+
+    with np.errstate(divide="ignore"):
+        out["ci_mult"] = z / np.sqrt(runs)
+    for prefix in values:
+        out[f"{prefix}_ci"] = out[f"{prefix}_std"] * out["ci_mult"]
+    return out
+
+
+def geometric_means(df: pd.DataFrame, key: str, column: str) -> dict[object, float]:
+    """Returns the geometric mean of the positive `column` values per `key` value."""
+
+    stats = group_stats(df, [key], {"value": column}, run_key=None, geomeans=("value",))
+    return dict(zip(stats[key].tolist(), stats["value_gmean"].tolist()))
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# USB identity of the benchmark firmware (User/app_main.cpp). The serial number
+# string is derived from the STM32 96-bit UID, so it is unique per board.
+BENCH_USB_VID = 0xCAFE
+BENCH_USB_PID = 0x4010
+BENCH_USB_PRODUCT = "CMSIS-Eigen-Bench"
+USB_PORT_PREFIX = "usb:"
+TTY_FAMILIES: tuple[str, ...] = ("ttyACM", "ttyUSB")
+
+_IN_ATTRIB = 0x00000004
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+
+
+@dataclass(frozen=True)
+class UsbIdentity:
+    """USB identity of one board's CDC interface.
+
+    Args:
+        vid: USB vendor ID.
+        pid: USB product ID.
+        serial: USB serial number string; `None` matches any board of this type.
+    """
+
+    vid: int = BENCH_USB_VID
+    pid: int = BENCH_USB_PID
+    serial: str | None = None
+
+    def matches(self, port: UsbTtyPort) -> bool:
+        """Checks whether `port` belongs to this identity."""
+
+        if (port.vid, port.pid) != (self.vid, self.pid):
+            return False
+        return self.serial is None or port.serial == self.serial
+
+
+@dataclass(frozen=True)
+class UsbTtyPort:
+    """One USB serial device node and the identity sysfs reports for it.
+
+    Args:
+        device: Device node path (for example `/dev/ttyACM0`).
+        vid: USB vendor ID.
+        pid: USB product ID.
+        serial: USB serial number string, if the device has one.
+        product: USB product string, if the device has one.
+    """
+
+    device: str
+    vid: int
+    pid: int
+    serial: str | None
+    product: str | None
+
+
+def _read_attr(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace").strip()
+    except OSError:
+        return None
+
+
+def list_usb_ttys(
+    sysfs_tty: Path = Path("/sys/class/tty"),
+    dev_dir: Path = Path("/dev"),
+) -> list[UsbTtyPort]:
+    """Lists USB serial devices with their identity, read from sysfs.
+
+    Args:
+        sysfs_tty: sysfs tty class directory.
+        dev_dir: Directory holding the device nodes.
+
+    Returns:
+        Ports in device name order; non-USB ttys are skipped.
+    """
+
+    ports: list[UsbTtyPort] = []
+    if not sysfs_tty.is_dir():
+        return ports
+    for entry in sorted(sysfs_tty.iterdir()):
+        if not entry.name.startswith(TTY_FAMILIES):
+            continue
+        try:
+            node = (entry / "device").resolve(strict=True)
+        except OSError:
+            continue
+        # `device` points at the USB interface; vendor/product live on the
+        # parent USB device directory.
+        for candidate in (node, *node.parents):
+            vid = _read_attr(candidate / "idVendor")
+            if vid is None:
+                continue
+            pid = _read_attr(candidate / "idProduct")
+            try:
+                vid_value = int(vid, 16)
+                pid_value = int(pid or "", 16)
+            except ValueError:
+                break
+            ports.append(
+                UsbTtyPort(
+                    device=str(dev_dir / entry.name),
+                    vid=vid_value,
+                    pid=pid_value,
+                    serial=_read_attr(candidate / "serial"),
+                    product=_read_attr(candidate / "product"),
+                )
+            )
+            break
+    return ports
+
+
+class PortResolver:
+    """Resolves boards to serial ports by USB identity, with a cached map.
+
+    A board is named by a port spec: either `usb:<SERIAL>` or a device path.
+    For a device path the identity is read from sysfs the first time the path
+    belongs to a benchmark board and cached, so later lookups (after the board
+    re-enumerated under another name) still find the same physical board.
+
+    Args:
+        sysfs_tty: sysfs tty class directory.
+        dev_dir: Directory holding the device nodes.
+    """
+
+    def __init__(
+        self,
+        sysfs_tty: Path = Path("/sys/class/tty"),
+        dev_dir: Path = Path("/dev"),
+    ) -> None:
+        self._sysfs_tty = sysfs_tty
+        self._dev_dir = dev_dir
+        self._lock = threading.Lock()
+        self._identities: dict[str, UsbIdentity] = {}
+        self._ports: dict[str, str] = {}
+
+    @property
+    def dev_dir(self) -> Path:
+        """Directory holding the device nodes."""
+
+        return self._dev_dir
+
+    def identity_for(self, port_spec: str) -> UsbIdentity | None:
+        """Returns (and caches) the USB identity of the board named by `port_spec`."""
+
+        if port_spec.startswith(USB_PORT_PREFIX):
+            return UsbIdentity(serial=port_spec[len(USB_PORT_PREFIX) :])
+        with self._lock:
+            cached = self._identities.get(port_spec)
+        if cached is not None:
+            return cached
+        name = Path(os.path.realpath(port_spec)).name
+        for port in list_usb_ttys(self._sysfs_tty, self._dev_dir):
+            if Path(port.device).name != name:
+                continue
+            if (port.vid, port.pid) != (BENCH_USB_VID, BENCH_USB_PID) or not port.serial:
+                return None
+            identity = UsbIdentity(serial=port.serial)
+            with self._lock:
+                self._identities[port_spec] = identity
+                self._ports[port_spec] = port.device
+            return identity
+        return None
+
+    def resolve(self, port_spec: str, identity: UsbIdentity) -> list[str]:
+        """Returns device paths currently matching `identity`.
+
+        The port last used for `port_spec` is listed first when it still matches.
+        """
+
+        matches = [
+            port.device
+            for port in list_usb_ttys(self._sysfs_tty, self._dev_dir)
+            if identity.matches(port)
+        ]
+        with self._lock:
+            last = self._ports.get(port_spec)
+        if last in matches:
+            matches.remove(last)
+            matches.insert(0, last)
+        return matches
+
+    def remember(self, port_spec: str, device: str) -> None:
+        """Records the device a board was last opened on."""
+
+        with self._lock:
+            self._ports[port_spec] = device
+
+
+class DevWatcher:
+    """Sleeps until a device directory changes or a timeout expires.
+
+    Uses inotify when available so a re-enumerated port is seen as soon as
+    its node appears (or its permissions are set); otherwise polls at
+    `poll_interval_sec`.
+
+    Args:
+        dev_dir: Directory to watch.
+        poll_interval_sec: Sleep granularity without inotify.
+    """
+
+    def __init__(self, dev_dir: Path = Path("/dev"), poll_interval_sec: float = 0.05) -> None:
+        self._poll_interval_sec = poll_interval_sec
+        self._fd = -1
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            mask = _IN_CREATE | _IN_ATTRIB | _IN_MOVED_TO
+            if libc.inotify_add_watch(fd, os.fsencode(str(dev_dir)), mask) < 0:
+                os.close(fd)
+                return
+            self._fd = fd
+        except (OSError, AttributeError):
+            self._fd = -1
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Whether changes are reported by inotify rather than polling."""
+
+        return self._fd >= 0
+
+    def wait(self, timeout_sec: float) -> None:
+        """Returns after the next change under the directory, or after `timeout_sec`."""
+
+        if self._fd < 0:
+            time.sleep(min(timeout_sec, self._poll_interval_sec))
+            return
+        ready, _, _ = select.select([self._fd], [], [], timeout_sec)
+        if ready:
+            try:
+                while os.read(self._fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        """Releases the inotify descriptor."""
+
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> DevWatcher:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Mapping
+from typing import Sequence
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import SampleRecord
+from point_timing import Point
+
+
+CSV_HEADER = (
+    "op,n,repeat,warmup,eigen_avg_cycles,cmsis_avg_cycles,cmsis_over_eigen,"
+    "error_l2,valid,invalid,build_mode"
+)
+
+
+def run_records(
+    ratio: float | Mapping[Point, float] = 1.2, error_l2: float = 1e-5
+) -> list[SampleRecord]:
+    """Returns one valid run in capture order.
+
+    Eigen takes `1000 + 10 * n` cycles and CMSIS `ratio` times that, so the
+    cycle columns always agree with `cmsis_over_eigen`.
+
+    Args:
+        ratio: CMSIS/Eigen cycle ratio of every point, or per `(op, n)`.
+        error_l2: L2 error of every point.
+    """
+
+    records = []
+    for op, n in EXPECTED_RECORD_ORDER:
+        point_ratio = ratio[(op, n)] if isinstance(ratio, Mapping) else ratio
+        eigen = 1000.0 + 10.0 * n
+        records.append(
+            SampleRecord(
+                op, n, 100, 1, eigen, eigen * point_ratio, point_ratio, error_l2, 100, 0, "Release"
+            )
+        )
+    return records
+
+
+def record_lines(records: Sequence[SampleRecord]) -> list[str]:
+    """Formats records as the lines of one run file, header and `done` included."""
+
+    lines = [CSV_HEADER]
+    for r in records:
+        lines.append(
+            f"{r.op},{r.n},{r.repeat},{r.warmup},{r.eigen_avg_cycles:.1f},"
+            f"{r.cmsis_avg_cycles:.4f},{r.cmsis_over_eigen:.6f},{r.error_l2:.8f},"
+            f"{r.valid},{r.invalid},{r.build_mode}"
+        )
+    lines.append("done")
+    return lines
+
+
+def run_lines(ratio: float | Mapping[Point, float] = 1.2) -> list[str]:
+    """Returns the lines of one valid run file, see `run_records`."""
+
+    return record_lines(run_records(ratio))
+
+
+def run_text(ratio: float | Mapping[Point, float] = 1.2) -> str:
+    """Returns the text of one valid run file, see `run_records`."""
+
+    return "\n".join(run_lines(ratio)) + "\n"
+
+
+def write_run_files(samples_dir: Path, ratios: Sequence[float]) -> Path:
+    """Writes `run_001.csv`, ... with one ratio each, without manifest entries."""
+
+    samples_dir.mkdir(parents=True, exist_ok=True)
+    for idx, ratio in enumerate(ratios, start=1):
+        (samples_dir / f"run_{idx:03d}.csv").write_text(run_text(ratio), encoding="utf-8")
+    return samples_dir
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from board_simulator import FaultPlan
+from board_simulator import SimulatedBoard
+from board_simulator import synthesize_runs
+from full_matrix_common import load_sample_manifest
+from point_timing import TIMESTAMP_SIDECAR_NAME
+from run_full_matrix import candidate_serial_ports
+from run_full_matrix import capture_serial_runs
+from run_full_matrix import first_missing_run
+from run_full_matrix import serial
+
+
+@unittest.skipUnless(
+    serial is not None and sys.platform.startswith("linux") and hasattr(os, "openpty"),
+    "needs pyserial and Linux pseudo-terminals",
+)
+class BoardSimulatorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.samples_dir = self.tmp / "C1" / "samples_release"
+        self.log_path = self.tmp / "C1" / "logs" / "serial_capture.log"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _capture(self, port: Path, expected_runs: int, **kwargs) -> None:
+        capture_serial_runs(
+            port=str(port),
+            baudrate=115200,
+            expected_runs=expected_runs,
+            timeout_sec=10,
+            samples_dir=self.samples_dir,
+            log_path=self.log_path,
+            **kwargs,
+        )
+
+    def test_capture_through_pty_with_garbage(self) -> None:
+        faults = FaultPlan(garbage_every=7)
+        with SimulatedBoard(self.tmp / "ttyACM0", synthesize_runs(3), faults=faults) as board:
+            self._capture(board.port, 3, scan_fallback=False)
+            self.assertIsNone(board.error)
+
+        self.assertEqual(sorted(load_sample_manifest(self.samples_dir)), [
+            "run_001.csv", "run_002.csv", "run_003.csv"
+        ])
+        self.assertIn("garbage", self.log_path.read_text(encoding="utf-8", errors="replace"))
+        stamped = self.log_path.with_name(TIMESTAMP_SIDECAR_NAME).read_text(encoding="utf-8")
+        self.assertEqual(stamped.count("# committed run="), 3)
+
+    def test_stall_trips_point_deadline(self) -> None:
+        # Line 5 is the `mul,8` record (autorun-start, header, mul 3/4/6 first).
+        faults = FaultPlan(stall_at_line=5, stall_sec=5.0)
+        with SimulatedBoard(self.tmp / "ttyACM0", synthesize_runs(1), faults=faults) as board:
+            with self.assertRaisesRegex(TimeoutError, "computing mul-8"):
+                self._capture(
+                    board.port, 1, scan_fallback=False, point_deadlines={("mul", 8): 0.3}
+                )
+
+    def test_reenumeration_is_found_by_port_scan_on_resume(self) -> None:
+        old_port = self.tmp / "ttyACM0"
+        new_port = self.tmp / "ttyACM1"
+        # Line 20 is inside run 2 (run 1 spans lines 1..15). A disconnect drops
+        # unread bytes, so pace the output to outlast the host's 0.2 s settle
+        # delay after opening the port.
+        faults = FaultPlan(
+            disconnect_at_line=20, reenumerate_as=new_port, reenumerate_delay_sec=0.2
+        )
+        with SimulatedBoard(old_port, synthesize_runs(2), line_rate=50, faults=faults):
+            with self.assertRaises(OSError):
+                self._capture(old_port, 2, scan_fallback=False)
+            self.assertEqual(first_missing_run(self.samples_dir, 2), 2)
+
+            # The old name is gone; open_serial_with_retry must find the new one.
+            self._capture(old_port, 2, start_index=2)
+            self.assertIn(str(new_port), candidate_serial_ports(str(old_port)))
+
+        self.assertEqual(first_missing_run(self.samples_dir, 2), 3)
+        self.assertIn(f"port={new_port}", self.log_path.read_text(encoding="utf-8"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from build_cache import BuildCache
+from build_cache import hash_source_tree
+from full_matrix_common import default_profiles
+
+
+class BuildCacheTests(unittest.TestCase):
+    def test_key_depends_on_flags_and_runs_not_name(self) -> None:
+        cache = BuildCache(cache_dir=Path("unused"), source_digest="s", toolchain_digest="t")
+        c1 = default_profiles()["C1"]
+        renamed = replace(c1, name="C1_copy")
+        self.assertEqual(cache.key_for(c1, 10), cache.key_for(renamed, 10))
+        self.assertNotEqual(cache.key_for(c1, 10), cache.key_for(c1, 5))
+        self.assertNotEqual(cache.key_for(c1, 10), cache.key_for(default_profiles()["C2"], 10))
+        other_sources = replace(cache, source_digest="s2")
+        self.assertNotEqual(cache.key_for(c1, 10), other_sources.key_for(c1, 10))
+
+    def test_store_and_lookup_roundtrip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            elf = root / "fw.elf"
+            elf.write_bytes(b"\x7fELF-data")
+            cache = BuildCache(cache_dir=root / "cache", source_digest="s", toolchain_digest="t")
+            key = cache.key_for(default_profiles()["C3"], 10)
+            self.assertIsNone(cache.lookup(key))
+            cache.store(key, elf, {"text": 100, "rodata": 2, "data": 3, "bss": 4})
+            cache.store(key, elf, {"text": 999})
+            hit = cache.lookup(key)
+            assert hit is not None
+            self.assertEqual(hit.elf_path.read_bytes(), b"\x7fELF-data")
+            self.assertEqual(hit.memory["text"], 100)
+
+    def test_source_hash_ignores_analysis_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = Path(tmp)
+            (repo / "User").mkdir()
+            (repo / "benchmark_analysis").mkdir()
+            (repo / "User" / "app_main.cpp").write_text("int x;\n", encoding="utf-8")
+            (repo / "benchmark_analysis" / "report.py").write_text("a\n", encoding="utf-8")
+            before = hash_source_tree(repo)
+            (repo / "benchmark_analysis" / "report.py").write_text("b\n", encoding="utf-8")
+            self.assertEqual(before, hash_source_tree(repo))
+            (repo / "User" / "app_main.cpp").write_text("int y;\n", encoding="utf-8")
+            self.assertNotEqual(before, hash_source_tree(repo))
+
+
+if __name__ == "__main__":
+    unittest.main()
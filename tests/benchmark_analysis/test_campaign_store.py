@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+import pandas as pd
+
+from campaign_data import load_campaign
+from campaign_data import load_profile_runs
+from campaign_store import COMPACTED_NAME
+from campaign_store import STORE_DIR_NAME
+from campaign_store import compact_profile
+from campaign_store import drop_profile
+from campaign_store import export_run_files
+from campaign_store import import_run_files
+from campaign_store import load_store
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import default_profiles
+from full_matrix_common import parse_run_lines
+from profile_scheduler import load_curve
+from run_full_matrix import commit_captured_run
+from run_full_matrix import first_missing_run
+from tests.benchmark_analysis._runs import run_lines
+
+
+def _run_lines(ratio: float) -> list[str]:
+    lines = run_lines(ratio)
+    # Captured text may start with a BOM; the store and the text parser must agree anyway.
+    lines[0] = "\ufeff" + lines[0]
+    return lines
+
+
+def _capture(
+    root: Path, profile: str, ratios: tuple[float, ...], export: bool = False, start: int = 1
+) -> None:
+    for idx, ratio in enumerate(ratios, start=start):
+        commit_captured_run(
+            _run_lines(ratio),
+            idx,
+            root / profile / "samples_release",
+            store_root=root / STORE_DIR_NAME,
+            export_run_file=export,
+        )
+
+
+class CampaignStoreTests(unittest.TestCase):
+    def test_capture_writes_one_shard_per_run_and_replaces_recaptures(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            store = root / STORE_DIR_NAME
+            _capture(root, "C1", (1.2, 1.3))
+            _capture(root, "C2", (0.8,))
+            # A resumed capture rewrites run 2 of C1.
+            _capture(root, "C1", (1.25,), start=2)
+
+            self.assertEqual(
+                sorted(path.name for path in (store / "C1").iterdir()),
+                ["run_001.npz", "run_002.npz"],
+            )
+            self.assertFalse((root / "C1" / "samples_release").exists())
+            columns = load_store(store)
+            self.assertEqual(len(columns["op"]), 3 * len(EXPECTED_RECORD_ORDER))
+            self.assertEqual(columns["n"].dtype.kind, "i")
+            self.assertEqual(columns["eigen_avg_cycles"].dtype.kind, "f")
+            c1_run2 = (columns["profile"] == "C1") & (columns["run_id"] == "run_002")
+            self.assertTrue((columns["cmsis_over_eigen"][c1_run2] == 1.25).all())
+            self.assertEqual(list(columns["op"][:2]), ["mul", "mul"])
+            self.assertEqual(len(load_store(store, ["C2"])["op"]), len(EXPECTED_RECORD_ORDER))
+
+            # Restarting C1 from scratch leaves only the runs captured since.
+            drop_profile(store, "C1")
+            _capture(root, "C1", (1.1,))
+            columns = load_store(store)
+            self.assertEqual(
+                sorted(set(zip(columns["profile"].tolist(), columns["run_id"].tolist()))),
+                [("C1", "run_001"), ("C2", "run_001")],
+            )
+
+    def test_compaction_merges_shards_and_later_shards_win(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            store = root / STORE_DIR_NAME
+            _capture(root, "C1", (1.2, 1.3))
+            before = load_store(store)
+
+            self.assertEqual(compact_profile(store, "C1"), 2)
+            self.assertEqual(
+                [path.name for path in (store / "C1").iterdir()], [COMPACTED_NAME]
+            )
+            after = load_store(store)
+            for name, values in before.items():
+                self.assertEqual(values.tolist(), after[name].tolist())
+
+            _capture(root, "C1", (1.25, 1.4), start=2)
+            columns = load_store(store)
+            run_ids = columns["run_id"]
+            self.assertEqual(sorted(set(run_ids.tolist())), ["run_001", "run_002", "run_003"])
+            self.assertTrue((columns["cmsis_over_eigen"][run_ids == "run_002"] == 1.25).all())
+            self.assertEqual(compact_profile(store, "C1"), 3)
+
+    def test_resume_and_curves_read_store_without_run_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _capture(root, "C1", (1.2, 1.3))
+            samples_dir = root / "C1" / "samples_release"
+            store = root / STORE_DIR_NAME
+
+            self.assertEqual(first_missing_run(samples_dir, 3), 1)
+            self.assertEqual(first_missing_run(samples_dir, 3, store_root=store), 3)
+            self.assertEqual(first_missing_run(samples_dir, 3, True, store_root=store), 3)
+            curve = load_curve(root / "C1")
+            self.assertEqual(len(curve), len(EXPECTED_RECORD_ORDER))
+            self.assertAlmostEqual(curve[("mul", 3)], (1 / 1.2 + 1 / 1.3) / 2)
+
+    def test_loader_reads_store_and_matches_run_file_parsing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _capture(root, "C1", (1.2, 1.3, 1.25), export=True)
+            (root / "C8").mkdir()
+            (root / "C8" / "profile_meta.json").write_text(
+                json.dumps({"status": "completed", "alias_of": "C1"}), encoding="utf-8"
+            )
+            profiles = [default_profiles()[name] for name in ("C1", "C8")]
+
+            from_store = load_campaign(root, profiles, strict=True)
+            revalidated = load_campaign(root, profiles, strict=True, revalidate=True)
+            pd.testing.assert_frame_equal(from_store.df, revalidated.df)
+            compact_profile(root / STORE_DIR_NAME, "C1")
+            compacted = load_campaign(root, profiles, strict=True)
+            pd.testing.assert_frame_equal(from_store.df, compacted.df)
+
+            # Raw text files are optional once the store holds the runs.
+            shutil.rmtree(root / "C1" / "samples_release")
+            store_only = load_campaign(root, profiles[:1])
+            self.assertEqual(len(store_only.df), 3 * len(EXPECTED_RECORD_ORDER))
+
+            # Without the store, the same samples are parsed from the run files.
+            _capture(root, "C2", (1.2, 1.3, 1.25), export=True)
+            shutil.rmtree(root / STORE_DIR_NAME)
+            from_text = load_campaign(root, [default_profiles()["C2"]], strict=True)
+            pd.testing.assert_frame_equal(
+                from_store.df[from_store.df["profile"] == "C1"].drop(columns="profile"),
+                from_text.df.drop(columns="profile"),
+                check_dtype=False,
+            )
+
+    def test_loader_reads_only_selected_and_aliased_profiles_from_store(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _capture(root, "C1", (1.2,))
+            _capture(root, "C2", (1.3,))
+            (root / "C8").mkdir()
+            (root / "C8" / "profile_meta.json").write_text(
+                json.dumps({"status": "completed", "alias_of": "C1"}), encoding="utf-8"
+            )
+
+            with mock.patch("campaign_data.load_store", wraps=load_store) as loader:
+                data = load_campaign(root, [default_profiles()["C8"]], strict=True)
+
+            self.assertEqual(set(loader.call_args.args[1]), {"C1"})
+            self.assertEqual(len(data.df), len(EXPECTED_RECORD_ORDER))
+
+    def test_store_disagreeing_with_run_files_falls_back_to_parsing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _capture(root, "C1", (1.2,), export=True)
+            # A run file written without going through the store.
+            samples_dir = root / "C1" / "samples_release"
+            (samples_dir / "run_002.csv").write_text(
+                "\n".join(_run_lines(1.4)) + "\n", encoding="utf-8"
+            )
+
+            data = load_campaign(root, [default_profiles()["C1"]])
+            self.assertEqual(sorted(data.df["run_id"].unique()), ["run_001", "run_002"])
+
+    def test_store_distrusted_when_exported_file_no_longer_matches_manifest(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _capture(root, "C1", (1.2, 1.3), export=True)
+            profile = default_profiles()["C1"]
+            self.assertEqual(
+                sorted(load_campaign(root, [profile]).df["cmsis_over_eigen"].unique()), [1.2, 1.3]
+            )
+
+            # Same run names, but run 2 was edited after it was committed.
+            run_file = root / "C1" / "samples_release" / "run_002.csv"
+            run_file.write_text("\n".join(_run_lines(1.4)) + "\n", encoding="utf-8")
+            stat = run_file.stat()
+            os.utime(run_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            data = load_campaign(root, [profile])
+            self.assertEqual(sorted(data.df["cmsis_over_eigen"].unique()), [1.2, 1.4])
+
+    def test_import_and_export_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "campaign"
+            for idx, ratio in enumerate((1.2, 1.3), start=1):
+                path = root / "C3" / "samples_release" / f"run_{idx:03d}.csv"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text("\n".join(_run_lines(ratio)) + "\n", encoding="utf-8")
+            store = root / STORE_DIR_NAME
+
+            self.assertEqual(import_run_files(store, root, ["C3"]), 2)
+            export_root = Path(tmp) / "export"
+            self.assertEqual(export_run_files(store, export_root), 2)
+
+            for idx in (1, 2):
+                name = f"run_{idx:03d}.csv"
+                original = (root / "C3" / "samples_release" / name).read_text(encoding="utf-8")
+                exported_file = export_root / "C3" / "samples_release" / name
+                exported = exported_file.read_text(encoding="utf-8")
+                self.assertEqual(
+                    parse_run_lines(exported.splitlines()), parse_run_lines(original.splitlines())
+                )
+            frame = load_profile_runs("C3", export_root / "C3", strict=True)
+            self.assertEqual(len(frame), 2 * len(EXPECTED_RECORD_ORDER))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import struct
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from elf_image import SHF_ALLOC
+from elf_image import SHT_NOBITS
+from elf_image import SHT_SYMTAB
+from elf_image import elf_image_digest
+from elf_image import elf_load_image
+from elf_image import read_elf_sections
+from elf_image import read_elf_segments
+from elf_image import read_elf_symbols
+
+
+SHT_PROGBITS = 1
+SHT_STRTAB = 3
+
+
+def build_elf32(sections: list[tuple]) -> bytes:
+    """Builds a minimal little-endian ELF32 file.
+
+    Args:
+        sections: `(name, sh_type, flags, addr, contents[, link])` tuples;
+            section indices start at 1.
+    """
+
+    names = b"\0"
+    name_offsets: list[int] = []
+    for name, *_ in sections:
+        name_offsets.append(len(names))
+        names += name.encode("ascii") + b"\0"
+    shstrtab_name = len(names)
+    names += b".shstrtab\0"
+
+    body = b""
+    offsets: list[int] = []
+    data_start = 0x34
+    for _, sh_type, _, _, contents, *_ in sections:
+        offsets.append(data_start + len(body))
+        if sh_type != SHT_NOBITS:
+            body += contents
+    strtab_offset = data_start + len(body)
+    body += names
+    shoff = data_start + len(body)
+
+    headers = struct.pack("<10I", 0, 0, 0, 0, 0, 0, 0, 0, 0, 0)
+    for (name, sh_type, flags, addr, contents, *link), name_off, off in zip(
+        sections, name_offsets, offsets
+    ):
+        headers += struct.pack(
+            "<10I", name_off, sh_type, flags, addr, off, len(contents), *(link or [0]), 0, 4, 0
+        )
+    headers += struct.pack(
+        "<10I", shstrtab_name, SHT_STRTAB, 0, 0, strtab_offset, len(names), 0, 0, 1, 0
+    )
+    shnum = len(sections) + 2
+    ident = b"\x7fELF" + bytes([1, 1, 1]) + b"\0" * 9
+    ehdr = ident + struct.pack(
+        "<HHIIIIIHHHHHH", 2, 40, 1, 0, 0, shoff, 0, 0x34, 0, 0, 40, shnum, shnum - 1
+    )
+    return ehdr + body + headers
+
+
+def build_loadable_elf32(segments: list[tuple[int, bytes]]) -> bytes:
+    """Builds a minimal little-endian ELF32 with one `PT_LOAD` per `(paddr, data)`."""
+
+    phoff = 0x34
+    data_start = phoff + 32 * len(segments)
+    headers = b""
+    body = b""
+    for paddr, contents in segments:
+        headers += struct.pack(
+            "<8I", 1, data_start + len(body), paddr, paddr, len(contents), len(contents), 5, 4
+        )
+        body += contents
+    ident = b"\x7fELF" + bytes([1, 1, 1]) + b"\0" * 9
+    ehdr = ident + struct.pack(
+        "<HHIIIIIHHHHHH", 2, 40, 1, 0, phoff, 0, 0, 0x34, 32, len(segments), 40, 0, 0
+    )
+    return ehdr + headers + body
+
+
+def _image(text: bytes, debug: bytes) -> bytes:
+    return build_elf32(
+        [
+            (".text", SHT_PROGBITS, SHF_ALLOC | 0x4, 0x08000000, text),
+            (".bss", SHT_NOBITS, SHF_ALLOC | 0x1, 0x20000000, b"\0" * 64),
+            (".debug_info", SHT_PROGBITS, 0, 0, debug),
+        ]
+    )
+
+
+class ElfImageTests(unittest.TestCase):
+    def test_read_sections(self) -> None:
+        sections = read_elf_sections(_image(b"\x01\x02", b"dbg"))
+        names = [s.name for s in sections]
+        self.assertEqual(names, ["", ".text", ".bss", ".debug_info", ".shstrtab"])
+        self.assertEqual(sections[1].addr, 0x08000000)
+        self.assertEqual(sections[2].size, 64)
+
+    def test_digest_ignores_debug_sections(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            a = Path(tmp) / "a.elf"
+            b = Path(tmp) / "b.elf"
+            c = Path(tmp) / "c.elf"
+            a.write_bytes(_image(b"\x01\x02\x03\x04", b"debug-a"))
+            b.write_bytes(_image(b"\x01\x02\x03\x04", b"debug-b-longer"))
+            c.write_bytes(_image(b"\x01\x02\x03\x05", b"debug-a"))
+            self.assertEqual(elf_image_digest(a), elf_image_digest(b))
+            self.assertNotEqual(elf_image_digest(a), elf_image_digest(c))
+
+    def test_load_image_places_segments_at_load_address(self) -> None:
+        data = build_loadable_elf32([(0x08000000, b"\x01\x02"), (0x08000006, b"\x03")])
+
+        self.assertEqual([s.paddr for s in read_elf_segments(data)], [0x08000000, 0x08000006])
+        base, image = elf_load_image(data)
+        self.assertEqual(base, 0x08000000)
+        self.assertEqual(image, b"\x01\x02\xff\xff\xff\xff\x03")
+
+    def test_read_symbols_from_symtab(self) -> None:
+        strtab = b"\0g_bench_progress_op\0_ZN15BenchmarkRunner16RunAllBenchmarksEPKc\0"
+        symtab = b"\0" * 16
+        symtab += struct.pack("<IIIBBH", 1, 0x20000010, 4, 0x11, 0, 2)
+        symtab += struct.pack("<IIIBBH", 21, 0x08000201, 64, 0x12, 0, 1)
+        data = build_elf32(
+            [
+                (".text", SHT_PROGBITS, SHF_ALLOC, 0x08000000, b"\0" * 4),
+                (".strtab", SHT_STRTAB, 0, 0, strtab),
+                (".symtab", SHT_SYMTAB, 0, 0, symtab, 2),
+            ]
+        )
+
+        self.assertEqual(
+            read_elf_symbols(data),
+            {
+                "g_bench_progress_op": 0x20000010,
+                "_ZN15BenchmarkRunner16RunAllBenchmarksEPKc": 0x08000201,
+            },
+        )
+
+    def test_rejects_non_elf(self) -> None:
+        with self.assertRaises(ValueError):
+            read_elf_sections(b"not an elf" * 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import os
 import sys
+import tempfile
 from pathlib import Path
 import unittest
 
@@ -12,17 +14,24 @@ ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
 if str(ANALYSIS_DIR) not in sys.path:
     sys.path.insert(0, str(ANALYSIS_DIR))
 
+from campaign_data import classify_leader
 from full_matrix_common import EXPECTED_INV_SIZES
 from full_matrix_common import EXPECTED_MUL_SIZES
+from full_matrix_common import RecordBatch
+from full_matrix_common import StreamingRunValidator
 from full_matrix_common import build_profile_phenomenon_signature
 from full_matrix_common import classify_speedup_band
+from full_matrix_common import commit_run_file
 from full_matrix_common import default_profiles
 from full_matrix_common import detect_crossover
 from full_matrix_common import group_profiles_by_phenomenon
+from full_matrix_common import load_sample_manifest
+from full_matrix_common import manifest_entry_matches
+from full_matrix_common import parse_board_targets
+from full_matrix_common import parse_csv_record_line
 from full_matrix_common import parse_run_lines
 from full_matrix_common import split_serial_into_runs
 from full_matrix_common import validate_records
-from generate_full_matrix_report import classify_leader
 from generate_full_matrix_report import group_profiles_for_plot
 from generate_full_matrix_report import to_cmsis_over_eigen
 
@@ -125,6 +134,16 @@ class FullMatrixCommonTests(unittest.TestCase):
         self.assertIn("-Og", profiles["C9"].cflags)
         self.assertIn("-Oz", profiles["C10"].cflags)
 
+    def test_parse_board_targets(self) -> None:
+        boards = parse_board_targets("/dev/ttyACM0=000683000001, /dev/ttyACM1=000683000002")
+        self.assertEqual([b.port for b in boards], ["/dev/ttyACM0", "/dev/ttyACM1"])
+        self.assertEqual(boards[1].jlink_serial, "000683000002")
+        self.assertIsNone(parse_board_targets("/dev/ttyACM0")[0].jlink_serial)
+        with self.assertRaises(ValueError):
+            parse_board_targets("/dev/ttyACM0=1,/dev/ttyACM0=2")
+        with self.assertRaises(ValueError):
+            parse_board_targets("/dev/ttyACM0=")
+
     def test_parse_and_validate_normal_run(self) -> None:
         lines = _build_one_run_lines()
         records = parse_run_lines(lines)
@@ -157,6 +176,81 @@ class FullMatrixCommonTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             validate_records(mutated_records, expected_repeat=100)
 
+    def test_sample_manifest_tracks_committed_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            samples_dir = Path(tmp) / "samples_release"
+            content = ("\n".join(_build_one_run_lines()) + "\n").encode("utf-8")
+            run_1 = commit_run_file(samples_dir, "run_001.csv", content)
+            commit_run_file(samples_dir, "run_002.csv", content)
+
+            manifest = load_sample_manifest(samples_dir)
+            self.assertEqual(sorted(manifest), ["run_001.csv", "run_002.csv"])
+            self.assertTrue(manifest_entry_matches(manifest["run_001.csv"], run_1))
+            self.assertTrue(manifest_entry_matches(manifest["run_001.csv"], run_1, content))
+            self.assertFalse(
+                manifest_entry_matches(manifest["run_001.csv"], run_1, content[:-2] + b"9\n")
+            )
+            self.assertFalse(manifest_entry_matches(None, run_1))
+            self.assertEqual(manifest["run_001.csv"]["mtime_ns"], run_1.stat().st_mtime_ns)
+
+            # Same length, new bytes: the mtime moved, so the hash catches it.
+            stat = run_1.stat()
+            run_1.write_bytes(content[:-2] + b"9\n")
+            os.utime(run_1, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertFalse(manifest_entry_matches(manifest["run_001.csv"], run_1))
+            # Same bytes, new mtime (a copy): still intact.
+            run_1.write_bytes(content)
+            self.assertTrue(manifest_entry_matches(manifest["run_001.csv"], run_1))
+            self.assertEqual(list(samples_dir.glob(".*.tmp")), [])
+
+    def test_streaming_validator_checks_each_line(self) -> None:
+        validator = StreamingRunValidator()
+        for line in _build_one_run_lines():
+            validator.feed(line)
+        self.assertEqual(len(validator.finish()), len(EXPECTED_MUL_SIZES) + len(EXPECTED_INV_SIZES))
+
+        validator.feed(_sample_line("mul", 3))
+        with self.assertRaisesRegex(ValueError, "Out-of-order record mul-6 at position 2, expected mul-4"):
+            validator.feed(_sample_line("mul", 6))
+        with self.assertRaisesRegex(ValueError, "missing mul-4"):
+            validator.finish()
+
+        validator.reset()
+        with self.assertRaisesRegex(ValueError, "Unexpected repeat"):
+            validator.feed(_sample_line("mul", 3))
+            validator.feed(_sample_line("mul", 4, repeat=50))
+
+    def test_record_batch_views_match_per_line_records(self) -> None:
+        lines = _build_one_run_lines()
+        batch = parse_run_lines(lines)
+        records = [rec for rec in map(parse_csv_record_line, lines) if rec is not None]
+
+        self.assertIsInstance(batch, RecordBatch)
+        self.assertEqual(batch, records)
+        self.assertEqual(batch[-1], records[-1])
+        self.assertEqual(RecordBatch.from_records(records), batch)
+        self.assertEqual(batch.column("n").typecode, "q")
+        self.assertEqual(batch.column("error_l2").typecode, "d")
+        self.assertEqual(batch.column("op"), [rec.op for rec in records])
+        self.assertEqual(batch.where_op("n", "inv"), list(EXPECTED_INV_SIZES))
+        self.assertEqual(batch[:2], records[:2])
+        with self.assertRaises(IndexError):
+            batch[len(records)]
+
+    def test_batch_validation_reports_first_failing_record(self) -> None:
+        lines = _build_one_run_lines()
+        # Row 3 breaks valid+invalid, row 5 the error bound; row 3 is reported.
+        lines[3] = lines[3].replace(",100,0,Release", ",99,0,Release")
+        lines[5] = lines[5].replace("0.00001000", "0.5")
+        batch = parse_run_lines(lines)
+        self.assertEqual(batch.first_invalid(100), 2)
+        with self.assertRaisesRegex(ValueError, "Invalid valid/invalid sum for mul-6"):
+            validate_records(batch, expected_repeat=100)
+        with self.assertRaisesRegex(ValueError, "Invalid valid/invalid sum for mul-6"):
+            validate_records(list(batch), expected_repeat=100)
+        with self.assertRaisesRegex(ValueError, "Unexpected repeat"):
+            validate_records(parse_run_lines(_build_one_run_lines()), expected_repeat=50)
+
 
 if __name__ == "__main__":
     unittest.main()
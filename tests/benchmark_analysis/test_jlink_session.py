@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import os
+import stat
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from jlink_session import JLinkError
+from jlink_session import JLinkSessionPool
+from tests.benchmark_analysis.test_elf_image import build_loadable_elf32
+
+
+# Scripted stand-in for JLinkExe: speaks the commander prompt protocol on
+# stdin/stdout and keeps "target flash" in a file under $FAKE_JLINK_STATE.
+FAKE_JLINK = textwrap.dedent(
+    """
+    import os, sys
+    from pathlib import Path
+    sys.path.insert(0, {analysis_dir!r})
+    from elf_image import elf_load_image
+
+    state = Path(os.environ["FAKE_JLINK_STATE"])
+    flash = state / "flash.bin"
+    base = 0x08000000
+
+    def log(event):
+        with (state / "events.txt").open("a") as fp:
+            fp.write(event + "\\n")
+
+    def prompt():
+        sys.stdout.write("J-Link>")
+        sys.stdout.flush()
+
+    log("connect " + " ".join(sys.argv[1:]))
+    print("SEGGER J-Link Commander (stand-in)")
+    print("Connecting to target via SWD")
+    print("Cortex-M4 identified.")
+    prompt()
+    for raw in sys.stdin:
+        cmd = raw.strip()
+        name, _, rest = cmd.partition(" ")
+        if name == "q":
+            break
+        if name == "savebin" and os.environ.get("FAKE_JLINK_FAIL_SAVEBIN"):
+            print("Could not read memory.")
+        elif name == "savebin":
+            path, addr, size = [part.strip() for part in rest.split(",")]
+            offset, size = int(addr, 16) - base, int(size, 16)
+            memory = flash.read_bytes() if flash.is_file() else b""
+            memory = memory.ljust(offset + size, b"\\xff")
+            Path(path).write_bytes(memory[offset : offset + size])
+            print("Data successfully written to file.")
+        elif name == "mem32":
+            addr, count = [part.strip() for part in rest.split(",")]
+            words = [int(addr, 16) // 4 + i for i in range(int(count))]
+            print(addr[2:] + " = " + " ".join("%08X" % w for w in words))
+            log("mem32 " + rest)
+        elif name == "loadfile":
+            if os.environ.get("FAKE_JLINK_FAIL_LOAD"):
+                print("Error while programming flash: Verify failed.")
+            else:
+                load_base, image = elf_load_image(Path(rest).read_bytes())
+                flash.write_bytes(b"\\xff" * (load_base - base) + image)
+                log("load")
+                print("Downloading file... O.K.")
+        else:
+            log(name)
+        prompt()
+    """
+)
+
+
+class JLinkSessionTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.state = self.root / "state"
+        self.state.mkdir()
+        self.jlink = self.root / "JLinkExe"
+        self.jlink.write_text(
+            f"#!{sys.executable}\n" + FAKE_JLINK.format(analysis_dir=str(ANALYSIS_DIR)),
+            encoding="utf-8",
+        )
+        self.jlink.chmod(self.jlink.stat().st_mode | stat.S_IXUSR)
+        self.env = dict(os.environ, FAKE_JLINK_STATE=str(self.state))
+        self.elf_a = self.root / "a.elf"
+        self.elf_b = self.root / "b.elf"
+        self.elf_a.write_bytes(
+            build_loadable_elf32([(0x08000000, b"\x10" * 64), (0x08000080, b"\x20" * 16)])
+        )
+        self.elf_b.write_bytes(build_loadable_elf32([(0x08000000, b"\x11" * 64)]))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _events(self) -> list[str]:
+        path = self.state / "events.txt"
+        return path.read_text(encoding="utf-8").splitlines() if path.is_file() else []
+
+    def _pool(self, env: dict[str, str] | None = None) -> JLinkSessionPool:
+        pool = JLinkSessionPool(
+            jlink=self.jlink,
+            device="STM32F407ZG",
+            swd_speed="4000",
+            cwd=self.root,
+            env=env or self.env,
+        )
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_session_is_reused_and_matching_image_is_not_downloaded(self) -> None:
+        pool = self._pool()
+        log_path = self.root / "logs" / "jlink_flash.log"
+
+        self.assertTrue(pool.flash(self.elf_a, log_path, jlink_serial="000683000001"))
+        self.assertFalse(pool.flash(self.elf_a, log_path, jlink_serial="000683000001"))
+        self.assertTrue(pool.flash(self.elf_b, log_path, jlink_serial="000683000001"))
+
+        events = self._events()
+        connects = [e for e in events if e.startswith("connect")]
+        self.assertEqual(len(connects), 1)
+        self.assertIn("-SelectEmuBySN 000683000001", connects[0])
+        self.assertEqual(events.count("load"), 2)
+        self.assertEqual(events.count("g"), 3)
+        self.assertIn("download skipped", log_path.read_text(encoding="utf-8"))
+
+    def test_read_words_coalesces_adjacent_addresses(self) -> None:
+        pool = self._pool()
+        pool.flash(self.elf_a, self.root / "jlink_flash.log")
+        session = pool.session()
+        assert session is not None
+
+        values = session.read_words([0x20000008, 0x20000004, 0xE000EDF0, 0x2000000C])
+
+        self.assertEqual(
+            values,
+            {
+                0x20000004: 0x08000001,
+                0x20000008: 0x08000002,
+                0x2000000C: 0x08000003,
+                0xE000EDF0: 0x38003B7C,
+            },
+        )
+        reads = [e for e in self._events() if e.startswith("mem32")]
+        self.assertEqual(reads, ["mem32 0x20000004, 3", "mem32 0xE000EDF0, 1"])
+
+    def test_failed_readback_still_downloads(self) -> None:
+        pool = self._pool(dict(self.env, FAKE_JLINK_FAIL_SAVEBIN="1"))
+        log_path = self.root / "jlink_flash.log"
+
+        self.assertTrue(pool.flash(self.elf_a, log_path))
+        self.assertTrue(pool.flash(self.elf_a, log_path))
+
+        events = self._events()
+        self.assertEqual(len([e for e in events if e.startswith("connect")]), 1)
+        self.assertEqual(events.count("load"), 2)
+        self.assertEqual(events.count("g"), 2)
+
+    def test_failed_session_is_replaced(self) -> None:
+        pool = self._pool(dict(self.env, FAKE_JLINK_FAIL_LOAD="1"))
+        log_path = self.root / "jlink_flash.log"
+
+        with self.assertRaisesRegex(JLinkError, "Error while programming"):
+            pool.flash(self.elf_a, log_path)
+        with self.assertRaisesRegex(JLinkError, "Error while programming"):
+            pool.flash(self.elf_a, log_path)
+
+        connects = [e for e in self._events() if e.startswith("connect")]
+        self.assertEqual(len(connects), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
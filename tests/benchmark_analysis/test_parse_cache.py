@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+import pandas as pd
+
+import campaign_data
+from campaign_data import load_profile_runs
+from parse_cache import PARSE_CACHE_NAME
+from parse_cache import parse_cache_key
+from tests.benchmark_analysis._runs import run_text
+from tests.benchmark_analysis._runs import write_run_files
+
+
+class ParseCacheTests(unittest.TestCase):
+    def test_warm_load_skips_parsing_until_a_run_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            samples_c1 = write_run_files(root / "C1" / "samples_release", (1.2, 1.3))
+            write_run_files(root / "C2" / "samples_release", (0.8,))
+            cold = load_profile_runs("C1", root / "C1", strict=True)
+            load_profile_runs("C2", root / "C2", strict=True)
+            self.assertTrue((samples_c1 / PARSE_CACHE_NAME).is_file())
+
+            parser = mock.Mock(side_effect=AssertionError("reparsed"))
+            with mock.patch.object(campaign_data, "parse_sample_bytes", parser):
+                warm = load_profile_runs("C1", root / "C1", strict=True)
+                load_profile_runs("C2", root / "C2", strict=True)
+            pd.testing.assert_frame_equal(warm, cold, check_dtype=False)
+
+            # Rewriting one C1 run misses only C1's entry.
+            run_2 = samples_c1 / "run_002.csv"
+            run_2.write_text(run_text(1.4), encoding="utf-8")
+            stat = run_2.stat()
+            os.utime(run_2, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            with mock.patch.object(campaign_data, "parse_sample_bytes", parser):
+                with self.assertRaisesRegex(AssertionError, "reparsed"):
+                    load_profile_runs("C1", root / "C1", strict=True)
+                load_profile_runs("C2", root / "C2", strict=True)
+            reloaded = load_profile_runs("C1", root / "C1", strict=True)
+            self.assertAlmostEqual(reloaded["cmsis_over_eigen"].iloc[-1], 1.4)
+
+    def test_revalidate_bypasses_the_cache_and_key_tracks_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_dir = Path(tmp) / "C3"
+            samples_dir = write_run_files(profile_dir / "samples_release", (1.1,))
+            load_profile_runs("C3", profile_dir, strict=True)
+
+            spy = mock.Mock(wraps=campaign_data.parse_sample_bytes)
+            with mock.patch.object(campaign_data, "parse_sample_bytes", spy):
+                load_profile_runs("C3", profile_dir, strict=True, revalidate=True)
+            spy.assert_called_once()
+
+            key = parse_cache_key(sorted(samples_dir.glob("run_*.csv")))
+            write_run_files(profile_dir / "samples_release", (1.1, 1.2))
+            self.assertNotEqual(parse_cache_key(sorted(samples_dir.glob("run_*.csv"))), key)
+            self.assertEqual(len(load_profile_runs("C3", profile_dir, strict=True)), 26)
+
+
+if __name__ == "__main__":
+    unittest.main()
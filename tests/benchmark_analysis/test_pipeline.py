@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from pipeline import Pipeline
+from pipeline import Stage
+from pipeline import StageError
+from pipeline import StageState
+from pipeline import format_stage_summary
+from pipeline import summarize_stages
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def stage(self, name: str, result: dict[str, object] | None = None):
+        def run(inputs):
+            self.calls.append(name)
+            return dict(result or {"inputs": sorted(inputs)})
+
+        return run
+
+
+def _quiet(_: str) -> None:
+    return None
+
+
+class PipelineTests(unittest.TestCase):
+    def test_rejects_cycles_and_unknown_inputs(self) -> None:
+        with self.assertRaisesRegex(ValueError, "cycle"):
+            Pipeline([Stage("a", run=dict, inputs=("b",)), Stage("b", run=dict, inputs=("a",))])
+        with self.assertRaisesRegex(ValueError, "unknown inputs: x"):
+            Pipeline([Stage("a", run=dict, inputs=("x",))])
+
+    def test_runs_in_dependency_order_and_reuses_persisted_success(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "C1" / "pipeline_state.json"
+            elf = Path(tmp) / "fw.elf"
+            elf.write_bytes(b"elf")
+            rec = _Recorder()
+            capture_done = {"ok": True}
+
+            def stages() -> Pipeline:
+                return Pipeline(
+                    [
+                        Stage(
+                            "capture",
+                            run=rec.stage("capture"),
+                            inputs=("build",),
+                            reusable=lambda result: capture_done["ok"],
+                        ),
+                        Stage(
+                            "build",
+                            run=rec.stage("build", {"elf_path": str(elf)}),
+                            outputs=("elf_path",),
+                        ),
+                    ]
+                )
+
+            results = stages().run(StageState(path, "C1"), log=_quiet)
+            self.assertEqual(rec.calls, ["build", "capture"])
+            self.assertEqual(results["capture"], {"inputs": ["build"]})
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            self.assertEqual(payload["stages"]["build"]["status"], "succeeded")
+
+            # Next invocation: everything still current, nothing runs.
+            stages().run(StageState(path, "C1"), log=_quiet)
+            self.assertEqual(rec.calls, ["build", "capture"])
+
+            # Capture no longer complete: only capture reruns.
+            capture_done["ok"] = False
+            stages().run(StageState(path, "C1"), log=_quiet)
+            self.assertEqual(rec.calls, ["build", "capture", "capture"])
+
+            # Build output gone: build reruns and drags capture along.
+            capture_done["ok"] = True
+            elf.unlink()
+            stages().run(StageState(path, "C1"), log=_quiet)
+            self.assertEqual(rec.calls[-2:], ["build", "capture"])
+
+            # A fresh state ignores what was persisted.
+            elf.write_bytes(b"elf")
+            stages().run(StageState(path, "C1", fresh=True), ["build"], log=_quiet)
+            self.assertEqual(rec.calls[-1], "build")
+
+    def test_split_runs_see_build_from_same_process_as_fresh(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            rec = _Recorder()
+            pipeline = Pipeline(
+                [
+                    Stage("build", run=rec.stage("build"), reusable=lambda result: False),
+                    Stage("capture", run=rec.stage("capture"), inputs=("build",)),
+                ]
+            )
+            state = StageState(Path(tmp) / "state.json", "C1")
+            pipeline.run(state, ["build"], log=_quiet)
+            pipeline.run(state, ["capture"], log=_quiet)
+            self.assertEqual(rec.calls, ["build", "capture"])
+
+    def test_retries_only_listed_errors_and_records_attempts(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.json"
+            failures = [TimeoutError("usb glitch")]
+
+            def flaky(inputs):
+                if failures:
+                    raise failures.pop()
+                return {"runs": 10}
+
+            pipeline = Pipeline(
+                [
+                    Stage("build", run=lambda inputs: {}),
+                    Stage(
+                        "capture",
+                        run=flaky,
+                        inputs=("build",),
+                        retries=1,
+                        retry_on=(TimeoutError,),
+                    ),
+                ]
+            )
+            state = StageState(path, "C1")
+            self.assertEqual(pipeline.run(state, log=_quiet)["capture"], {"runs": 10})
+            attempts = state.records["capture"].attempts
+            self.assertEqual([a["outcome"] for a in attempts], ["failed", "succeeded"])
+            self.assertIn("usb glitch", str(attempts[0]["error"]))
+
+            failures.append(ValueError("bad record"))
+            with self.assertRaises(StageError) as ctx:
+                pipeline.run(state, force={"capture"}, log=_quiet)
+            self.assertEqual((ctx.exception.stage, ctx.exception.attempts), ("capture", 1))
+            persisted = StageState(path, "C1")
+            self.assertEqual(persisted.records["capture"].status, "failed")
+            self.assertEqual(len(persisted.records["capture"].attempts), 3)
+
+    def test_summary_aggregates_stage_time(self) -> None:
+        states = []
+        for key, build_sec, capture_secs in (("C1", 10.0, [30.0]), ("C2", 0.5, [5.0, 40.0])):
+            state = StageState(Path("unused"), key)
+            state.record("build").attempts.append(
+                {"duration_sec": build_sec, "outcome": "succeeded"}
+            )
+            for index, sec in enumerate(capture_secs):
+                outcome = "failed" if index < len(capture_secs) - 1 else "succeeded"
+                state.record("capture").attempts.append({"duration_sec": sec, "outcome": outcome})
+            states.append(state)
+
+        summaries = summarize_stages(states)
+
+        self.assertEqual([item.stage for item in summaries], ["capture", "build"])
+        capture = summaries[0]
+        self.assertEqual((capture.keys, capture.attempts, capture.failures), (2, 3, 1))
+        self.assertAlmostEqual(capture.total_sec, 75.0)
+        self.assertEqual((capture.slowest_key, capture.slowest_sec), ("C2", 45.0))
+        lines = format_stage_summary(summaries, wall_sec=90.0)
+        self.assertIn("stage total 85.5s", lines[0])
+        self.assertIn("87.7%", lines[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
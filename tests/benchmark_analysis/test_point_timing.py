@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from point_timing import MIN_POINT_TIMEOUT_SEC
+from point_timing import PointTimingHistory
+from point_timing import PointTracker
+from point_timing import load_point_wall_times
+from point_timing import run_clock_checks
+
+
+class PointTimingTests(unittest.TestCase):
+    def test_tracker_measures_gap_before_each_record(self) -> None:
+        tracker = PointTracker()
+        self.assertIsNone(tracker.expected_point)
+        tracker.observe(b"autorun-start\r", 0.0)
+        tracker.observe(b"op,n,repeat,warmup\r", 1.0)
+        self.assertEqual(tracker.expected_point, ("mul", 3))
+        tracker.observe(b"mul,3,100,1,1,1,1,0,100,0,Release\r", 1.5)
+        tracker.observe(b"mul,4,100,1,1,1,1,0,100,0,Release\r", 3.5)
+        self.assertEqual(tracker.expected_point, ("mul", 6))
+        tracker.observe(b"done\r", 4.0)
+        self.assertIsNone(tracker.expected_point)
+        self.assertEqual(tracker.gaps, {("mul", 3): [0.5], ("mul", 4): [2.0]})
+
+    def test_deadlines_use_quantile_floor_and_cap(self) -> None:
+        history = PointTimingHistory()
+        history.extend({("mul", 64): [10.0] * 99 + [20.0], ("mul", 3): [0.01] * 10})
+        history.extend({("inv", 10): [1.0]})
+        deadlines = history.deadlines(safety_factor=3.0, fallback_sec=45.0)
+        self.assertAlmostEqual(deadlines[("mul", 64)], 30.0)
+        self.assertEqual(deadlines[("mul", 3)], MIN_POINT_TIMEOUT_SEC)
+        self.assertNotIn(("inv", 10), deadlines)
+        capped = history.deadlines(safety_factor=10.0, fallback_sec=45.0)
+        self.assertEqual(capped[("mul", 64)], 45.0)
+
+    def test_history_roundtrip_keeps_newest_samples(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "timing" / "C1.json"
+            history = PointTimingHistory()
+            history.extend({("mul", 8): [float(i) for i in range(300)]})
+            history.save(path)
+            loaded = PointTimingHistory.load(path)
+            self.assertEqual(len(loaded.gaps[("mul", 8)]), 256)
+            self.assertEqual(loaded.gaps[("mul", 8)][-1], 299.0)
+            self.assertEqual(PointTimingHistory.load(Path(tmp) / "missing.json").gaps, {})
+
+    def test_wall_times_follow_committed_markers_and_sessions(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sidecar = Path(tmp) / "serial_capture.times.tsv"
+            sidecar.write_text(
+                "# session start=a\n"
+                "10.0\top,n,repeat\n"
+                "10.5\tmul,3,100\n"
+                "12.5\tmul,4,100\n"
+                "12.5\tdone\n"
+                "12.5\t# committed run=1\n"
+                "13.0\top,n,repeat\n"
+                "13.2\tmul,3,100\n"
+                "# session start=b\n"
+                "1.0\top,n,repeat\n"
+                "4.0\tmul,3,100\n"
+                "4.0\tdone\n"
+                "4.0\t# committed run=2\n",
+                encoding="utf-8",
+            )
+            walls = load_point_wall_times(sidecar)
+            self.assertEqual(walls[1], {("mul", 3): 0.5, ("mul", 4): 2.0})
+            self.assertEqual(walls[2], {("mul", 3): 3.0})
+            self.assertEqual(load_point_wall_times(Path(tmp) / "missing.tsv"), {})
+
+    def test_run_clock_checks_flag_slow_board(self) -> None:
+        # 99 timed rounds + 1 warmup; invalid rounds still ran and count too.
+        rows = [
+            {"run_id": "run_001", "op": "mul", "n": 64, "eigen_avg_cycles": 500_000.0,
+             "cmsis_avg_cycles": 340_000.0, "repeat": 99, "warmup": 1, "valid": 60},
+            {"run_id": "run_001", "op": "mul", "n": 3, "eigen_avg_cycles": 100.0,
+             "cmsis_avg_cycles": 100.0, "repeat": 99, "warmup": 1, "valid": 99},
+            {"run_id": "run_002", "op": "mul", "n": 64, "eigen_avg_cycles": 500_000.0,
+             "cmsis_avg_cycles": 340_000.0, "repeat": 99, "warmup": 1, "valid": 99},
+        ]
+        walls = {1: {("mul", 64): 0.5, ("mul", 3): 0.001}, 2: {("mul", 64): 5.25}}
+        checks = run_clock_checks(rows, walls, nominal_hz=168e6, tolerance=0.2)
+        self.assertEqual([c.run_id for c in checks], ["run_001", "run_002"])
+        self.assertAlmostEqual(checks[0].implied_hz, 168e6)
+        self.assertFalse(checks[0].flagged)
+        self.assertAlmostEqual(checks[1].implied_hz, 16e6)
+        self.assertTrue(checks[1].flagged)
+
+if __name__ == "__main__":
+    unittest.main()
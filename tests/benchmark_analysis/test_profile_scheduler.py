@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import math
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+import pandas as pd
+
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import default_profiles
+from generate_full_matrix_report import _mean_curve_diff
+from profile_scheduler import SCHEDULE_FILE_NAME
+from profile_scheduler import load_curve
+from profile_scheduler import mean_curve_diff
+from profile_scheduler import save_schedule
+from profile_scheduler import schedule_by_distinctiveness
+from profile_scheduler import split_anchors
+from run_full_matrix import write_run_file
+from tests.benchmark_analysis._runs import run_lines
+
+
+def _curve(level: float, tilt: float = 0.0) -> dict[tuple[str, int], float]:
+    return {(op, n): level + tilt * n for op, n in EXPECTED_RECORD_ORDER}
+
+
+class ProfileSchedulerTests(unittest.TestCase):
+    def test_mean_curve_diff_matches_report(self) -> None:
+        a, b = _curve(1.0, 0.01), _curve(0.8)
+        del b[("inv", 10)]
+        rows = [
+            {"profile": name, "op": op, "n": n, "eigen_over_cmsis_mean": value}
+            for name, curve in (("C1", a), ("C2", b))
+            for (op, n), value in curve.items()
+        ]
+        expected = _mean_curve_diff(pd.DataFrame(rows), "C2", "C1")
+        self.assertAlmostEqual(mean_curve_diff(b, a), expected)
+        self.assertTrue(math.isnan(mean_curve_diff(a, {})))
+
+    def test_distinctive_profiles_are_scheduled_first(self) -> None:
+        anchors = {"C1": _curve(1.0), "C3": _curve(0.5)}
+        pilots = {
+            "C2": _curve(1.01),  # near-duplicate of C1
+            "C4": _curve(2.0),  # far from everything
+            "C5": _curve(1.98),  # duplicates C4 once C4 is scheduled
+            "C6": {},  # pilot produced nothing
+            "C7": _curve(1.3),
+        }
+
+        order = schedule_by_distinctiveness(pilots, anchors)
+
+        self.assertEqual([item.name for item in order], ["C6", "C4", "C7", "C5", "C2"])
+        c4, c5 = order[1], order[3]
+        self.assertEqual((c4.nearest, c4.distinctive), ("C1", True))
+        self.assertAlmostEqual(c4.baseline_diff, 1.0)
+        self.assertEqual((c5.nearest, c5.distinctive), ("C4", False))
+        self.assertIsNone(order[0].nearest)
+
+    def test_split_anchors_falls_back_to_first_profile(self) -> None:
+        profiles = [default_profiles()[name] for name in ("C2", "C3", "C4")]
+        anchors, rest = split_anchors(profiles, ["C1", "C3"])
+        self.assertEqual([p.name for p in anchors], ["C3"])
+        self.assertEqual([p.name for p in rest], ["C2", "C4"])
+        anchors, rest = split_anchors(profiles, ["C9"])
+        self.assertEqual([p.name for p in anchors], ["C2"])
+
+    def test_curves_load_from_runs_and_aliases(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            write_run_file(run_lines(1.25), 1, root / "C1" / "samples_release")
+            write_run_file(run_lines(1.0 / 0.9), 2, root / "C1" / "samples_release")
+            (root / "C8").mkdir()
+            (root / "C8" / "profile_meta.json").write_text(
+                json.dumps({"status": "completed", "alias_of": "C1"}), encoding="utf-8"
+            )
+
+            curve = load_curve(root / "C8")
+            self.assertEqual(set(curve), set(EXPECTED_RECORD_ORDER))
+            self.assertAlmostEqual(curve[("mul", 64)], (0.8 + 0.9) / 2, places=5)
+            self.assertEqual(load_curve(root / "C2"), {})
+
+            order = schedule_by_distinctiveness({"C2": _curve(1.0)}, {"C1": curve})
+            save_schedule(root / SCHEDULE_FILE_NAME, order, ["C1"], pilot_runs=2)
+            payload = json.loads((root / SCHEDULE_FILE_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(payload["schedule"][0]["nearest"], "C1")
+        self.assertEqual(payload["pilot_runs"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import itertools
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from full_matrix_common import default_profiles
+from profile_space import PLAN_FILE_NAME
+from profile_space import AxisLevel
+from profile_space import ProfileAxis
+from profile_space import ProfileSpace
+from profile_space import design_resolution
+from profile_space import fractional_factorial
+from profile_space import load_profile_space
+from profile_space import main_effects
+from profile_space import plackett_burman
+from profile_space import plan_campaign
+from profile_space import planned_profiles
+from profile_space import save_plan
+
+
+SPACE_PATH = ANALYSIS_DIR / "profile_space.json"
+
+
+def _assert_orthogonal(test: unittest.TestCase, rows: list[tuple[int, ...]]) -> None:
+    columns = list(zip(*rows))
+    for column in columns:
+        test.assertEqual(sum(column), 0)
+    for a, b in itertools.combinations(columns, 2):
+        test.assertEqual(sum(x * y for x, y in zip(a, b)), 0)
+
+
+class ProfileSpaceTests(unittest.TestCase):
+    def test_shipped_space_reproduces_default_profiles(self) -> None:
+        plan = plan_campaign(load_profile_space(SPACE_PATH), design="full")
+        self.assertEqual(len(plan.profiles), 64)
+        planned = {(p.cflags, p.ldflags, p.uses_lto) for p in plan.build_profiles}
+        for name in ("C1", "C2", "C3", "C4", "C7", "C8"):
+            profile = default_profiles()[name]
+            self.assertIn((profile.cflags, profile.ldflags, profile.uses_lto), planned, name)
+
+    def test_fractional_designs_are_orthogonal(self) -> None:
+        rows = fractional_factorial(6, 2)
+        self.assertEqual(len(rows), 16)
+        self.assertEqual(len(set(rows)), 16)
+        _assert_orthogonal(self, rows)
+        self.assertEqual(design_resolution(6, 2), 4)
+        self.assertEqual(design_resolution(6, 1), 6)
+        self.assertEqual(design_resolution(7, 4), 3)
+        with self.assertRaisesRegex(ValueError, "available fractions"):
+            fractional_factorial(6, 4)
+
+    def test_screening_design_sizes(self) -> None:
+        self.assertEqual(len(plackett_burman(3)), 4)
+        self.assertEqual(len(plackett_burman(6)), 8)
+        self.assertEqual(len(plackett_burman(11)), 12)
+        for factors in (3, 7, 11):
+            _assert_orthogonal(self, plackett_burman(factors))
+
+    def test_main_effects_recovered_from_fraction(self) -> None:
+        plan = plan_campaign(load_profile_space(SPACE_PATH), design="fractional", fraction=2)
+        self.assertEqual((len(plan.profiles), plan.resolution), (16, 4))
+        true_effects = {"opt": 1.10, "lto": 1.05, "fast_math": 0.80}
+        responses = {}
+        for item in plan.profiles:
+            value = 1000.0
+            for axis, ratio in true_effects.items():
+                if item.levels[axis] != plan.two_level_axes[axis]:
+                    value *= ratio
+            responses[item.profile.name] = value
+
+        effects = main_effects(plan, responses)
+
+        for axis, ratio in true_effects.items():
+            self.assertAlmostEqual(effects[axis], ratio)
+        self.assertAlmostEqual(effects["unroll"], 1.0)
+
+    def test_multi_level_axis_is_crossed_and_plan_round_trips(self) -> None:
+        space = ProfileSpace(
+            axes=(
+                ProfileAxis(
+                    "opt", (AxisLevel("O3", "-O3"), AxisLevel("Os", "-Os"), AxisLevel("Oz", "-Oz"))
+                ),
+                ProfileAxis("lto", (AxisLevel("on", "-flto", "-flto"), AxisLevel("off"))),
+                ProfileAxis("fm", (AxisLevel("off"), AxisLevel("on", "-ffast-math"))),
+                ProfileAxis("ur", (AxisLevel("auto"), AxisLevel("off", "-fno-unroll-loops"))),
+            ),
+            name_prefix="X",
+        )
+        plan = plan_campaign(space, design="fractional", fraction=1)
+        self.assertEqual(len(plan.profiles), 3 * 4)
+        self.assertEqual(plan.build_profiles[0].name, "X01")
+        self.assertEqual({item.levels["opt"] for item in plan.profiles}, {"O3", "Os", "Oz"})
+
+        with tempfile.TemporaryDirectory() as tmp:
+            save_plan(plan, Path(tmp) / PLAN_FILE_NAME)
+            loaded = planned_profiles(Path(tmp))
+        self.assertEqual(list(loaded.values()), plan.build_profiles)
+
+
+if __name__ == "__main__":
+    unittest.main()
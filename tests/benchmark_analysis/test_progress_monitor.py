@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from progress_monitor import DHCSR_ADDR
+from progress_monitor import DHCSR_S_LOCKUP
+from progress_monitor import DWT_CYCCNT_ADDR
+from progress_monitor import ICSR_ADDR
+from progress_monitor import ProgressAddresses
+from progress_monitor import ProgressMonitor
+from progress_monitor import ProgressSample
+from progress_monitor import ProgressTracker
+from progress_monitor import progress_addresses
+from tests.benchmark_analysis.test_elf_image import build_loadable_elf32
+
+
+ADDRESSES = ProgressAddresses(op=0x20000010, n=0x20000014, line=0x20000018, done=0x2000001C)
+
+
+def _sample(at: float, op: int, n: int, line: int, done: int = 0, **regs: int) -> ProgressSample:
+    return ProgressSample(at=at, op=op, n=n, line=line, done=done, cycles=int(at * 1000), **regs)
+
+
+class ProgressTrackerTests(unittest.TestCase):
+    def test_counts_points_across_runs_and_estimates_eta(self) -> None:
+        tracker = ProgressTracker(runs_total=2)
+
+        self.assertEqual(tracker.update(_sample(0.0, 0, 0, 0)).state, "idle")
+        status = tracker.update(_sample(1.0, 1, 64, 7))
+        self.assertEqual(
+            (status.state, status.point, status.points_done), ("computing", ("mul", 64), 7)
+        )
+        self.assertAlmostEqual(status.points_per_sec or 0.0, 7.0)
+        self.assertAlmostEqual(status.eta_sec or 0.0, 19 / 7.0)
+
+        # The poll missed `done`; `line` falling marks the run boundary.
+        status = tracker.update(_sample(2.0, 1, 4, 1))
+        self.assertEqual(status.points_done, 14)
+        status = tracker.update(_sample(3.0, 2, 10, 13, done=1))
+        self.assertEqual((status.state, status.points_done), ("done", 26))
+
+    def test_distinguishes_slow_point_from_hang(self) -> None:
+        tracker = ProgressTracker(runs_total=1, point_deadlines={("mul", 64): 5.0})
+        tracker.update(_sample(0.0, 1, 64, 7))
+        self.assertEqual(tracker.update(_sample(4.0, 1, 64, 7)).state, "computing")
+        status = tracker.update(_sample(6.0, 1, 64, 7))
+        self.assertEqual(status.state, "overdue")
+        self.assertAlmostEqual(status.point_elapsed_sec, 6.0)
+
+        stuck = ProgressSample(at=7.0, op=1, n=64, line=7, done=0, cycles=6000)
+        self.assertEqual(tracker.update(stuck).detail, "DWT cycle counter stopped")
+        fault = _sample(8.0, 1, 64, 7, icsr=3)
+        self.assertEqual(tracker.update(fault).detail, "core in HardFault handler")
+        lockup = _sample(9.0, 1, 64, 7, dhcsr=DHCSR_S_LOCKUP)
+        self.assertEqual(tracker.update(lockup).state, "hung")
+
+
+class ProgressMonitorTests(unittest.TestCase):
+    def test_monitor_reports_confirmed_hang(self) -> None:
+        polls = iter([(1, 16, 5, 0, 3), (1, 16, 5, 0, 3), (1, 16, 5, 0, 3)])
+
+        def read_words(addresses):
+            op, n, line, done, vector = next(polls)
+            values = {ADDRESSES.op: op, ADDRESSES.n: n, ADDRESSES.line: line}
+            values.update({ADDRESSES.done: done, ICSR_ADDR: vector})
+            values.update({DHCSR_ADDR: 0, DWT_CYCCNT_ADDR: 0})
+            return {addr: values[addr] for addr in addresses}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            status_path = Path(tmp) / "progress.json"
+            seen = []
+            monitor = ProgressMonitor(
+                read_words,
+                ADDRESSES,
+                ProgressTracker(runs_total=3),
+                interval_sec=0.01,
+                status_path=status_path,
+                on_status=seen.append,
+            )
+            monitor.start()
+            monitor.join(timeout=5)
+
+            self.assertFalse(monitor.is_alive())
+            self.assertIsNone(monitor.error)
+            self.assertEqual(len(seen), 2)
+            self.assertIn("HardFault", monitor.hung_reason or "")
+            payload = json.loads(status_path.read_text(encoding="utf-8"))
+            self.assertEqual(payload["state"], "hung")
+            self.assertEqual(payload["point"], ["mul", 16])
+
+    def test_missing_symbols_are_reported(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            elf = Path(tmp) / "fw.elf"
+            elf.write_bytes(build_loadable_elf32([(0x08000000, b"\0" * 8)]))
+            with self.assertRaisesRegex(ValueError, "g_bench_progress_op"):
+                progress_addresses(elf)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+import pandas as pd
+
+from campaign_data import load_campaign
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import default_profiles
+from generate_readable_report import readable_stats
+from report_driver import emit_reports
+from report_driver import report_paths
+from run_full_matrix import write_run_file
+from tests.benchmark_analysis._runs import run_lines
+
+
+def _write_campaign(root: Path) -> None:
+    for name, ratios in (("C1", (1.20, 1.25, 1.22)), ("C2", (0.80, 0.82))):
+        for idx, ratio in enumerate(ratios, start=1):
+            write_run_file(run_lines(ratio), idx, root / name / "samples_release")
+
+
+class ReportDriverTests(unittest.TestCase):
+    def test_campaign_is_loaded_once_for_every_report(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            repo = Path(tmp)
+            input_root = repo / "build" / "bench_matrix"
+            _write_campaign(input_root)
+            profiles = [default_profiles()[name] for name in ("C1", "C2")]
+
+            data = load_campaign(input_root, profiles, strict=True)
+            self.assertEqual(len(data.df), 5 * len(EXPECTED_RECORD_ORDER))
+            self.assertEqual(data.data_profile_names(), ["C1", "C2"])
+
+            # Emitting must not go back to the run files.
+            shutil.rmtree(input_root)
+            full_paths, readable_paths = report_paths(repo, input_root)
+            written = emit_reports(data, full_paths, readable_paths)
+
+            self.assertEqual(
+                written, [repo / "report_full_matrix.md", repo / "report_readable.md"]
+            )
+            for path in written:
+                self.assertIn("C2", path.read_text(encoding="utf-8"))
+            summary = pd.read_csv(full_paths.output_dir / "summary_full_matrix.csv")
+            self.assertEqual(len(summary), 2 * len(EXPECTED_RECORD_ORDER))
+            run_details = pd.read_csv(readable_paths.output_dir / "run_details.csv")
+            self.assertEqual(len(run_details), 5)
+            self.assertTrue((readable_paths.output_dir / "phenomenon_groups.csv").is_file())
+
+    def test_readable_columns_derive_from_shared_stats(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            input_root = Path(tmp)
+            _write_campaign(input_root)
+            data = load_campaign(input_root, [default_profiles()["C1"]])
+
+        stats = readable_stats(data.stats).set_index(["profile", "op", "n"])
+        grouped = data.df.groupby(["profile", "op", "n"])
+        self.assertTrue((stats["error_max"] == grouped["error_l2"].max()).all())
+        expected_ci = grouped["eigen_over_cmsis"].std() * 1.96 / 3 ** 0.5
+        pd.testing.assert_series_equal(
+            stats["eigen_over_cmsis_ci95"], expected_ci, check_names=False
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from campaign_data import load_campaign
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import default_profiles
+from results_db import compact_db
+from results_db import ingest_campaign
+from results_db import point_history
+from tests.benchmark_analysis._runs import write_run_files
+
+
+def _write_campaign(root: Path, captured_at: str, ratio: float, runs: int = 2) -> None:
+    for name, scale in (("C1", 1.0), ("C4", 0.9)):
+        profile_dir = root / name
+        ratios = [ratio * scale + idx * 0.01 for idx in range(1, runs + 1)]
+        write_run_files(profile_dir / "samples_release", ratios)
+        meta = {"captured_at": captured_at, "memory": {"text": 4096, "bss": 512}}
+        (profile_dir / "profile_meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+def _ingest(db: Path, root: Path, captured_at: str, ratio: float) -> str:
+    _write_campaign(root, captured_at, ratio)
+    profiles = [default_profiles()[name] for name in ("C1", "C4")]
+    return ingest_campaign(db, load_campaign(root, profiles, strict=True))
+
+
+class ResultsDbTests(unittest.TestCase):
+    def test_ingest_and_query_history_across_campaigns(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Path(tmp) / "results.sqlite"
+            stamps = [f"2026-10-{day:02d}T12:00:00+00:00" for day in (1, 2, 3)]
+            for idx, stamp in enumerate(stamps):
+                name = _ingest(db, Path(tmp) / f"campaign_{idx}", stamp, 1.2 + idx * 0.1)
+                self.assertEqual(name, stamp)
+            # Re-ingesting a campaign replaces it instead of duplicating rows.
+            with sqlite3.connect(db) as conn:
+                before = conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+            ingest_campaign(
+                db,
+                load_campaign(
+                    Path(tmp) / "campaign_2", [default_profiles()[n] for n in ("C1", "C4")]
+                ),
+            )
+            with sqlite3.connect(db) as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0], before)
+                self.assertEqual(before, 3 * 2 * 2 * len(EXPECTED_RECORD_ORDER))
+                memory = conn.execute(
+                    "SELECT bytes FROM memory WHERE campaign = ? AND profile = 'C4' "
+                    "AND section = 'text'",
+                    (stamps[0],),
+                ).fetchone()
+                self.assertEqual(memory, (4096,))
+                plan = " ".join(
+                    row[-1]
+                    for row in conn.execute(
+                        "EXPLAIN QUERY PLAN SELECT * FROM samples "
+                        "WHERE profile = 'C4' AND op = 'mul' AND n = 16"
+                    )
+                )
+                self.assertIn("samples_by_point", plan)
+
+            history = point_history(db, "C4", "mul", 16, limit=2)
+            self.assertEqual([row["campaign"] for row in history], stamps[1:])
+            self.assertEqual(history[0]["runs"], 2)
+            self.assertAlmostEqual(history[0]["eigen_over_cmsis_mean"], (1 / 1.18 + 1 / 1.19) / 2)
+
+    def test_retention_compacts_then_deletes_oldest_campaigns(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Path(tmp) / "results.sqlite"
+            stamps = [f"2026-09-{day:02d}T08:00:00+00:00" for day in (1, 2, 3)]
+            for idx, stamp in enumerate(stamps):
+                _ingest(db, Path(tmp) / f"campaign_{idx}", stamp, 1.0)
+
+            self.assertEqual(compact_db(db, keep_samples=1), (0, 2))
+            self.assertEqual(compact_db(db, keep_samples=1), (0, 0))
+            with sqlite3.connect(db) as conn:
+                kept = conn.execute("SELECT DISTINCT campaign FROM samples").fetchall()
+            self.assertEqual(kept, [(stamps[2],)])
+            self.assertEqual(len(point_history(db, "C1", "inv", 3)), 3)
+
+            self.assertEqual(compact_db(db, keep_campaigns=2), (1, 0))
+            self.assertEqual(
+                [row["campaign"] for row in point_history(db, "C1", "inv", 3)], stamps[1:]
+            )
+            with self.assertRaises(ValueError):
+                compact_db(db, keep_samples=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+import unittest
+from unittest import mock
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from full_matrix_common import BoardTarget
+from full_matrix_common import RunConfig
+from full_matrix_common import default_profiles
+from full_matrix_common import resolve_samples_dir
+from jlink_session import JLinkError
+from pipeline import StageState
+from pipeline import summarize_stages
+from run_full_matrix import CaptureDeduplicator
+from run_full_matrix import ProfileBuild
+from run_full_matrix import candidate_serial_ports
+from run_full_matrix import first_missing_run
+from run_full_matrix import profile_pipeline
+from run_full_matrix import profile_complete
+from run_full_matrix import resume_start_index
+from run_full_matrix import run_profiles_on_boards
+from run_full_matrix import run_profiles_pipelined
+from run_full_matrix import write_run_file
+from tests.benchmark_analysis._runs import run_lines
+
+
+class RunFullMatrixTests(unittest.TestCase):
+    def test_boards_run_profiles_concurrently_in_order(self) -> None:
+        profiles = [default_profiles()[name] for name in ("C1", "C2", "C3", "C4")]
+        boards = [
+            BoardTarget(port="/dev/ttyACM0", jlink_serial="1"),
+            BoardTarget(port="/dev/ttyACM1", jlink_serial="2"),
+        ]
+        barrier = threading.Barrier(2, timeout=5)
+        used: dict[str, str] = {}
+
+        def run_one(profile, board):
+            # Both boards must be busy at the same time to pass the barrier.
+            if profile.name in ("C1", "C2"):
+                barrier.wait()
+            used[profile.name] = board.port
+            return {"profile": profile.name}
+
+        metas = run_profiles_on_boards(profiles, boards, run_one)
+        self.assertEqual([m["profile"] for m in metas], ["C1", "C2", "C3", "C4"])
+        self.assertEqual({used["C1"], used["C2"]}, {"/dev/ttyACM0", "/dev/ttyACM1"})
+
+    def test_failure_stops_dispatch(self) -> None:
+        profiles = [default_profiles()[name] for name in ("C1", "C2", "C3")]
+        started: list[str] = []
+
+        def run_one(profile, board):
+            started.append(profile.name)
+            if profile.name == "C2":
+                raise RuntimeError("capture failed")
+            return {"profile": profile.name}
+
+        with self.assertRaises(RuntimeError):
+            run_profiles_on_boards(profiles, [BoardTarget(port="/dev/ttyACM0")], run_one)
+        self.assertEqual(started, ["C1", "C2"])
+
+    def test_pipeline_builds_next_profile_during_capture(self) -> None:
+        profiles = [default_profiles()[name] for name in ("C1", "C2", "C3")]
+        c2_built = threading.Event()
+
+        def build_one(profile):
+            if profile.name == "C2":
+                c2_built.set()
+            return ProfileBuild(profile=profile, elf_path=Path(f"{profile.name}.elf"), memory={})
+
+        def capture_one(build, board):
+            if build.profile.name == "C1":
+                self.assertTrue(c2_built.wait(timeout=5))
+            return {"profile": build.profile.name, "elf": str(build.elf_path)}
+
+        metas = run_profiles_pipelined(
+            profiles, [BoardTarget(port="/dev/ttyACM0")], build_one, capture_one, depth=1
+        )
+        self.assertEqual([m["elf"] for m in metas], ["C1.elf", "C2.elf", "C3.elf"])
+
+    def test_pipeline_build_failure_aborts(self) -> None:
+        profiles = [default_profiles()[name] for name in ("C1", "C2", "C3")]
+        captured: list[str] = []
+
+        def build_one(profile):
+            if profile.name == "C2":
+                raise RuntimeError("build failed")
+            return ProfileBuild(profile=profile, elf_path=None, memory={})
+
+        def capture_one(build, board):
+            captured.append(build.profile.name)
+            return {"profile": build.profile.name}
+
+        with self.assertRaises(RuntimeError):
+            run_profiles_pipelined(
+                profiles, [BoardTarget(port="/dev/ttyACM0")], build_one, capture_one, depth=2
+            )
+        self.assertEqual(captured, ["C1"])
+
+    def test_profile_pipeline_times_host_stages_and_retries_jlink_errors(self) -> None:
+        profile = default_profiles()["C1"]
+        calls: list[str] = []
+
+        def configure_one():
+            calls.append("configure")
+            return ProfileBuild(profile=profile, elf_path=None, memory={})
+
+        def build_one(configured):
+            calls.append("build")
+            return ProfileBuild(profile=profile, elf_path=elf, memory={})
+
+        def size_one(built):
+            calls.append("size")
+            return ProfileBuild(profile=profile, elf_path=built.elf_path, memory={"text": 1})
+
+        def capture_one(build, stage_args):
+            calls.append("capture")
+            if calls.count("capture") == 1:
+                raise JLinkError("commander stalled")
+            return {"profile": build.profile.name, "memory": build.memory}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            elf = root / "C1.elf"
+            elf.write_bytes(b"elf")
+            cfg = RunConfig(
+                repo_dir=root, build_root=root, serial_port="/dev/null", runs=1, timeout_sec=1
+            )
+            args = argparse.Namespace(capture_retries=1, revalidate=False, resume=False)
+            pipeline = profile_pipeline(
+                cfg, profile, args, configure_one, build_one, size_one, capture_one
+            )
+            state = StageState(root / "state.json", "C1", fresh=True)
+            with mock.patch("pipeline.time.sleep"):
+                results = pipeline.run(state, log=lambda line: None)
+
+            self.assertEqual(calls, ["configure", "build", "size", "capture", "capture"])
+            self.assertEqual(results["capture"]["meta"], {"profile": "C1", "memory": {"text": 1}})
+            summaries = {item.stage: item for item in summarize_stages([state])}
+            self.assertEqual(set(summaries), {"configure", "build", "size", "capture"})
+            self.assertEqual(summaries["capture"].failures, 1)
+
+    def test_dedup_claims_first_profile_per_digest(self) -> None:
+        dedup = CaptureDeduplicator()
+        self.assertIsNone(dedup.claim("aa", "C1"))
+        self.assertIsNone(dedup.claim("bb", "C4"))
+        self.assertEqual(dedup.claim("aa", "C8"), "C1")
+        self.assertIsNone(dedup.claim("aa", "C1"))
+
+    def test_alias_profile_follows_target(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            owner = root / "C1"
+            alias = root / "C8"
+            alias.mkdir()
+            (alias / "profile_meta.json").write_text(
+                json.dumps({"status": "completed", "runs": 1, "alias_of": "C1"}),
+                encoding="utf-8",
+            )
+            self.assertFalse(profile_complete(alias, expected_runs=1))
+            self.assertEqual(resolve_samples_dir(alias), owner / "samples_release")
+
+            (owner / "samples_release").mkdir(parents=True)
+            (owner / "profile_meta.json").write_text(
+                json.dumps({"status": "completed", "runs": 1}), encoding="utf-8"
+            )
+            (owner / "samples_release" / "run_001.csv").write_text(
+                "\n".join(run_lines()) + "\n", encoding="utf-8"
+            )
+            self.assertTrue(profile_complete(owner, expected_runs=1))
+            self.assertTrue(profile_complete(alias, expected_runs=1))
+
+    def test_sequential_stop_completes_with_fewer_runs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_dir = Path(tmp) / "C1"
+            for idx in (1, 2, 3):
+                write_run_file(run_lines(), idx, profile_dir / "samples_release")
+            meta = {"status": "completed", "runs": 10}
+            (profile_dir / "profile_meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            self.assertFalse(profile_complete(profile_dir, expected_runs=10))
+
+            meta["sequential_stop"] = {"runs_captured": 3, "stopped_early": True}
+            (profile_dir / "profile_meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            self.assertTrue(profile_complete(profile_dir, expected_runs=10))
+
+            meta["sequential_stop"] = {"runs_captured": 4, "stopped_early": True}
+            (profile_dir / "profile_meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            self.assertFalse(profile_complete(profile_dir, expected_runs=10))
+
+    def test_resume_continues_at_first_missing_run_for_same_image(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_dir = Path(tmp) / "C1"
+            samples_dir = profile_dir / "samples_release"
+            samples_dir.mkdir(parents=True)
+            (profile_dir / "profile_meta.json").write_text(
+                json.dumps({"status": "capturing", "runs": 4, "image_digest": "abc"}),
+                encoding="utf-8",
+            )
+            for idx in (1, 2):
+                (samples_dir / f"run_{idx:03d}.csv").write_text(
+                    "\n".join(run_lines()) + "\n", encoding="utf-8"
+                )
+            # Truncated run 3 (CDC disconnect mid-run) must be recaptured.
+            (samples_dir / "run_003.csv").write_text(run_lines()[1] + "\n", encoding="utf-8")
+
+            self.assertEqual(resume_start_index(profile_dir, 4, "abc"), 3)
+            self.assertTrue((samples_dir / "run_001.csv").is_file())
+
+            self.assertEqual(resume_start_index(profile_dir, 4, "other-image"), 1)
+            self.assertFalse(samples_dir.exists())
+
+    def test_manifest_resume_checks_size_mtime_and_revalidate_parses(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            samples_dir = Path(tmp) / "samples_release"
+            for idx in (1, 2, 3):
+                write_run_file(run_lines(), idx, samples_dir)
+            self.assertEqual(first_missing_run(samples_dir, 3), 4)
+            self.assertEqual(first_missing_run(samples_dir, 3, revalidate=True), 4)
+
+            # Same size, corrupted in place: the moved mtime sends it to the hash check.
+            run_2 = samples_dir / "run_002.csv"
+            raw = run_2.read_bytes()
+            stat = run_2.stat()
+            run_2.write_bytes(raw.replace(b"mul,", b"xxx,", 1))
+            os.utime(run_2, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertEqual(first_missing_run(samples_dir, 3), 2)
+            self.assertEqual(first_missing_run(samples_dir, 3, revalidate=True), 2)
+            run_2.write_bytes(raw)
+
+            # A size mismatch is caught without reparsing.
+            (samples_dir / "run_003.csv").write_bytes(raw + b"\n")
+            self.assertEqual(first_missing_run(samples_dir, 3), 3)
+
+    def test_candidate_ports_without_fallback(self) -> None:
+        self.assertEqual(
+            candidate_serial_ports("/dev/ttyACM7", scan_fallback=False), ["/dev/ttyACM7"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from analyze_variant_samples import load_all_samples
+from campaign_data import frame_batch
+from full_matrix_common import parse_run_lines
+from main import load_benchmark_csv
+from sample_loader import load_sample_dir
+from sample_loader import load_sample_files
+from sample_loader import parse_sample_bytes
+
+
+HEADER = (
+    "op,n,repeat,warmup,eigen_avg_cycles,cmsis_avg_cycles,cmsis_over_eigen,"
+    "error_l2,valid,invalid,build_mode"
+)
+
+# Every kind of line the per-line parser skips or accepts.
+MESSY_RUN = "\r\n".join(
+    [
+        "boot banner, firmware v1",
+        "\ufeff" + HEADER,
+        "",
+        "  mul,3,100,1,1200.5,900.0,0.749688,0.00000012,100,0,Release  ",
+        "mul,4,100,1,1500.0,1100.0,0.733333,1e-7,100,0,Release,extra",
+        "mul,6,100,1,1800.0",
+        "\ufeffmul,8,100,1,2500.0,2000.0,0.800000,0.00000020,99,1,Release",
+        "inv,3,100,1,800.0,1200.0,1.500000,0.00001000,100,0,Release",
+        "done",
+        "",
+    ]
+)
+
+
+class SampleLoaderTests(unittest.TestCase):
+    def test_matches_per_line_parser_semantics(self) -> None:
+        second = "\n".join([HEADER, "inv,4,100,1,900.0,1000.0,1.111111,0.00002,100,0,Release"])
+        frame = parse_sample_bytes(
+            [MESSY_RUN.encode("utf-8"), second.encode("utf-8")], ["run_001", "run_002"]
+        )
+
+        self.assertEqual(list(frame["run_id"]), ["run_001"] * 3 + ["run_002"])
+        self.assertEqual(
+            frame_batch(frame[frame["run_id"] == "run_001"]),
+            parse_run_lines(MESSY_RUN.splitlines()),
+        )
+        self.assertEqual(
+            frame_batch(frame[frame["run_id"] == "run_002"]),
+            parse_run_lines(second.splitlines()),
+        )
+        self.assertEqual(str(frame["n"].dtype), "int64")
+        self.assertEqual(str(frame["error_l2"].dtype), "float64")
+
+    def test_rejects_files_without_records_and_bad_fields(self) -> None:
+        with self.assertRaisesRegex(ValueError, "No valid benchmark records found in run_002"):
+            parse_sample_bytes([MESSY_RUN.encode("utf-8"), b"done\n"], ["run_001", "run_002"])
+        bad = "mul,3,100,1,abc,900.0,0.75,0.0,100,0,Release\n"
+        with self.assertRaises(ValueError):
+            parse_sample_bytes([bad.encode("utf-8")], ["run_001"])
+
+    def test_script_loaders_share_the_bulk_loader(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            samples_dir = Path(tmp)
+            for idx in (2, 1):
+                (samples_dir / f"run_{idx:03d}.csv").write_text(MESSY_RUN, encoding="utf-8")
+
+            df = load_sample_dir(samples_dir)
+            self.assertEqual(list(df["run_id"].unique()), ["run_001", "run_002"])
+            variant = load_all_samples(samples_dir, "V3")
+            self.assertEqual(list(variant.columns[:3]), ["variant", "run_id", "op"])
+            single = load_benchmark_csv(samples_dir / "run_001.csv")
+            self.assertEqual(list(single["op"]), ["inv", "mul", "mul"])
+            self.assertNotIn("run_id", single.columns)
+            self.assertEqual(len(load_sample_files([])), 0)
+            with self.assertRaisesRegex(RuntimeError, "No sample csv"):
+                load_sample_dir(samples_dir / "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+import pandas as pd
+
+from campaign_data import compute_stats
+from campaign_data import records_to_dicts
+from full_matrix_common import EXPECTED_RECORD_ORDER
+from full_matrix_common import SampleRecord
+from run_full_matrix import write_run_file
+from sequential_stop import CiStoppingRule
+from sequential_stop import seed_from_run_files
+from tests.benchmark_analysis._runs import record_lines
+from tests.benchmark_analysis._runs import run_records
+
+
+def _run_records(rng: random.Random, spread: float) -> list[SampleRecord]:
+    return run_records(
+        {point: 1.2 * (1.0 + rng.uniform(-spread, spread)) for point in EXPECTED_RECORD_ORDER}
+    )
+
+
+class CiStoppingRuleTests(unittest.TestCase):
+    def test_intervals_match_report_compute_stats(self) -> None:
+        rng = random.Random(7)
+        rule = CiStoppingRule(target_rel_ci=0.01, min_runs=2)
+        rows = []
+        for idx in range(1, 6):
+            records = _run_records(rng, spread=0.05)
+            rule.add_run(records)
+            rows.extend(records_to_dicts("C1", f"run_{idx:03d}", records))
+
+        stats = compute_stats(pd.DataFrame(rows)).set_index(["op", "n"])
+        intervals = rule.intervals()
+        self.assertEqual(len(intervals), len(EXPECTED_RECORD_ORDER))
+        for point, interval in intervals.items():
+            row = stats.loc[point]
+            self.assertEqual(interval.runs, row["runs"])
+            self.assertAlmostEqual(interval.mean, row["eigen_over_cmsis_mean"])
+            self.assertAlmostEqual(interval.ci, row["eigen_over_cmsis_ci"])
+
+    def test_stops_once_every_point_is_tight(self) -> None:
+        rng = random.Random(3)
+        rule = CiStoppingRule(target_rel_ci=0.005, min_runs=3)
+        # Identical runs have zero width but still wait for min_runs.
+        steady = _run_records(rng, spread=0.0)
+        self.assertFalse(rule.add_run(steady))
+        self.assertFalse(rule.add_run(steady))
+        self.assertTrue(rule.add_run(steady))
+
+        noisy = CiStoppingRule(target_rel_ci=0.005, min_runs=3)
+        stops = [noisy.add_run(_run_records(rng, spread=0.02)) for _ in range(60)]
+        first = stops.index(True) + 1
+        self.assertGreater(first, 3)
+        widest = noisy.widest()
+        self.assertIsNotNone(widest)
+        self.assertIn("widest CI", noisy.describe())
+
+    def test_seed_from_committed_run_files(self) -> None:
+        rng = random.Random(11)
+        runs = [_run_records(rng, spread=0.01) for _ in range(3)]
+        direct = CiStoppingRule(target_rel_ci=0.01)
+        for records in runs:
+            direct.add_run(records)
+        with tempfile.TemporaryDirectory() as tmp:
+            samples_dir = Path(tmp)
+            for idx, records in enumerate(runs, start=1):
+                write_run_file(record_lines(records), idx, samples_dir)
+            seeded = CiStoppingRule(target_rel_ci=0.01)
+            seed_from_run_files(seeded, samples_dir, 3)
+
+        self.assertEqual(seeded.runs, 3)
+        for point, interval in seeded.intervals().items():
+            self.assertAlmostEqual(interval.ci, direct.intervals()[point].ci, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
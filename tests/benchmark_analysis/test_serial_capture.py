@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import io
+import sys
+import time
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from full_matrix_common import EXPECTED_INV_SIZES
+from full_matrix_common import EXPECTED_MUL_SIZES
+from serial_capture import LineSplitter
+from serial_capture import stream_serial_runs
+
+
+def _run_bytes() -> bytes:
+    lines = [
+        "autorun-start",
+        "op,n,repeat,warmup,eigen_avg_cycles,cmsis_avg_cycles,cmsis_over_eigen,"
+        "error_l2,valid,invalid,build_mode",
+    ]
+    for n in EXPECTED_MUL_SIZES:
+        lines.append(f"mul,{n},100,1,100.0,120.0,1.200000,0.00001000,100,0,Release")
+    for n in EXPECTED_INV_SIZES:
+        lines.append(f"inv,{n},100,1,100.0,120.0,1.200000,0.00001000,100,0,Release")
+    lines.append("done")
+    return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+
+class FakeSerial:
+    """Serves a byte string in fixed-size chunks, then idles."""
+
+    def __init__(self, data: bytes, chunk: int) -> None:
+        self._data = data
+        self._chunk = chunk
+        self.reads = 0
+
+    @property
+    def in_waiting(self) -> int:
+        return min(self._chunk, len(self._data))
+
+    def read(self, size: int) -> bytes:
+        if not self._data:
+            time.sleep(0.001)  # stands in for the port read timeout
+            return b""
+        self.reads += 1
+        out, self._data = self._data[:size], self._data[size:]
+        return out
+
+
+class SerialCaptureTests(unittest.TestCase):
+    def test_line_splitter_keeps_partial_lines(self) -> None:
+        splitter = LineSplitter()
+        self.assertEqual(splitter.feed(b"mul,3"), [])
+        self.assertEqual(splitter.feed(b",100\r\ninv"), [b"mul,3,100\r"])
+        self.assertEqual(splitter.pending(), b"inv")
+        self.assertEqual(splitter.feed(b"\n\ndone\n"), [b"inv", b"", b"done"])
+        self.assertEqual(splitter.pending(), b"")
+
+    def test_stream_commits_runs_from_chunked_reads(self) -> None:
+        ser = FakeSerial(_run_bytes() * 3, chunk=97)
+        log_fp = io.StringIO()
+        times_fp = io.StringIO()
+        committed: dict[int, list[str]] = {}
+
+        stream_serial_runs(
+            ser,
+            log_fp=log_fp,
+            commit_run=lambda lines, idx: committed.setdefault(idx, list(lines)),
+            start_index=2,
+            expected_runs=3,
+            timeout_sec=5,
+            times_fp=times_fp,
+        )
+
+        self.assertEqual(sorted(committed), [2, 3])
+        self.assertEqual(committed[2][-1], "done")
+        self.assertTrue(all(not line.endswith("\r") for line in committed[3]))
+        # One read per available chunk, never one per line or byte.
+        self.assertLessEqual(ser.reads, -(-len(_run_bytes()) * 3 // 97))
+        self.assertIn("inv,10,100,1", log_fp.getvalue())
+        stamped = times_fp.getvalue().splitlines()
+        self.assertTrue(all("\t" in line for line in stamped))
+        markers = [line.split("\t", 1)[1] for line in stamped if "# committed" in line]
+        self.assertEqual(markers, ["# committed run=2", "# committed run=3"])
+
+    def test_stream_stops_early_when_rule_is_met(self) -> None:
+        committed: list[int] = []
+        ser = FakeSerial(_run_bytes() * 5, chunk=4096)
+
+        stream_serial_runs(
+            ser,
+            log_fp=io.StringIO(),
+            commit_run=lambda lines, idx: committed.append(idx),
+            start_index=1,
+            expected_runs=5,
+            timeout_sec=5,
+            stop_after=lambda lines, idx: lines[-1] == "done" and idx == 2,
+        )
+
+        self.assertEqual(committed, [1, 2])
+
+    def test_stream_surfaces_validation_error_from_writer(self) -> None:
+        bad = _run_bytes().replace(b"0.00001000,100,0", b"0.50000000,100,0", 1)
+        with self.assertRaises(ValueError):
+            stream_serial_runs(
+                FakeSerial(bad, chunk=4096),
+                log_fp=io.StringIO(),
+                commit_run=lambda lines, idx: None,
+                start_index=1,
+                expected_runs=1,
+                timeout_sec=5,
+            )
+
+    def test_stream_aborts_on_first_bad_record(self) -> None:
+        # Run cut right after the failing line: without per-line checks the
+        # capture would sit in the idle timeout waiting for `done`.
+        data = _run_bytes()
+        cut = data.index(b"mul,16,")
+        bad = data[:cut] + b"mul,16,100,1,100.0,120.0,1.2,0.50000000,0,100,Release\r\n"
+        pattern = r"Run 1 rejected at line 'mul,16,.*error_l2 out of threshold"
+        with self.assertRaisesRegex(ValueError, pattern):
+            stream_serial_runs(
+                FakeSerial(bad, chunk=4096),
+                log_fp=io.StringIO(),
+                commit_run=lambda lines, idx: None,
+                start_index=1,
+                expected_runs=1,
+                timeout_sec=30,
+            )
+
+    def test_stream_uses_point_deadline_from_history(self) -> None:
+        data = _run_bytes()
+        hung = data[: data.index(b"mul,4,")]
+        with self.assertRaisesRegex(TimeoutError, "computing mul-4"):
+            stream_serial_runs(
+                FakeSerial(hung, chunk=4096),
+                log_fp=io.StringIO(),
+                commit_run=lambda lines, idx: None,
+                start_index=1,
+                expected_runs=1,
+                timeout_sec=30,
+                point_deadlines={("mul", 4): 0.05},
+            )
+
+    def test_stream_aborts_when_monitor_reports_hang(self) -> None:
+        with self.assertRaisesRegex(TimeoutError, "Board hung: core locked up, got 0/1 runs"):
+            stream_serial_runs(
+                FakeSerial(b"autorun-start\r\n", chunk=4096),
+                log_fp=io.StringIO(),
+                commit_run=lambda lines, idx: None,
+                start_index=1,
+                expected_runs=1,
+                timeout_sec=30,
+                abort_reason=lambda: "core locked up",
+            )
+
+    def test_stream_idle_timeout(self) -> None:
+        with self.assertRaisesRegex(TimeoutError, "got 0/1 runs"):
+            stream_serial_runs(
+                FakeSerial(b"", chunk=1),
+                log_fp=io.StringIO(),
+                commit_run=lambda lines, idx: None,
+                start_index=1,
+                expected_runs=1,
+                timeout_sec=0.05,
+                log_flush_sec=0.01,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import math
+import sys
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+import numpy as np
+import pandas as pd
+
+from stats_engine import CI_Z
+from stats_engine import geometric_means
+from stats_engine import group_stats
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    rows = 600
+    frame = pd.DataFrame(
+        {
+            "profile": rng.choice(["C1", "C2", "C3"], rows),
+            "op": rng.choice(["mul", "inv"], rows),
+            "run_id": rng.choice([f"run_{i:03d}" for i in range(1, 9)], rows),
+            "cycles": 1e5 + rng.random(rows) * 10.0,
+            "ratio": rng.random(rows) * 2.0 - 0.2,
+        }
+    )
+    frame.loc[3, "ratio"] = np.nan
+    frame.loc[5, "ratio"] = np.inf
+    return frame
+
+
+class StatsEngineTests(unittest.TestCase):
+    def test_moments_match_pandas_groupby(self) -> None:
+        frame = _frame()
+        stats = group_stats(
+            frame,
+            ["profile", "op"],
+            {"cycles": "cycles", "ratio": "ratio"},
+            counts=("ratio",),
+            minima=("cycles",),
+            maxima=("ratio",),
+        )
+        expected = frame.groupby(["profile", "op"], as_index=False).agg(
+            runs=("run_id", "nunique"),
+            cycles_mean=("cycles", "mean"),
+            cycles_var=("cycles", "var"),
+            cycles_std=("cycles", "std"),
+            cycles_min=("cycles", "min"),
+            ratio_mean=("ratio", "mean"),
+            ratio_var=("ratio", "var"),
+            ratio_std=("ratio", "std"),
+            ratio_count=("ratio", "count"),
+            ratio_max=("ratio", "max"),
+        )
+        expected["ci_mult"] = CI_Z / np.sqrt(expected["runs"])
+        expected["cycles_ci"] = expected["cycles_std"] * expected["ci_mult"]
+        expected["ratio_ci"] = expected["ratio_std"] * expected["ci_mult"]
+        pd.testing.assert_frame_equal(
+            stats, expected, check_dtype=False, check_column_type=False, rtol=1e-9
+        )
+        # The infinite ratio sits in one group: infinite mean, undefined spread.
+        inf_row = stats.set_index(["profile", "op"]).loc[tuple(frame.loc[5, ["profile", "op"]])]
+        self.assertTrue(math.isinf(inf_row["ratio_mean"]))
+        self.assertTrue(math.isnan(inf_row["ratio_var"]))
+
+    def test_geometric_mean_ignores_non_positive_values(self) -> None:
+        frame = pd.DataFrame(
+            {"profile": ["C1", "C1", "C1", "C2", "C3"], "value": [2.0, 8.0, -1.0, 0.0, 5.0]}
+        )
+        means = geometric_means(frame, "profile", "value")
+        self.assertEqual(set(means), {"C1", "C2", "C3"})
+        self.assertAlmostEqual(means["C1"], 4.0)
+        self.assertTrue(math.isnan(means["C2"]))
+        self.assertAlmostEqual(means["C3"], 5.0)
+
+        single = group_stats(frame[frame["profile"] == "C3"], ["profile"], {"v": "value"}, None)
+        self.assertEqual(int(single["runs"].iloc[0]), 1)
+        self.assertTrue(math.isnan(single["v_ci"].iloc[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
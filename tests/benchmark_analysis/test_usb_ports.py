@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+import unittest
+
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ANALYSIS_DIR = REPO_DIR / "benchmark_analysis"
+if str(ANALYSIS_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYSIS_DIR))
+
+from usb_ports import DevWatcher
+from usb_ports import PortResolver
+from usb_ports import UsbIdentity
+from usb_ports import list_usb_ttys
+
+try:
+    import serial  # noqa: F401
+
+    HAVE_SERIAL = True
+except ImportError:  # pragma: no cover - depends on environment
+    HAVE_SERIAL = False
+
+
+class FakeSysfs:
+    """Builds a minimal /sys/class/tty + /dev layout under a temporary root."""
+
+    def __init__(self, root: Path) -> None:
+        self.tty = root / "sys" / "class" / "tty"
+        self.dev = root / "dev"
+        self.usb = root / "sys" / "devices" / "usb1"
+        self.tty.mkdir(parents=True)
+        self.dev.mkdir()
+
+    def add(self, name: str, vid: str, pid: str, serial: str, bus_port: str) -> None:
+        device = self.usb / bus_port
+        interface = device / f"{bus_port}:1.0"
+        interface.mkdir(parents=True, exist_ok=True)
+        (device / "idVendor").write_text(vid + "\n", encoding="utf-8")
+        (device / "idProduct").write_text(pid + "\n", encoding="utf-8")
+        (device / "serial").write_text(serial + "\n", encoding="utf-8")
+        (device / "product").write_text("CMSIS-Eigen-Bench\n", encoding="utf-8")
+        (self.tty / name).mkdir()
+        (self.tty / name / "device").symlink_to(interface)
+
+    def remove(self, name: str) -> None:
+        (self.tty / name / "device").unlink()
+        (self.tty / name).rmdir()
+
+
+class UsbPortsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.sysfs = FakeSysfs(Path(self._tmp.name))
+        self.sysfs.add("ttyACM0", "cafe", "4010", "UID-A", "1-1")
+        self.sysfs.add("ttyACM1", "cafe", "4010", "UID-B", "1-2")
+        self.sysfs.add("ttyUSB0", "0403", "6001", "FTDI", "1-3")
+        (self.sysfs.tty / "ttyS0").mkdir()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _resolver(self) -> PortResolver:
+        return PortResolver(sysfs_tty=self.sysfs.tty, dev_dir=self.sysfs.dev)
+
+    def test_list_usb_ttys_reads_parent_usb_device(self) -> None:
+        ports = list_usb_ttys(self.sysfs.tty, self.sysfs.dev)
+
+        self.assertEqual(
+            [(Path(p.device).name, p.vid, p.pid, p.serial) for p in ports],
+            [
+                ("ttyACM0", 0xCAFE, 0x4010, "UID-A"),
+                ("ttyACM1", 0xCAFE, 0x4010, "UID-B"),
+                ("ttyUSB0", 0x0403, 0x6001, "FTDI"),
+            ],
+        )
+        self.assertEqual(ports[0].product, "CMSIS-Eigen-Bench")
+
+    def test_resolver_follows_board_after_reenumeration(self) -> None:
+        resolver = self._resolver()
+        port_a = str(self.sysfs.dev / "ttyACM0")
+        identity = resolver.identity_for(port_a)
+        self.assertEqual(identity, UsbIdentity(serial="UID-A"))
+
+        # Flashing resets both boards; they come back with swapped names.
+        self.sysfs.remove("ttyACM0")
+        self.sysfs.remove("ttyACM1")
+        self.assertEqual(resolver.resolve(port_a, identity), [])
+        self.sysfs.add("ttyACM0", "cafe", "4010", "UID-B", "1-2")
+        self.sysfs.add("ttyACM2", "cafe", "4010", "UID-A", "1-1")
+
+        # The cached identity survives, and the other board is never offered.
+        self.assertEqual(resolver.identity_for(port_a), identity)
+        self.assertEqual(resolver.resolve(port_a, identity), [str(self.sysfs.dev / "ttyACM2")])
+
+    def test_resolver_usb_spec_and_foreign_device(self) -> None:
+        resolver = self._resolver()
+
+        spec_identity = resolver.identity_for("usb:UID-B")
+        self.assertEqual(
+            resolver.resolve("usb:UID-B", spec_identity), [str(self.sysfs.dev / "ttyACM1")]
+        )
+        self.assertIsNone(resolver.identity_for(str(self.sysfs.dev / "ttyUSB0")))
+        self.assertIsNone(resolver.identity_for(str(self.sysfs.dev / "ttyACM9")))
+
+    def test_dev_watcher_wakes_on_new_node(self) -> None:
+        with DevWatcher(self.sysfs.dev) as watcher:
+            if not watcher.uses_inotify:
+                self.skipTest("inotify not available")
+            timer = threading.Timer(0.1, (self.sysfs.dev / "ttyACM5").touch)
+            timer.start()
+            started = time.monotonic()
+            watcher.wait(5.0)
+            elapsed = time.monotonic() - started
+            timer.join()
+
+        self.assertLess(elapsed, 2.0)
+
+    @unittest.skipUnless(HAVE_SERIAL and sys.platform.startswith("linux"), "needs pyserial PTYs")
+    def test_open_serial_waits_for_identity_to_reappear(self) -> None:
+        from run_full_matrix import open_serial_with_retry
+
+        resolver = self._resolver()
+        master, slave = os.openpty()
+        self.addCleanup(os.close, master)
+        self.addCleanup(os.close, slave)
+        pty_path = os.ttyname(slave)
+
+        def reappear() -> None:
+            self.sysfs.add("ttyACM7", "cafe", "4010", "UID-C", "2-1")
+            (self.sysfs.dev / "ttyACM7").symlink_to(pty_path)
+
+        timer = threading.Timer(0.2, reappear)
+        timer.start()
+        log_fp = io.StringIO()
+        started = time.monotonic()
+        ser, port = open_serial_with_retry(
+            "usb:UID-C", baudrate=115200, wait_timeout_sec=10, log_fp=log_fp, resolver=resolver
+        )
+        elapsed = time.monotonic() - started
+        ser.close()
+        timer.join()
+
+        self.assertEqual(port, str(self.sysfs.dev / "ttyACM7"))
+        self.assertLess(elapsed, 2.0)
+        self.assertIn("usb_serial=UID-C", log_fp.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()